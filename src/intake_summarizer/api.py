@@ -1,19 +1,30 @@
 from __future__ import annotations
 
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 
 from intake_summarizer.schema import IntakeSummary
-from intake_summarizer.summarize import summarize_intake, RetryableLLMError
+from intake_summarizer.summarize import summarize_intake_async, RetryableLLMError
 from intake_summarizer.validate import enforce_business_rules
-from intake_summarizer.persist import persist_summary
+from intake_summarizer.persist import content_key, persist_summary_async
+from intake_summarizer.clients import lifespan
+from intake_summarizer.ratelimit import limiter_states
+from intake_summarizer.metrics import RequestMetricsMiddleware, metrics_payload
+from intake_summarizer.tracing import intake_trace
+from intake_summarizer.retry import acall_with_retry, deadline_scope, get_retry_budget
+from intake_summarizer.singleflight import SingleFlight
+from intake_summarizer.batch import BatchRequest, batch_response_body, check_batch_size, iter_ndjson, run_batch
+from intake_summarizer.jsonio import FastJSONResponse
+from intake_summarizer.httpcache import ConditionalGetMiddleware
+from intake_summarizer.compression import CompressionMiddleware
 
 
 app = FastAPI(
     title="AI-Assisted Intake Summarizer",
     version="0.1.0",
     description="Clinician-facing API for intake summarization + deterministic rules.",
+    lifespan=lifespan,
 )
 
 
@@ -33,11 +44,30 @@ class SummarizeResponse(BaseModel):
     original_text: str | None = None
 
 
+# Innermost first: ETags/304s, then compression (per-encoding ETags), request metrics outermost
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(RequestMetricsMiddleware, app_name="api")
+
+
 @app.get("/health")
 def health() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+def metrics() -> Response:
+    # Prometheus scrape endpoint (request/stage latency, LLM errors, cache, retries, limiters)
+    body, content_type = metrics_payload()
+    return Response(content=body, media_type=content_type)
+
+
+@app.get("/api/rate-limits")
+def api_rate_limits() -> dict:
+    # Current adaptive limiter state per provider:model
+    return {"limiters": limiter_states(), "retry_budget": get_retry_budget().state()}
+
+
 @app.get("/", response_class=HTMLResponse)
 def home() -> str:
     # Minimal clinician UI (no build tooling)
@@ -100,26 +130,45 @@ async function run() {
 </html>"""
 
 
-@app.post("/api/summarize", response_model=SummarizeResponse)
-def api_summarize(req: SummarizeRequest) -> SummarizeResponse:
-    text = req.text.strip()
-    if not text:
-        raise HTTPException(status_code=400, detail="text is required")
+# One in-flight pipeline per (content key, persist); concurrent duplicates share its outcome
+_inflight = SingleFlight()
 
-    try:
-        # 1) LLM summary (mock/openai)
-        summary = summarize_intake(text)
+
+async def _summarize_and_persist(text: str, persist: bool) -> tuple[IntakeSummary, str | None]:
+    # Spans for every stage below; exported per TRACE_EXPORTER
+    with intake_trace("summarize_request"):
+        # 1) LLM summary (mock/openai), retried with backoff within REQUEST_DEADLINE_SECONDS
+        with deadline_scope():
+            summary = await acall_with_retry(lambda: summarize_intake_async(text))
 
         # 2) deterministic overrides (safety/business rules)
         summary = enforce_business_rules(summary, text)
 
         # 3) persist if requested
-        out_path = str(persist_summary(summary, text=text)) if req.persist else None
+        out_path = str(await persist_summary_async(summary, text=text)) if persist else None
+    return summary, out_path
+
+
+async def _run_coalesced(text: str, persist: bool) -> tuple[IntakeSummary, str | None]:
+    return await _inflight.do((content_key(text), persist), lambda: _summarize_and_persist(text, persist))
+
+
+@app.post("/api/summarize", response_model=SummarizeResponse)
+async def api_summarize(req: SummarizeRequest) -> FastJSONResponse:
+    text = req.text.strip()
+    if not text:
+        raise HTTPException(status_code=400, detail="text is required")
 
-        return SummarizeResponse(
-            summary=summary,
-            out_path=out_path,
-            original_text=text if req.include_original_text else None,
+    try:
+        summary, out_path = await _run_coalesced(text, req.persist)
+
+        # Serialized straight from the models; response_model stays for the OpenAPI docs
+        return FastJSONResponse(
+            SummarizeResponse(
+                summary=summary,
+                out_path=out_path,
+                original_text=text if req.include_original_text else None,
+            )
         )
 
     except RetryableLLMError as e:
@@ -129,4 +178,19 @@ def api_summarize(req: SummarizeRequest) -> SummarizeResponse:
         # Schema mismatches or non-retryable failures
         raise HTTPException(status_code=422, detail=str(e)) from e
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Unexpected error: {e}") from e
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {e}") from e
+
+
+@app.post("/api/summarize/batch")
+async def api_summarize_batch(req: BatchRequest, stream: bool = False):
+    """
+    Summarize many intakes in one request with bounded concurrency.
+    Each item gets its own IntakeResult-shaped entry; ?stream=true returns NDJSON as items finish.
+    """
+    error = check_batch_size(req)
+    if error:
+        raise HTTPException(status_code=413, detail=error)
+
+    if stream:
+        return StreamingResponse(iter_ndjson(req, _run_coalesced), media_type="application/x-ndjson")
+    return FastJSONResponse(batch_response_body(await run_batch(req, _run_coalesced)))
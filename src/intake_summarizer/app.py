@@ -1,20 +1,46 @@
 from __future__ import annotations
-import json
 from pathlib import Path
 from typing import Optional
+import hmac
 import logging
 
 from fastapi import FastAPI, File, Form, UploadFile, Request
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 
 from intake_summarizer.schema import IntakeSummary
-from intake_summarizer.summarize import summarize_intake, RetryableLLMError
+from intake_summarizer.summarize import summarize_intake, summarize_intake_async, RetryableLLMError
 from intake_summarizer.validate import enforce_business_rules
-from intake_summarizer.persist import persist_summary
-from intake_summarizer.llm_client import LLMClient, MockLLMClient
+from intake_summarizer.persist import content_key, persist_summary, persist_summary_async
+from intake_summarizer.llm_client import AsyncLLMClient, AsyncMockLLMClient, LLMClient
 from intake_summarizer.settings import get_settings
+from intake_summarizer.clients import lifespan
+from intake_summarizer.ratelimit import limiter_states
+from intake_summarizer.metrics import RequestMetricsMiddleware, metrics_payload
+from intake_summarizer.tracing import intake_trace
+from intake_summarizer.retry import acall_with_retry, call_with_retry, deadline_scope, get_retry_budget
+from intake_summarizer.singleflight import SingleFlight
+from intake_summarizer.batch import (
+    BatchItemResult,
+    BatchRequest,
+    batch_response_body,
+    check_batch_size,
+    iter_ndjson,
+    run_batch,
+)
+from intake_summarizer.uploads import (
+    UploadSizeLimitMiddleware,
+    UploadTooLarge,
+    is_zip,
+    read_upload_text,
+    read_uploads,
+    summarize_uploads,
+)
+from intake_summarizer.jsonio import FastJSONResponse
+from intake_summarizer.samples import SampleCatalog
+from intake_summarizer.httpcache import ConditionalGetMiddleware
+from intake_summarizer.compression import CompressionMiddleware
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +49,7 @@ GENERIC_USER_ERROR = (
     "Please retry or contact support."
 )
 
-app = FastAPI(title="Clinician Intake Summarizer", version="0.1.0")
+app = FastAPI(title="Clinician Intake Summarizer", version="0.1.0", lifespan=lifespan)
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 TEMPLATES_DIR = BASE_DIR / "templates"
@@ -33,14 +59,37 @@ templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 if STATIC_DIR.exists():
     app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 
-MAX_UPLOAD_BYTES = 200_000
+MAX_UPLOAD_BYTES = 200_000  # per file (also per .txt inside an uploaded zip)
 
+# Concurrent identical submissions share one pipeline run (see _run_pipeline_coalesced)
+_inflight = SingleFlight()
 
-def _decode_upload(upload: UploadFile, raw: bytes) -> str:
-    try:
-        return raw.decode("utf-8")
-    except UnicodeDecodeError:
-        return raw.decode("latin-1", errors="replace")
+
+def _chaos_override(chaos_enabled: bool, chaos_rate: float, chaos_seed: str) -> Optional[AsyncLLMClient]:
+    # UI chaos controls only apply to the mock provider
+    if get_settings().llm_provider != "mock":
+        return None
+    seed_val = int(chaos_seed) if chaos_seed.strip().isdigit() else None
+    return AsyncMockLLMClient(chaos_enabled=chaos_enabled, chaos_rate=chaos_rate, chaos_seed=seed_val)
+
+
+def _is_multi_upload(uploads: list[UploadFile]) -> bool:
+    return len(uploads) > 1 or any(is_zip(f) for f in uploads)
+
+
+async def _summarize_upload_batch(
+    uploads: list[UploadFile],
+    persist: bool,
+    client_override: Optional[AsyncLLMClient],
+    chaos_key: tuple,
+) -> list[BatchItemResult]:
+    """Many .txt files and/or zips in one request: one result per file, processed concurrently."""
+    files = await read_uploads(uploads, max_bytes=MAX_UPLOAD_BYTES)
+
+    async def run(text: str, persist: bool) -> tuple[IntakeSummary, Optional[str]]:
+        return await _run_pipeline_coalesced(text, persist, client_override, chaos_key)
+
+    return await summarize_uploads(files, persist=persist, run=run)
 
 
 def _run_pipeline(
@@ -48,17 +97,66 @@ def _run_pipeline(
     persist: bool,
     client_override: Optional[LLMClient] = None,
 ) -> tuple[IntakeSummary, Optional[str]]:
-    summary = summarize_intake(text, client=client_override)
-    summary = enforce_business_rules(summary, text)
-    out_path = str(persist_summary(summary, text=text)) if persist else None    
+    with intake_trace("summarize_request"):
+        with deadline_scope():
+            summary = call_with_retry(lambda: summarize_intake(text, client=client_override))
+        summary = enforce_business_rules(summary, text)
+        out_path = str(persist_summary(summary, text=text)) if persist else None
+    return summary, out_path
+
+
+async def _run_pipeline_async(
+    text: str,
+    persist: bool,
+    client_override: Optional[AsyncLLMClient] = None,
+) -> tuple[IntakeSummary, Optional[str]]:
+    # Same steps as _run_pipeline; the LLM call, backoff and file write don't block the event loop
+    with intake_trace("summarize_request"):
+        with deadline_scope():
+            summary = await acall_with_retry(lambda: summarize_intake_async(text, client=client_override))
+        summary = enforce_business_rules(summary, text)
+        out_path = str(await persist_summary_async(summary, text=text)) if persist else None
     return summary, out_path
 
 
+async def _run_pipeline_coalesced(
+    text: str,
+    persist: bool,
+    client_override: Optional[AsyncLLMClient],
+    chaos: tuple[bool, float, str],
+) -> tuple[IntakeSummary, Optional[str]]:
+    # Chaos settings change the mock's output, so they are part of the key
+    return await _inflight.do(
+        (content_key(text), persist, chaos),
+        lambda: _run_pipeline_async(text, persist=persist, client_override=client_override),
+    )
+
+
+# Innermost first: upload body cap, ETags/304s, then compression (per-encoding ETags), request metrics outermost
+app.add_middleware(UploadSizeLimitMiddleware)
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(RequestMetricsMiddleware, app_name="app")
+
+
 @app.get("/health")
 def health() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+def metrics() -> Response:
+    # Prometheus scrape endpoint (request/stage latency, LLM errors, cache, retries, limiters)
+    body, content_type = metrics_payload()
+    return Response(content=body, media_type=content_type)
+
+
+@app.get("/api/rate-limits")
+def api_rate_limits() -> dict:
+    # Current adaptive limiter state per provider:model
+    return {"limiters": limiter_states(), "retry_budget": get_retry_budget().state()}
+
+
 @app.get("/", response_class=HTMLResponse)
 def index(request: Request) -> HTMLResponse:
     return templates.TemplateResponse(
@@ -66,7 +164,7 @@ def index(request: Request) -> HTMLResponse:
         {
             "request": request,
             "default_persist": True,
-            "samples": _load_samples_index(),
+            "samples": sample_catalog.samples(),
             "raw_input": "",
         },
     )
@@ -76,29 +174,58 @@ async def summarize_route(
     request: Request,
     intake_text: str = Form(default=""),
     persist: bool = Form(default=True),
-    file: UploadFile | None = File(default=None),
+    file: list[UploadFile] = File(default=[]),
     chaos_enabled: bool = Form(default=False),
     chaos_rate: float = Form(default=0.0),
     chaos_seed: str = Form(default=""),
 ) -> HTMLResponse:
     text = (intake_text or "").strip()
+    uploads = [f for f in file if f.filename]
+    client_override = _chaos_override(chaos_enabled, chaos_rate, chaos_seed)
+
+    if _is_multi_upload(uploads):
+        try:
+            results = await _summarize_upload_batch(
+                uploads, persist, client_override, (chaos_enabled, chaos_rate, chaos_seed)
+            )
+        except UploadTooLarge as e:
+            return templates.TemplateResponse(
+                "index.html",
+                {
+                    "request": request,
+                    "default_persist": persist,
+                    "samples": sample_catalog.samples(),
+                    "error_message": str(e),
+                    "raw_input": text,
+                },
+                status_code=200,
+            )
+        return templates.TemplateResponse(
+            "batch_result.html",
+            {
+                "request": request,
+                "results": results,
+                "ok": sum(r.status == "ok" for r in results),
+                "failed": sum(r.status == "failed" for r in results),
+            },
+        )
 
     # file overrides paste
-    if file is not None and file.filename:
-        raw = await file.read()
-        if len(raw) > MAX_UPLOAD_BYTES:
+    if uploads:
+        try:
+            file_text = (await read_upload_text(uploads[0], max_bytes=MAX_UPLOAD_BYTES)).strip()
+        except UploadTooLarge:
             return templates.TemplateResponse(
                 "index.html",
                 {
                     "request": request,
                     "default_persist": persist,
-                    "samples": _load_samples_index(),
+                    "samples": sample_catalog.samples(),
                     "error_message": "Uploaded file is too large. Please upload a smaller .txt file.",
                     "raw_input": text,
                 },
                 status_code=200,
             )
-        file_text = _decode_upload(file, raw).strip()
         if file_text:
             text = file_text
 
@@ -108,24 +235,16 @@ async def summarize_route(
             {
                 "request": request,
                 "default_persist": persist,
-                "samples": _load_samples_index(),
+                "samples": sample_catalog.samples(),
                 "error_message": "Please paste intake text or upload a .txt file.",
             },
             status_code=200,
         )
 
-    s = get_settings()
-    client_override: Optional[LLMClient] = None
-    if s.llm_provider == "mock":
-        seed_val = int(chaos_seed) if chaos_seed.strip().isdigit() else None
-        client_override = MockLLMClient(
-            chaos_enabled=chaos_enabled,
-            chaos_rate=chaos_rate,
-            chaos_seed=seed_val,
-        )
-
     try:
-        summary, out_path = _run_pipeline(text, persist=persist, client_override=client_override)
+        summary, out_path = await _run_pipeline_coalesced(
+            text, persist, client_override, (chaos_enabled, chaos_rate, chaos_seed)
+        )
         return templates.TemplateResponse(
             "result.html",
             {
@@ -157,41 +276,42 @@ async def summarize_route(
 async def api_summarize(
     intake_text: str = Form(default=""),
     persist: bool = Form(default=True),
-    file: UploadFile | None = File(default=None),
+    file: list[UploadFile] = File(default=[]),
     chaos_enabled: bool = Form(default=False),
     chaos_rate: float = Form(default=0.0),
     chaos_seed: str = Form(default=""),
 ) -> JSONResponse:
     text = (intake_text or "").strip()
+    uploads = [f for f in file if f.filename]
+    client_override = _chaos_override(chaos_enabled, chaos_rate, chaos_seed)
+
+    # Several files or a zip: batch-shaped body, one result per file (with its filename)
+    if _is_multi_upload(uploads):
+        try:
+            results = await _summarize_upload_batch(
+                uploads, persist, client_override, (chaos_enabled, chaos_rate, chaos_seed)
+            )
+        except UploadTooLarge as e:
+            return JSONResponse(status_code=413, content={"status": "error", "error": str(e)})
+        return FastJSONResponse(content=batch_response_body(results))
 
     # file overrides paste
-    if file is not None and file.filename:
-        raw = await file.read()
-        if len(raw) > MAX_UPLOAD_BYTES:
-            return JSONResponse(
-                status_code=400,
-                content={"status": "error", "error": f"File too large (max {MAX_UPLOAD_BYTES} bytes)."},
-            )
-        file_text = _decode_upload(file, raw).strip()
+    if uploads:
+        try:
+            file_text = (await read_upload_text(uploads[0], max_bytes=MAX_UPLOAD_BYTES)).strip()
+        except UploadTooLarge as e:
+            return JSONResponse(status_code=413, content={"status": "error", "error": str(e)})
         if file_text:
             text = file_text
 
     if not text:
         return JSONResponse(status_code=400, content={"status": "error", "error": "No intake text provided."})
 
-    s = get_settings()
-    client_override: Optional[LLMClient] = None
-    if s.llm_provider == "mock":
-        seed_val = int(chaos_seed) if chaos_seed.strip().isdigit() else None
-        client_override = MockLLMClient(
-            chaos_enabled=chaos_enabled,
-            chaos_rate=chaos_rate,
-            chaos_seed=seed_val,
-        )
-
     try:
-        summary, out_path = _run_pipeline(text, persist=persist, client_override=client_override)
-        return JSONResponse(content={"status": "ok", "summary": summary.model_dump(), "out_path": out_path})
+        summary, out_path = await _run_pipeline_coalesced(
+            text, persist, client_override, (chaos_enabled, chaos_rate, chaos_seed)
+        )
+        return FastJSONResponse(content={"status": "ok", "summary": summary, "out_path": out_path})
     except RetryableLLMError as e:
         return JSONResponse(status_code=503, content={"status": "error", "error": str(e)})
     except ValueError as e:
@@ -200,6 +320,22 @@ async def api_summarize(
         return JSONResponse(status_code=500, content={"status": "error", "error": f"Unexpected error: {e}"})
 
 
+async def _run_batch_item(text: str, persist: bool) -> tuple[IntakeSummary, Optional[str]]:
+    # Batch items use the configured provider (no per-request chaos override)
+    return await _run_pipeline_coalesced(text, persist, None, (False, 0.0, ""))
+
+
+@app.post("/api/summarize/batch")
+async def api_summarize_batch(req: BatchRequest, stream: bool = False):
+    error = check_batch_size(req)
+    if error:
+        return JSONResponse(status_code=413, content={"status": "error", "error": error})
+
+    if stream:
+        return StreamingResponse(iter_ndjson(req, _run_batch_item), media_type="application/x-ndjson")
+    return FastJSONResponse(content=batch_response_body(await run_batch(req, _run_batch_item)))
+
+
 @app.get("/download")
 def download_example() -> RedirectResponse:
     return RedirectResponse(url="/", status_code=302)
@@ -210,6 +346,9 @@ from fastapi.responses import PlainTextResponse
 SAMPLES_DIR = BASE_DIR / "samples"
 SAMPLES_INDEX = SAMPLES_DIR / "index.json"
 
+# Catalog + texts loaded once here; reloaded when the files change (see samples.py)
+sample_catalog = SampleCatalog(SAMPLES_DIR, check_interval=get_settings().samples_check_seconds)
+
 SAMPLES = {
     "emergency": ("Emergency: Chest pain + SOB", "emergency_chest_pain.txt"),
     "telehealth": ("Telehealth: URI symptoms", "telehealth_upper_respiratory.txt"),
@@ -217,8 +356,27 @@ SAMPLES = {
 }
 
 @app.get("/api/samples")
-def api_samples() -> dict:
-    return {"samples": _load_samples_index()}
+def api_samples() -> Response:
+    # Pre-rendered body + ETag; ConditionalGetMiddleware answers If-None-Match with 304
+    snap = sample_catalog.snapshot()
+    return Response(content=snap.body, media_type="application/json", headers={"ETag": snap.etag})
+
+
+def _require_admin(request: Request) -> None:
+    # Admin-only: disabled unless ADMIN_TOKEN is set, then the caller must send it
+    token = get_settings().admin_token
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(request.headers.get("x-admin-token", ""), token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@app.post("/admin/samples/reload")
+def admin_reload_samples(request: Request) -> dict:
+    # Force a re-read of samples/ (normally picked up within SAMPLES_CHECK_SECONDS)
+    _require_admin(request)
+    snap = sample_catalog.reload()
+    return {"status": "ok", "samples": len(snap.samples), "etag": snap.etag}
 
 @app.get("/api/samples/{sample_id}")
 def api_sample_text(sample_id: str) -> dict:
@@ -235,26 +393,8 @@ def get_sample(sample_id: str):
     return path.read_text(encoding="utf-8")
 
 
-def _load_samples_index() -> list[dict]:
-    if not SAMPLES_INDEX.exists():
-        return []
-    data = json.loads(SAMPLES_INDEX.read_text(encoding="utf-8"))
-    samples = data.get("samples", [])
-    # Only include entries whose files exist
-    out = []
-    for s in samples:
-        fn = s.get("filename")
-        if not fn:
-            continue
-        if (SAMPLES_DIR / fn).exists():
-            out.append(s)
-    return out
-
-
 def _read_sample_text(sample_id: str) -> str:
-    samples = _load_samples_index()
-    match = next((s for s in samples if s.get("id") == sample_id), None)
-    if not match:
+    text = sample_catalog.text(sample_id)
+    if text is None:
         raise HTTPException(status_code=404, detail="Sample not found")
-    path = SAMPLES_DIR / match["filename"]
-    return path.read_text(encoding="utf-8")
\ No newline at end of file
+    return text
\ No newline at end of file
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from pydantic import BaseModel, Field
+
+from intake_summarizer.jsonio import dumps_line
+from intake_summarizer.persist_failures import persist_failure
+from intake_summarizer.results import IntakeResult
+from intake_summarizer.schema import IntakeSummary
+from intake_summarizer.settings import get_settings
+from intake_summarizer.summarize import NonRetryableLLMError, RetryableLLMError
+from intake_summarizer.tracing import IntakeTrace, intake_trace
+
+_logger = logging.getLogger(__name__)
+
+# (text, persist) -> (summary, out_path); each app passes its own coalesced pipeline
+PipelineFn = Callable[[str, bool], Awaitable[tuple[IntakeSummary, Optional[str]]]]
+
+
+class BatchItem(BaseModel):
+    text: str = Field(..., min_length=1, max_length=10_000)
+    persist: bool = Field(default=True, description="If true, writes output JSON to out/")
+
+
+class BatchRequest(BaseModel):
+    items: list[BatchItem] = Field(..., min_length=1)
+    max_concurrency: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Upper bound on items processed at once (capped by BATCH_MAX_CONCURRENCY).",
+    )
+
+
+class BatchItemResult(IntakeResult):
+    index: int
+    summary: Optional[IntakeSummary] = None
+    filename: Optional[str] = None  # multi-file uploads (see uploads.py)
+
+
+async def _process_item(index: int, item: BatchItem, run: PipelineFn) -> BatchItemResult:
+    text = item.text.strip()
+    if not text:
+        return BatchItemResult(index=index, status="failed", error_type="ValueError", error_message="No intake text provided.")
+
+    with intake_trace("batch_item", index=index) as tr:
+        return await _run_item(index, text, item.persist, run, tr)
+
+
+async def _run_item(index: int, text: str, persist: bool, run: PipelineFn, tr: IntakeTrace) -> BatchItemResult:
+    try:
+        summary, out_path = await run(text, persist)
+        return BatchItemResult(index=index, status="ok", out_path=out_path, summary=summary, **tr.summary())
+
+    except (RetryableLLMError, NonRetryableLLMError) as e:
+        # Same failure artifact as the batch flow's t_process_one
+        s = get_settings()
+        try:
+            fail_path = await asyncio.to_thread(
+                persist_failure,
+                text=text,
+                provider=s.llm_provider,
+                model=s.llm_model,
+                error_type=type(e).__name__,
+                error_message=str(e),
+                raw_output=getattr(e, "raw", None),
+            )
+        except Exception:
+            # The item still fails on its own; a broken failure store must not take the batch down
+            _logger.exception("Could not write failure artifact for batch item %d", index)
+            fail_path = None
+        return BatchItemResult(
+            index=index,
+            status="failed",
+            error_type=type(e).__name__,
+            error_message=str(e),
+            failure_artifact=str(fail_path) if fail_path is not None else None,
+            **tr.summary(),
+        )
+
+    except Exception as e:
+        return BatchItemResult(
+            index=index, status="failed", error_type=type(e).__name__, error_message=str(e), **tr.summary()
+        )
+
+
+def _concurrency(req: BatchRequest) -> int:
+    limit = get_settings().batch_max_concurrency
+    return min(req.max_concurrency or limit, limit)
+
+
+async def iter_batch(req: BatchRequest, run: PipelineFn) -> AsyncIterator[BatchItemResult]:
+    """
+    Process every item with at most _concurrency(req) in flight, yielding results as they finish.
+    A failing item becomes a failed result; it never fails the batch.
+    """
+    sem = asyncio.Semaphore(_concurrency(req))
+
+    async def bounded(index: int, item: BatchItem) -> BatchItemResult:
+        async with sem:
+            return await _process_item(index, item, run)
+
+    tasks = [asyncio.ensure_future(bounded(i, item)) for i, item in enumerate(req.items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away mid-stream: stop the remaining work
+        for t in tasks:
+            t.cancel()
+
+
+async def run_batch(req: BatchRequest, run: PipelineFn) -> list[BatchItemResult]:
+    results = [r async for r in iter_batch(req, run)]
+    return sorted(results, key=lambda r: r.index)
+
+
+async def iter_ndjson(req: BatchRequest, run: PipelineFn) -> AsyncIterator[bytes]:
+    async for r in iter_batch(req, run):
+        yield dumps_line(r)
+
+
+def batch_response_body(results: list[BatchItemResult]) -> dict:
+    ok = sum(1 for r in results if r.status == "ok")
+    return {
+        "status": "ok",
+        "count": len(results),
+        "ok": ok,
+        "failed": len(results) - ok,
+        "results": results,  # models; rendered by FastJSONResponse without a dict copy
+    }
+
+
+def check_batch_size(req: BatchRequest) -> Optional[str]:
+    limit = get_settings().batch_max_items
+    if len(req.items) > limit:
+        return f"Too many items (max {limit} per batch)."
+    return None
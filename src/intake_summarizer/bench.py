@@ -0,0 +1,266 @@
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+# Building blocks for the synthetic corpus: neutral filler plus the phrases the heuristics look for
+FILLER = (
+    "Patient called the front desk this morning.",
+    "Reports sleeping poorly and feeling tired.",
+    "No recent travel.",
+    "Lives with spouse, works from home.",
+    "Has been drinking plenty of fluids.",
+    "Would like to be seen at the earliest convenience.",
+    "Took over-the-counter medication with little relief.",
+    "Denies any known allergies to medication.",
+    "Mentions a similar episode last year.",
+    "Prefers a morning appointment if possible.",
+)
+DURATIONS = (
+    "since yesterday",
+    "for 3 days",
+    "for two weeks",
+    "for a few days",
+    "for several days",
+    "for 6 hours",
+    "for 2 months",
+    "started today",
+)
+
+# (label, words per intake range, share of sentences carrying a keyword phrase)
+LENGTHS = {"short": (8, 30), "medium": (60, 160), "long": (400, 900)}
+DENSITIES = {"none": 0.0, "low": 0.1, "high": 0.5}
+
+
+def _keyword_phrases() -> List[str]:
+    from intake_summarizer.llm_client import KEYWORD_MATCHER
+
+    return list(KEYWORD_MATCHER.phrases)
+
+
+def generate_corpus(
+    n: int,
+    *,
+    seed: int = 0,
+    lengths: Sequence[str] = tuple(LENGTHS),
+    densities: Sequence[str] = tuple(DENSITIES),
+) -> List[str]:
+    """
+    Deterministic synthetic intakes, cycling through every length x keyword-density mix.
+    Keyword sentences use the real lexicon, so red flags, urgency and triage all get exercised.
+    """
+    rng = random.Random(seed)
+    phrases = _keyword_phrases()
+    mixes = [(LENGTHS[l], DENSITIES[d]) for l in lengths for d in densities]
+    corpus = []
+    for i in range(n):
+        (lo, hi), density = mixes[i % len(mixes)]
+        target = rng.randint(lo, hi)
+        sentences: List[str] = []
+        words = 0
+        while words < target:
+            if rng.random() < density:
+                sentence = f"Reports {rng.choice(phrases)} {rng.choice(DURATIONS)}."
+            else:
+                sentence = rng.choice(FILLER)
+            sentences.append(sentence)
+            words += sentence.count(" ") + 1
+        corpus.append(" ".join(sentences))
+    return corpus
+
+
+def _time_rounds(fn: Callable[[], None], n_ops: int, rounds: int) -> Dict[str, float]:
+    fn()  # warm up caches / lazy imports
+    per_op_us = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter_ns()
+            fn()
+            per_op_us.append((time.perf_counter_ns() - start) / n_ops / 1000)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    median = statistics.median(per_op_us)
+    return {
+        "per_op_us_median": round(median, 3),
+        "per_op_us_min": round(min(per_op_us), 3),
+        "ops_per_sec": round(1e6 / median, 1) if median else None,
+        "rounds": rounds,
+        "ops_per_round": n_ops,
+    }
+
+
+def _benchmarks(corpus: List[str], workdir: Path) -> Dict[str, Callable[[], None]]:
+    from intake_summarizer import app
+    from intake_summarizer.llm_client import KEYWORD_MATCHER, MockLLMClient, _build_red_flags, _extract_duration
+    from intake_summarizer.persist import FileStore, SqliteStore, content_key
+    from intake_summarizer.schema import IntakeSummary
+    from intake_summarizer.summarize import _parse_summary
+    from intake_summarizer.validate import enforce_business_rules
+
+    client = MockLLMClient()
+    raws = [client.summarize(t) for t in corpus]
+    payloads = [json.loads(r) for r in raws]
+    summaries = [IntakeSummary.model_validate(p) for p in payloads]
+    hits = [KEYWORD_MATCHER.scan(t) for t in corpus]
+    keys = [content_key(t) for t in corpus]
+
+    # Both backends write into the scratch dir, built directly so PERSIST_BACKEND and out/ are untouched
+    file_store = FileStore(workdir)
+    sqlite_store = SqliteStore(workdir / "bench.db")
+
+    def mock_summarize():
+        for t in corpus:
+            client.summarize(t)
+
+    def extract_duration():
+        for t in corpus:
+            _extract_duration(t)
+
+    def build_red_flags():
+        for h in hits:
+            _build_red_flags(h)
+
+    def business_rules():
+        for s, t in zip(summaries, corpus):
+            enforce_business_rules(s, t)
+
+    def model_validate():
+        for p in payloads:
+            IntakeSummary.model_validate(p)
+
+    def parse_validate():
+        for r in raws:
+            _parse_summary(r)
+
+    def persist_file():
+        for k, s in zip(keys, summaries):
+            file_store.put(k, s)
+
+    def persist_sqlite_batch():
+        sqlite_store.put_many(zip(keys, summaries))
+
+    def pipeline():
+        # explicit client: bypasses the summary cache, so the whole path runs every time
+        for t in corpus:
+            app._run_pipeline(t, persist=False, client_override=client)
+
+    return {
+        "mock_summarize": mock_summarize,
+        "extract_duration": extract_duration,
+        "build_red_flags": build_red_flags,
+        "enforce_business_rules": business_rules,
+        "model_validate": model_validate,
+        "parse_validate": parse_validate,
+        "persist_summary_file": persist_file,
+        "persist_sqlite_put_many": persist_sqlite_batch,
+        "run_pipeline": pipeline,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(
+    *,
+    corpus_size: int = 300,
+    rounds: int = 5,
+    seed: int = 0,
+    only: Sequence[str] | None = None,
+) -> dict:
+    corpus = generate_corpus(corpus_size, seed=seed)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="intake-bench-") as tmp:
+        benches = _benchmarks(corpus, Path(tmp))
+        for name, fn in benches.items():
+            if only and name not in only:
+                continue
+            results[name] = _time_rounds(fn, len(corpus), rounds)
+            print(f"{name:<26} {results[name]['per_op_us_median']:>12.2f} us/op", file=sys.stderr, flush=True)
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp_utc": datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "corpus_size": corpus_size,
+            "corpus_seed": seed,
+            "rounds": rounds,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, *, threshold: float = 0.15) -> List[str]:
+    """Names of benchmarks whose median per-op time grew by more than `threshold` (0.15 = 15%)."""
+    regressions = []
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base or not base["per_op_us_median"]:
+            continue
+        ratio = cur["per_op_us_median"] / base["per_op_us_median"]
+        flag = "REGRESSION" if ratio > 1 + threshold else ""
+        print(
+            f"{name:<26} {base['per_op_us_median']:>10.2f} -> {cur['per_op_us_median']:>10.2f} us/op  "
+            f"x{ratio:.2f} {flag}"
+        )
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the summarization hot paths on a synthetic corpus")
+    parser.add_argument("--corpus-size", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", default=None, help="Comma-separated benchmark names")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Result JSON (default: out/bench/<commit>.json)",
+    )
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline result JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.15,
+        help="Allowed slowdown vs the baseline before failing (0.15 = 15%%)",
+    )
+    args = parser.parse_args()
+
+    only = args.only.split(",") if args.only else None
+    report = run_benchmarks(corpus_size=args.corpus_size, rounds=args.rounds, seed=args.seed, only=only)
+
+    output = args.output or Path("out") / "bench" / f"{report['meta']['commit'] or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Wrote {output}", file=sys.stderr)
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(baseline, report, threshold=args.threshold)
+        if regressions:
+            print(f"Regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from intake_summarizer.llm_client import SYSTEM_PROMPT, openai_schema_from_pydantic
+from intake_summarizer.schema import IntakeSummary
+from intake_summarizer.settings import get_settings
+
+# Changes whenever the prompt or the output schema changes, so stale entries are never served
+PROMPT_SCHEMA_VERSION = hashlib.sha256(
+    (SYSTEM_PROMPT + json.dumps(openai_schema_from_pydantic(), sort_keys=True)).encode("utf-8")
+).hexdigest()[:12]
+
+
+def cache_key(text: str, *, provider: str, model: str) -> str:
+    material = f"{provider}|{model}|{PROMPT_SCHEMA_VERSION}|{text}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """
+    Read-through cache of validated summaries, keyed by cache_key().
+    - Tier 1: in-process LRU bounded by max_entries, entries expire after ttl_seconds.
+    - Tier 2 (optional): one JSON file per key under disk_dir, shared by every
+      worker/CLI run pointing at the same directory; same TTL via file mtime.
+    Values are stored as JSON and re-validated on read, so callers always get
+    a fresh IntakeSummary they can mutate; a disk entry that fails validation is deleted
+    and counted as a miss.
+    """
+
+    def __init__(self, *, max_entries: int = 1024, ttl_seconds: float = 3600.0, disk_dir: Path | None = None) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self._mem: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> IntakeSummary | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None:
+                expires_at, data = entry
+                if expires_at > now:
+                    self._mem.move_to_end(key)
+                    self.memory_hits += 1
+                    return IntakeSummary.model_validate_json(data)
+                del self._mem[key]
+
+        data = self._disk_get(key)
+        if data is not None:
+            try:
+                summary = IntakeSummary.model_validate_json(data)
+            except ValueError:  # ValidationError included: truncated or foreign file
+                self._disk_drop(key)
+            else:
+                self._mem_put(key, data)
+                with self._lock:
+                    self.disk_hits += 1
+                return summary
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, summary: IntakeSummary) -> None:
+        data = summary.model_dump_json()
+        self._mem_put(key, data)
+        self._disk_put(key, data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "memory_entries": len(self._mem),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+
+    def _mem_put(self, key: str, data: str) -> None:
+        with self._lock:
+            self._mem[key] = (time.monotonic() + self.ttl_seconds, data)
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.max_entries:
+                self._mem.popitem(last=False)
+                self.evictions += 1
+
+    def _disk_path(self, key: str) -> Path:
+        # Fan out into 256 subdirectories to keep directories small
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _disk_get(self, key: str) -> str | None:
+        if self.disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl_seconds:
+                return None
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        except UnicodeDecodeError:
+            self._disk_drop(key)
+            return None
+
+    def _disk_drop(self, key: str) -> None:
+        # A corrupt entry is a miss; remove it so the next put() rewrites it
+        self._disk_path(key).unlink(missing_ok=True)
+
+    def _disk_put(self, key: str, data: str) -> None:
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique temp name per writer; replace is atomic so concurrent workers never see partial files
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(data, encoding="utf-8")
+        tmp_path.replace(path)
+
+
+_cache: tuple[tuple, SummaryCache] | None = None  # (settings it was built from, cache)
+_cache_lock = threading.Lock()
+
+
+def get_summary_cache() -> SummaryCache | None:
+    """
+    Process-wide cache built from Settings, or None when SUMMARY_CACHE=0 or the mock
+    provider runs with MOCK_CHAOS=1 (cached successes would hide the injected failures).
+    Rebuilt (empty) only when its size / TTL / directory settings change.
+    """
+    global _cache
+    s = get_settings()
+    if not s.summary_cache_enabled or (s.llm_provider == "mock" and s.mock_chaos):
+        return None
+    key = (s.summary_cache_size, s.summary_cache_ttl_seconds, s.summary_cache_dir)
+    with _cache_lock:
+        if _cache is None or _cache[0] != key:
+            _cache = (
+                key,
+                SummaryCache(
+                    max_entries=s.summary_cache_size,
+                    ttl_seconds=s.summary_cache_ttl_seconds,
+                    disk_dir=Path(s.summary_cache_dir) if s.summary_cache_dir else None,
+                ),
+            )
+        return _cache[1]
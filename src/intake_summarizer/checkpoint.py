@@ -0,0 +1,91 @@
+import json
+import os
+from pathlib import Path
+
+from intake_summarizer.persist import content_key, summary_exists
+from intake_summarizer.jsonio import dumps_line
+from intake_summarizer.results import IntakeResult
+
+
+class RunManifest:
+    """
+    Append-only JSONL checkpoint for a batch run: one line per finished intake
+    ({"key", "id", "status", ...}); the last line for a key wins on reload.
+    - Safe to append from several threads or processes: each record is a single
+      O_APPEND write of one short line.
+    - A rerun with the same manifest skips intakes whose latest status is "ok";
+      failures are retried.
+    - A torn last line from a crash is ignored on load and terminated, so the next append
+      starts on a fresh line.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.done: set[str] = set()
+        self.failed: set[str] = set()
+        self.skipped = 0  # inputs skipped this run (cli.skip_completed)
+        if self.path.exists():
+            self._load()
+            _end_torn_line(self.path)
+
+    def _load(self) -> None:
+        with self.path.open(encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn last line from a crash
+                key = record.get("key")
+                if not key:
+                    continue
+                if record.get("status") == "ok":
+                    self.done.add(key)
+                    self.failed.discard(key)
+                else:
+                    self.failed.add(key)
+                    self.done.discard(key)
+
+    def should_skip(self, text: str, *, check_persisted: bool = True) -> bool:
+        """True if this intake already completed, per the manifest or an existing output file."""
+        key = content_key(text)
+        if key in self.done:
+            return True
+        return check_persisted and key not in self.failed and summary_exists(key)
+
+    def record(self, text: str, result: IntakeResult, intake_id: str | None = None) -> None:
+        append_record(self.path, text, result, intake_id)
+        key = content_key(text)
+        if result.status == "ok":
+            self.done.add(key)
+            self.failed.discard(key)
+        else:
+            self.failed.add(key)
+            self.done.discard(key)
+
+
+def append_record(path: Path, text: str, result: IntakeResult, intake_id: str | None = None) -> None:
+    """Append one checkpoint line without loading the manifest (used from worker tasks)."""
+    record = {"key": content_key(text), "id": intake_id, **result.model_dump()}
+    data = dumps_line(record)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+def _end_torn_line(path: Path) -> None:
+    # A crash mid-write leaves a line without "\n"; end it so the next record isn't glued onto it
+    with path.open("rb") as fh:
+        if fh.seek(0, os.SEEK_END) == 0:
+            return
+        fh.seek(-1, os.SEEK_END)
+        if fh.read(1) == b"\n":
+            return
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+    try:
+        os.write(fd, b"\n")
+    finally:
+        os.close(fd)
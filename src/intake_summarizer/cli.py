@@ -1,9 +1,18 @@
 import argparse
+import json
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List
+from typing import IO, Iterator, List, Tuple
 
-from intake_summarizer.flow import intake_batch_flow
+from intake_summarizer.checkpoint import RunManifest
+from intake_summarizer.flow import TASK_RUNNERS, build_task_runner, intake_batch_flow, process_one, replay_failures_flow
+from intake_summarizer.persist_failures import parse_seconds, select_failures
+from intake_summarizer.jsonio import dumps_line
 from intake_summarizer.results import IntakeResult
+from intake_summarizer.settings import install_reload_signal
+
+INPUT_FORMATS = ("auto", "lines", "jsonl")
 
 
 def read_inputs(path: Path) -> List[str]:
@@ -22,6 +31,106 @@ def read_inputs(path: Path) -> List[str]:
     return lines
 
 
+def iter_inputs(path: Path, fmt: str = "auto") -> Iterator[Tuple[str, str | None, str | None]]:
+    """
+    Lazily yield (id, text, error) per non-blank input line; the file is never loaded whole.
+    - lines: one intake per line, id = line number
+    - jsonl: {"id": ..., "text": ...} per line (id defaults to the line number)
+    - auto: jsonl for *.jsonl / *.ndjson files, else lines
+    A malformed JSONL line yields (id, None, error) so the run can record it and move on.
+    """
+    if not path.exists():
+        raise FileNotFoundError(f"Input file not found: {path}")
+    if fmt == "auto":
+        fmt = "jsonl" if path.suffix.lower() in (".jsonl", ".ndjson") else "lines"
+
+    with path.open(encoding="utf-8") as fh:
+        for lineno, line in enumerate(fh, 1):
+            line = line.strip()
+            if not line:
+                continue
+            if fmt == "lines":
+                yield str(lineno), line, None
+                continue
+            try:
+                record = json.loads(line)
+                text = str(record["text"]).strip()
+                if not text:
+                    raise ValueError("empty text")
+                yield str(record.get("id", lineno)), text, None
+            except (ValueError, KeyError, TypeError) as e:
+                yield str(lineno), None, f"Invalid input line {lineno}: {e}"
+
+
+def _write_record(out: IO[str], intake_id: str, result: IntakeResult) -> None:
+    out.write(dumps_line({"id": intake_id, **result.model_dump()}).decode("utf-8"))
+    out.flush()
+
+
+def run_streaming(
+    inputs: Iterator[Tuple[str, str | None, str | None]],
+    out: IO[str],
+    *,
+    window: int = 64,
+    workers: int = 8,
+    progress_every: int = 1000,
+    manifest: RunManifest | None = None,
+) -> Tuple[int, int]:
+    """
+    Process inputs with at most `window` intakes in flight and write one JSONL record
+    per intake as soon as it finishes (completion order). Memory stays bounded by the
+    window, whatever the input size. With a manifest, each finished intake is also
+    checkpointed. Returns (ok, failed).
+    """
+    ok = failed = 0
+    pending: dict[Future, Tuple[str, str]] = {}
+
+    def drain(block_until_below: int) -> None:
+        nonlocal ok, failed
+        while len(pending) > block_until_below:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    # Unexpected errors stay with their intake, like LLM failures do
+                    result = IntakeResult(status="failed", error_type=type(e).__name__, error_message=str(e))
+                intake_id, text = pending.pop(fut)
+                _write_record(out, intake_id, result)
+                if manifest is not None:
+                    manifest.record(text, result, intake_id)
+                if result.status == "ok":
+                    ok += 1
+                else:
+                    failed += 1
+                if progress_every and (ok + failed) % progress_every == 0:
+                    print(f"processed={ok + failed} ok={ok} failed={failed}", file=sys.stderr, flush=True)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for intake_id, text, error in inputs:
+            if error is not None:
+                failed += 1
+                _write_record(out, intake_id, IntakeResult(status="failed", error_type="InvalidInput", error_message=error))
+                continue
+            pending[pool.submit(process_one, text)] = (intake_id, text)
+            drain(window - 1)
+        drain(0)
+
+    return ok, failed
+
+
+def skip_completed(
+    inputs: Iterator[Tuple[str, str | None, str | None]],
+    manifest: RunManifest,
+) -> Iterator[Tuple[str, str | None, str | None]]:
+    """Drop inputs the manifest (or out/) already has; counted in manifest.skipped (ids aren't kept)."""
+    for intake_id, text, error in inputs:
+        if text is not None and manifest.should_skip(text):
+            manifest.skipped += 1
+            continue
+        yield intake_id, text, error
+
+
 def print_summary(results: List[IntakeResult]) -> None:
     ok = sum(1 for r in results if r.status == "ok")
     failed = len(results) - ok
@@ -44,20 +153,119 @@ def print_summary(results: List[IntakeResult]) -> None:
         print()
 
 
+def replay_main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="intake-batch replay-failures",
+        description="Reprocess unresolved failures from out/fail (needs FAILURE_KEEP_INPUT=1 at failure time)",
+    )
+    parser.add_argument("--error-type", default=None, help="e.g. RetryableLLMError")
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--since", default=None, help="Only failures newer than this, e.g. 30m, 6h, 2d")
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--task-runner", choices=TASK_RUNNERS, default=None)
+    parser.add_argument("--max-workers", type=int, default=None, help="Failures replayed at once")
+    parser.add_argument("--dry-run", action="store_true", help="List the selected failures and exit")
+    args = parser.parse_args(argv)
+
+    since = parse_seconds(args.since) if args.since else None
+    if args.dry_run:
+        for row in select_failures(error_type=args.error_type, model=args.model, since_seconds=since, limit=args.limit):
+            print(f"{row['key']}  {row['error_type']}  {row['provider']}:{row['model']}")
+        return
+
+    runner = build_task_runner(args.task_runner, args.max_workers)
+    results = replay_failures_flow.with_options(task_runner=runner)(
+        error_type=args.error_type, model=args.model, since_seconds=since, limit=args.limit
+    )
+    print_summary(list(results.values()))
+    print(f"Resolved: {sum(1 for r in results.values() if r.status == 'ok')}")
+
+
 def main() -> None:
+    install_reload_signal()  # long batches pick up limit changes on SIGHUP
+    if len(sys.argv) > 1 and sys.argv[1] == "replay-failures":
+        replay_main(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(
-        description="Run intake summarizer batch from a text file"
+        description="Run intake summarizer batch from a text file "
+        "(or: replay-failures --help)"
     )
     parser.add_argument(
         "input_file",
         type=Path,
         help="Path to inputs.txt (one intake per line)",
     )
+    parser.add_argument(
+        "--task-runner",
+        choices=TASK_RUNNERS,
+        default=None,
+        help="Prefect task runner (default: FLOW_TASK_RUNNER or threads)",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=None,
+        help="Worker threads/processes for the task runner (default: FLOW_MAX_WORKERS or Prefect's default)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream inputs lazily and write results to --output as they finish (for very large files)",
+    )
+    parser.add_argument(
+        "--input-format",
+        choices=INPUT_FORMATS,
+        default="auto",
+        help="Input format for --stream (auto: jsonl for .jsonl/.ndjson, else one intake per line)",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path("out") / "results.jsonl",
+        help="Result JSONL for --stream (use - for stdout)",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=None,
+        help="Checkpoint file; rerunning with the same manifest skips intakes already done and retries failures",
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=64,
+        help="Max intakes in flight in --stream mode",
+    )
 
     args = parser.parse_args()
 
+    if args.stream:
+        inputs = iter_inputs(args.input_file, args.input_format)
+        manifest = RunManifest(args.manifest) if args.manifest else None
+        if manifest is not None:
+            inputs = skip_completed(inputs, manifest)
+        workers = args.max_workers or min(args.window, 32)
+        kwargs = {"window": args.window, "workers": workers, "manifest": manifest}
+        if str(args.output) == "-":
+            ok, failed = run_streaming(inputs, sys.stdout, **kwargs)
+        else:
+            args.output.parent.mkdir(parents=True, exist_ok=True)
+            # Append when resuming so earlier results are kept
+            mode = "a" if manifest is not None else "w"
+            with args.output.open(mode, encoding="utf-8") as out:
+                ok, failed = run_streaming(inputs, out, **kwargs)
+        print(
+            f"\nStream complete. total={ok + failed} ok={ok} failed={failed} "
+            f"skipped={manifest.skipped if manifest else 0} output={args.output}",
+            file=sys.stderr,
+        )
+        return
+
     texts = read_inputs(args.input_file)
-    results = intake_batch_flow(texts)
+    runner = build_task_runner(args.task_runner, args.max_workers)
+    manifest_path = str(args.manifest) if args.manifest else None
+    results = intake_batch_flow.with_options(task_runner=runner)(texts, manifest_path=manifest_path)
 
     print_summary(results)
 
@@ -0,0 +1,126 @@
+import asyncio
+import atexit
+import threading
+import weakref
+from contextlib import asynccontextmanager
+
+from intake_summarizer.llm_client import (
+    AsyncLLMClient,
+    AsyncOpenAILLMClient,
+    LLMClient,
+    OpenAILLMClient,
+)
+from intake_summarizer.settings import Settings, get_settings, install_reload_signal
+
+# Process-wide registry of long-lived LLM clients, keyed by (provider, model).
+# Reusing one client keeps its HTTP connection pool warm (no TCP/TLS handshake per intake).
+_SYNC_FACTORIES = {"openai": OpenAILLMClient}
+_ASYNC_FACTORIES = {"openai": AsyncOpenAILLMClient}
+
+_lock = threading.Lock()
+# (provider, model) -> (inputs it was built from, client)
+_sync_clients: dict[tuple[str, str], tuple[tuple, LLMClient]] = {}
+# Async HTTP pools are bound to the event loop that created them
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple[str, str], tuple[tuple, AsyncLLMClient]]]" = (
+    weakref.WeakKeyDictionary()
+)
+# Replaced after a settings reload. The latest one may still have calls in flight, so it stays open
+# until the next replacement (which closes it) or shutdown; the list never holds more than one client.
+_retired_sync: list[LLMClient] = []
+_retired_async: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, list[AsyncLLMClient]]" = weakref.WeakKeyDictionary()
+# aclose() tasks of async retirees, referenced until they finish
+_closing: set[asyncio.Task] = set()
+
+
+def _client_inputs(s: Settings) -> tuple:
+    # Every setting a client is built from: a reload rebuilds the client only if one of these changed
+    return (
+        s.openai_api_key,
+        s.openai_base_url,
+        s.openai_timeout_seconds,
+        s.openai_max_connections,
+        s.openai_max_keepalive,
+        s.openai_keepalive_expiry,
+        s.openai_http2,
+        s.rate_limit_enabled,
+    )
+
+
+def get_pooled_client() -> LLMClient:
+    """Return the shared sync client for the configured provider/model, creating it on first use."""
+    s = get_settings()
+    key = (s.llm_provider, s.llm_model)
+    inputs = _client_inputs(s)
+    with _lock:
+        entry = _sync_clients.get(key)
+        if entry is not None and entry[0] == inputs:
+            return entry[1]
+        if s.llm_provider not in _SYNC_FACTORIES:
+            raise ValueError(f"Unsupported LLM_PROVIDER: {s.llm_provider}")
+        client = _SYNC_FACTORIES[s.llm_provider]()
+        stale: list[LLMClient] = []
+        if entry is not None:
+            stale, _retired_sync[:] = _retired_sync[:], [entry[1]]
+        _sync_clients[key] = (inputs, client)
+    for old in stale:
+        old.close()
+    return client
+
+
+def get_pooled_async_client() -> AsyncLLMClient:
+    """Return the shared async client for the configured provider/model on the running event loop."""
+    s = get_settings()
+    key = (s.llm_provider, s.llm_model)
+    inputs = _client_inputs(s)
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        entry = clients.get(key)
+        if entry is not None and entry[0] == inputs:
+            return entry[1]
+        if s.llm_provider not in _ASYNC_FACTORIES:
+            raise ValueError(f"Unsupported LLM_PROVIDER: {s.llm_provider}")
+        client = _ASYNC_FACTORIES[s.llm_provider]()
+        stale: list[AsyncLLMClient] = []
+        if entry is not None:
+            retired = _retired_async.setdefault(loop, [])
+            stale, retired[:] = retired[:], [entry[1]]
+        clients[key] = (inputs, client)
+    for old in stale:
+        task = loop.create_task(old.aclose())
+        _closing.add(task)
+        task.add_done_callback(_closing.discard)
+    return client
+
+
+def close_clients() -> None:
+    """Close every pooled sync client, retired ones included (registered with atexit)."""
+    with _lock:
+        clients = [client for _, client in _sync_clients.values()] + _retired_sync
+        _sync_clients.clear()
+        _retired_sync.clear()
+    for client in clients:
+        client.close()
+
+
+async def aclose_clients() -> None:
+    """Close the pooled async clients for the running loop, then the sync ones."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = [client for _, client in _async_clients.pop(loop, {}).values()]
+        clients += _retired_async.pop(loop, [])
+    for client in clients:
+        await client.aclose()
+    await asyncio.gather(*(t for t in _closing if t.get_loop() is loop), return_exceptions=True)
+    close_clients()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # FastAPI lifespan: SIGHUP reloads settings; release pooled connections on shutdown
+    install_reload_signal()
+    yield
+    await aclose_clients()
+
+
+atexit.register(close_clients)
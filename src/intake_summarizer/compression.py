@@ -0,0 +1,234 @@
+import threading
+import zlib
+from collections import OrderedDict
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from intake_summarizer.settings import get_settings
+
+try:
+    import brotli  # optional dependency (pip install '.[brotli]')
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+ENCODINGS = ("br", "gzip")
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    """br if the client takes it and brotli is installed, else gzip, else None (identity)."""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    wildcard = accepted.get("*", 0.0)
+    for encoding in ENCODINGS:
+        if encoding == "br" and brotli is None:
+            continue
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+class _Encoder:
+    """Incremental gzip/brotli encoder; flush() after each chunk keeps streamed lines deliverable."""
+
+    def __init__(self, encoding: str, *, gzip_level: int, brotli_quality: int) -> None:
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+            self._gz = None
+        else:
+            self._br = None
+            self._gz = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+
+    def chunk(self, data: bytes) -> bytes:
+        if self._br is not None:
+            return self._br.process(data) + self._br.flush()
+        return self._gz.compress(data) + self._gz.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self._br is not None:
+            return self._br.process(data) + self._br.finish()
+        return self._gz.compress(data) + self._gz.flush()
+
+
+def _with_suffix(etag: str, encoding: str) -> str:
+    # '"abc"' -> '"abc-br"' (W/ prefix kept); each encoding is its own strong validator
+    return f'{etag[:-1]}-{encoding}"' if etag.endswith('"') else etag
+
+
+def _strip_suffixes(if_none_match: str) -> tuple[str, dict[str, str]]:
+    """Drop our encoding suffixes so inner layers compare against their own ETags; remember the originals."""
+    originals: dict[str, str] = {}
+    tags = []
+    for tag in (t.strip() for t in if_none_match.split(",")):
+        for encoding in ENCODINGS:
+            suffix = f'-{encoding}"'
+            if tag.endswith(suffix):
+                stripped = tag[: -len(suffix)] + '"'
+                originals[stripped] = tag
+                tag = stripped
+                break
+        tags.append(tag)
+    return ", ".join(tags), originals
+
+
+def _add_vary(headers: MutableHeaders) -> None:
+    vary = headers.get("vary")
+    if not vary:
+        headers["Vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        headers["Vary"] = f"{vary}, Accept-Encoding"
+
+
+class CompressionMiddleware:
+    """
+    gzip / brotli response compression (pure ASGI).
+    - Only compressible content types, only bodies of at least minimum_size bytes; br is preferred
+      when the client accepts it and the optional brotli package is installed.
+    - ETags get an encoding suffix ('"<hash>-gzip"'), stripped again from If-None-Match on the way in,
+      so 304s from the inner layers keep working per encoding.
+    - Streamed bodies (NDJSON batches) are compressed chunk by chunk with a flush, so lines still
+      arrive as they are produced.
+    - Only 200 responses are compressed (no 206 ranges, errors or redirects).
+    - Bodies with an ETag are compressed once: a small LRU keyed by (ETag, encoding) serves repeats
+      (home page, samples) without recompressing.
+    """
+
+    def __init__(
+        self,
+        app,
+        *,
+        minimum_size: int | None = None,
+        gzip_level: int | None = None,
+        brotli_quality: int | None = None,
+        cache_entries: int = 64,
+    ) -> None:
+        s = get_settings()
+        self.app = app
+        self.enabled = s.compression_enabled
+        self.minimum_size = s.compression_min_bytes if minimum_size is None else minimum_size
+        self.gzip_level = s.compression_gzip_level if gzip_level is None else gzip_level
+        self.brotli_quality = s.compression_brotli_quality if brotli_quality is None else brotli_quality
+        self.cache_entries = cache_entries
+        self._cache: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _encoder(self, encoding: str) -> _Encoder:
+        return _Encoder(encoding, gzip_level=self.gzip_level, brotli_quality=self.brotli_quality)
+
+    def _compress(self, body: bytes, encoding: str, etag: str | None) -> bytes:
+        if etag is None or etag.startswith("W/"):
+            return self._encoder(encoding).finish(body)
+        key = (etag, encoding)
+        with self._lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+                return data
+        data = self._encoder(encoding).finish(body)
+        with self._lock:
+            self._cache[key] = data
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return data
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        originals: dict[str, str] = {}
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match:
+            stripped, originals = _strip_suffixes(if_none_match)
+            raw = [(k, v) for k, v in scope["headers"] if k != b"if-none-match"]
+            # Same scope dict: outer middleware (request metrics) still sees the matched route
+            scope["headers"] = [*raw, (b"if-none-match", stripped.encode("latin-1"))]
+
+        start = None
+        encoder: _Encoder | None = None
+
+        async def send_wrapper(message) -> None:
+            nonlocal start, encoder
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            if encoder is not None:
+                # Rest of a streamed body
+                more = message.get("more_body", False)
+                body = message.get("body", b"")
+                data = encoder.chunk(body) if more else encoder.finish(body)
+                await send({"type": "http.response.body", "body": data, "more_body": more})
+                return
+            if start is None:
+                await send(message)
+                return
+
+            held, start = start, None
+            held["headers"] = list(held.get("headers", []))
+            headers = MutableHeaders(raw=held["headers"])
+            etag = headers.get("etag")
+
+            if held["status"] == 304:
+                if etag in originals:
+                    headers["ETag"] = originals[etag]
+                    _add_vary(headers)
+                await send(held)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+            content_type = headers.get("content-type", "")
+            # Only complete 200 bodies: a 206 range would otherwise be swapped for the cached full body
+            if (
+                held["status"] != 200
+                or "content-range" in headers
+                or "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+                or (not more and len(body) < self.minimum_size)
+            ):
+                await send(held)
+                await send(message)
+                return
+
+            headers["Content-Encoding"] = encoding
+            _add_vary(headers)
+            if etag is not None:
+                headers["ETag"] = _with_suffix(etag, encoding)
+            if more:
+                del headers["content-length"]
+                encoder = self._encoder(encoding)
+                data = encoder.chunk(body)
+            else:
+                data = self._compress(body, encoding, etag)
+                headers["Content-Length"] = str(len(data))
+            await send(held)
+            await send({"type": "http.response.body", "body": data, "more_body": more})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,12 @@
+# LLM failure classes shared by the clients and the summarization boundary.
+# Re-exported from intake_summarizer.summarize, which is where callers import them.
+
+class RetryableLLMError(RuntimeError):
+    def __init__(self, message: str, *, raw: str | None = None):
+        super().__init__(message)
+        self.raw = raw
+
+class NonRetryableLLMError(ValueError):
+    def __init__(self, message: str, *, raw: str | None = None):
+        super().__init__(message)
+        self.raw = raw
@@ -0,0 +1,162 @@
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from intake_summarizer.llm_client import MockLLMClient
+
+
+@dataclass
+class FakeOpenAIConfig:
+    """
+    Behaviour of the fake Responses API.
+    - latency: lognormal with median latency_ms and shape latency_sigma (0 = fixed), capped at latency_max_ms
+    - rate_429 / rate_5xx: share of requests answered with that HTTP error
+    - malformed_rate: share of 200s whose output is truncated (invalid) JSON
+    - schema_error_rate: share of 200s whose JSON doesn't match IntakeSummary
+    """
+
+    latency_ms: float = 800.0
+    latency_sigma: float = 0.5
+    latency_max_ms: float = 30_000.0
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    malformed_rate: float = 0.0
+    schema_error_rate: float = 0.0
+    seed: int | None = None
+
+
+def _error(status: int, message: str, error_type: str, code: str) -> JSONResponse:
+    headers = {"retry-after": "1"} if status == 429 else None
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"message": message, "type": error_type, "param": None, "code": code}},
+        headers=headers,
+    )
+
+
+def _response_body(model: str, output_text: str, input_chars: int) -> dict:
+    # Minimal Responses API object; the SDK's output_text joins the output_text parts
+    input_tokens = input_chars // 4
+    output_tokens = len(output_text) // 4
+    return {
+        "id": f"resp_{uuid.uuid4().hex}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "status": "completed",
+        "model": model,
+        "output": [
+            {
+                "type": "message",
+                "id": f"msg_{uuid.uuid4().hex}",
+                "status": "completed",
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": output_text, "annotations": []}],
+            }
+        ],
+        "parallel_tool_calls": False,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+
+def _user_text(payload: dict) -> str:
+    items = payload.get("input")
+    if isinstance(items, str):
+        return items
+    for item in reversed(items or []):
+        if item.get("role") == "user":
+            content = item.get("content")
+            if isinstance(content, str):
+                return content
+            return " ".join(part.get("text", "") for part in content or [])
+    return ""
+
+
+def create_app(config: FakeOpenAIConfig | None = None) -> FastAPI:
+    """Stand-in for POST /v1/responses; summaries come from the mock heuristics, so they are schema-valid."""
+    config = config or FakeOpenAIConfig()
+    app = FastAPI(title="Fake OpenAI Responses API")
+    app.state.config = config
+    rng = random.Random(config.seed)
+    mock = MockLLMClient()
+
+    @app.post("/v1/responses")
+    async def responses(request: Request):
+        payload = await request.json()
+        text = _user_text(payload)
+
+        delay_ms = config.latency_ms
+        if config.latency_sigma > 0:
+            delay_ms = rng.lognormvariate(math.log(max(config.latency_ms, 1e-3)), config.latency_sigma)
+        await asyncio.sleep(min(delay_ms, config.latency_max_ms) / 1000)
+
+        roll = rng.random()
+        if roll < config.rate_429:
+            return _error(429, "Rate limit reached (fake).", "requests", "rate_limit_exceeded")
+        if roll < config.rate_429 + config.rate_5xx:
+            return _error(500, "The server had an error (fake).", "server_error", "server_error")
+
+        output = mock.summarize(text)
+        roll = rng.random()
+        if roll < config.malformed_rate:
+            output = output[: len(output) // 2]
+        elif roll < config.malformed_rate + config.schema_error_rate:
+            broken = json.loads(output)
+            broken["urgency"] = "whenever"
+            output = json.dumps(broken)
+
+        return _response_body(payload.get("model", "fake-model"), output, len(json.dumps(payload)))
+
+    @app.get("/health")
+    def health() -> dict:
+        return {"status": "ok"}
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(
+        description="Local fake of the OpenAI Responses API (point OPENAI_BASE_URL at http://HOST:PORT/v1)"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Median latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Lognormal shape (0 = fixed latency)")
+    parser.add_argument("--latency-max-ms", type=float, default=30_000.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Share of outputs that are invalid JSON")
+    parser.add_argument("--schema-error-rate", type=float, default=0.0, help="Share of outputs that fail the schema")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = FakeOpenAIConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        latency_max_ms=args.latency_max_ms,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        malformed_rate=args.malformed_rate,
+        schema_error_rate=args.schema_error_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
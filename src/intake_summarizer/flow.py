@@ -1,12 +1,79 @@
-from prefect import flow, task, get_run_logger
+from prefect import flow, task, get_run_logger, unmapped
+from prefect.task_runners import ProcessPoolTaskRunner, ThreadPoolTaskRunner
 from intake_summarizer.summarize import summarize_intake, RetryableLLMError, NonRetryableLLMError
 from intake_summarizer.validate import enforce_business_rules
 from intake_summarizer.persist import persist_summary
 from intake_summarizer.schema import IntakeSummary
 from intake_summarizer.settings import get_settings
-from intake_summarizer.persist_failures import persist_failure
+from intake_summarizer.persist_failures import load_failure_input, mark_resolved, persist_failure, select_failures
 from intake_summarizer.results import IntakeResult
-import time
+from intake_summarizer.checkpoint import RunManifest, append_record
+from intake_summarizer.retry import call_with_retry, deadline_scope, default_policy
+from intake_summarizer.tracing import current_trace, intake_trace, span
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import replace
+
+_logger = logging.getLogger(__name__)
+
+TASK_RUNNERS = ("threads", "processes", "sequential")
+
+def build_task_runner(kind: str | None = None, max_workers: int | None = None):
+    """
+    Task runner for intake_batch_flow (defaults from FLOW_TASK_RUNNER / FLOW_MAX_WORKERS).
+    - threads: LLM calls are IO-bound, so this is the default
+    - processes: for CPU-heavy heuristic-only (mock) runs; llm_slot() is per process here, so
+      without LLM_CONCURRENCY_LIMIT_NAME up to max_workers * LLM_MAX_CONCURRENCY calls run at once
+    - sequential: one task at a time (debugging, strict ordering)
+    Resolved when called, so pass it per run: intake_batch_flow.with_options(task_runner=build_task_runner()).
+    """
+    s = get_settings()
+    kind = kind or s.flow_task_runner
+    max_workers = max_workers or s.flow_max_workers
+    if kind == "threads":
+        return ThreadPoolTaskRunner(max_workers=max_workers)
+    if kind == "processes":
+        if not s.llm_concurrency_limit_name:
+            _logger.warning(
+                "FLOW_TASK_RUNNER=processes without LLM_CONCURRENCY_LIMIT_NAME: "
+                "LLM_MAX_CONCURRENCY=%d applies per worker process",
+                s.llm_max_concurrency,
+            )
+        return ProcessPoolTaskRunner(max_workers=max_workers)
+    if kind == "sequential":
+        return ThreadPoolTaskRunner(max_workers=1)
+    raise ValueError(f"Unsupported task runner: {kind!r} (expected one of {TASK_RUNNERS})")
+
+_llm_semaphore: tuple[int, threading.BoundedSemaphore] | None = None  # (LLM_MAX_CONCURRENCY, semaphore)
+_llm_semaphore_lock = threading.Lock()
+
+def _get_llm_semaphore() -> threading.BoundedSemaphore:
+    global _llm_semaphore
+    limit = get_settings().llm_max_concurrency
+    with _llm_semaphore_lock:
+        # A new limit gets a new semaphore; holders of the old one release into it as before
+        if _llm_semaphore is None or _llm_semaphore[0] != limit:
+            _llm_semaphore = (limit, threading.BoundedSemaphore(limit))
+        return _llm_semaphore[1]
+
+@contextmanager
+def llm_slot():
+    """
+    Caps in-flight summarize_intake calls.
+    Uses the Prefect global concurrency limit LLM_CONCURRENCY_LIMIT_NAME when set
+    (shared by every process/worker), else a process-wide semaphore of LLM_MAX_CONCURRENCY.
+    """
+    s = get_settings()
+    if s.llm_concurrency_limit_name:
+        from prefect.concurrency.sync import concurrency
+
+        with concurrency(s.llm_concurrency_limit_name, occupy=1):
+            yield
+        return
+
+    with _get_llm_semaphore():
+        yield
 
 def _unwrap_exc(e: Exception) -> Exception:
     cur = e
@@ -17,33 +84,36 @@ def _unwrap_exc(e: Exception) -> Exception:
         cur = nxt
 
 @task(retries=0)  # IMPORTANT: disable Prefect retries; we do selective retry ourselves
-def t_summarize(text: str, max_attempts: int = 3, delay_seconds: float = 2.0) -> IntakeSummary:
+def t_summarize(text: str, max_attempts: int | None = None) -> IntakeSummary:
+    """
+    Summarize with the shared retry policy (retry.py): exponential backoff with full jitter,
+    bounded by the process retry budget and REQUEST_DEADLINE_SECONDS.
+    NonRetryableLLMError (contract mismatch) is never retried.
+    """
     logger = get_run_logger()
-    attempt = 0
+    policy = default_policy()
+    if max_attempts is not None:
+        policy = replace(policy, max_attempts=max_attempts)
 
-    while True:
-        attempt += 1
-        try:
-            logger.info(f"Calling summarizer (LLM). attempt={attempt}/{max_attempts}")
-            return summarize_intake(text)
+    def on_retry(attempt: int, delay: float, e: RetryableLLMError) -> None:
+        logger.warning(f"Retryable LLM failure (attempt {attempt}/{policy.max_attempts}), retrying in {delay:.2f}s: {e}")
 
-        except RetryableLLMError as e:
-            logger.warning(f"Retryable LLM failure: {e}")
-            if attempt >= max_attempts:
-                raise
-            time.sleep(delay_seconds)
+    def call() -> IntakeSummary:
+        with llm_slot():
+            return summarize_intake(text)
 
-        except NonRetryableLLMError:
-            # Contract mismatch: do NOT retry
-            raise
+    with span("t_summarize"), deadline_scope():
+        return call_with_retry(call, policy=policy, on_retry=on_retry)
 
 @task
 def t_validate(summary: IntakeSummary, text: str) -> IntakeSummary:
-    return enforce_business_rules(summary, text)
+    with span("t_validate"):
+        return enforce_business_rules(summary, text)
 
 @task
 def t_persist(summary: IntakeSummary, text: str) -> str:
-    path = persist_summary(summary, text=text)
+    with span("t_persist"):
+        path = persist_summary(summary, text=text)
     return str(path)
 
 @flow(name="intake-summarizer", retries=0)
@@ -52,28 +122,29 @@ def intake_flow(text: str) -> str:
     logger.info("Starting intake summarization flow.")
     s = get_settings()
 
-    try:
-        summary = t_summarize(text)  # selective retries happen inside task
-        summary = t_validate(summary, text)
-        out_path = t_persist(summary, text)
-
-    except Exception as e:
-        root = _unwrap_exc(e)
-
-        if isinstance(root, (RetryableLLMError, NonRetryableLLMError)):
-            fail_path = persist_failure(
-                text=text,
-                provider=s.llm_provider,
-                model=s.llm_model,
-                error_type=type(root).__name__,
-                error_message=str(root),
-                raw_output=getattr(root, "raw", None),
-            )
-            logger.error(f"Persisted failure artifact to: {fail_path}")
+    with intake_trace("intake_flow") as tr:
+        try:
+            summary = t_summarize(text)  # selective retries happen inside task
+            summary = t_validate(summary, text)
+            out_path = t_persist(summary, text)
+
+        except Exception as e:
+            root = _unwrap_exc(e)
 
-        raise
+            if isinstance(root, (RetryableLLMError, NonRetryableLLMError)):
+                fail_path = persist_failure(
+                    text=text,
+                    provider=s.llm_provider,
+                    model=s.llm_model,
+                    error_type=type(root).__name__,
+                    error_message=str(root),
+                    raw_output=getattr(root, "raw", None),
+                )
+                logger.error(f"Persisted failure artifact to: {fail_path}")
+
+            raise
 
-    logger.info(f"Persisted summary to: {out_path}")
+    logger.info(f"Persisted summary to: {out_path} (trace {tr.trace_id}, stage_ms={tr.stage_ms})")
     return out_path
 
 # @task
@@ -92,11 +163,25 @@ def intake_flow(text: str) -> str:
 #     return out_path
 
 @flow(name="intake-summarizer-batch")
-def intake_batch_flow(texts: list[str]) -> list[IntakeResult]:
+def intake_batch_flow(texts: list[str], manifest_path: str | None = None) -> list[IntakeResult]:
+    """
+    Best-effort batch. With manifest_path, the run is checkpointed: every finished intake is
+    appended to the manifest, and a rerun skips intakes already done (per the manifest or an
+    existing out/ summary) so only new and previously failed intakes reach the LLM.
+    Skipped intakes are not included in the returned results.
+    Runs on Prefect's default thread pool unless given a runner:
+    intake_batch_flow.with_options(task_runner=build_task_runner())(texts), as the CLI does.
+    """
     logger = get_run_logger()
     logger.info(f"Starting batch intake flow. count={len(texts)}")
 
-    futures = t_process_one.map(texts)
+    if manifest_path:
+        manifest = RunManifest(manifest_path)
+        pending = [t for t in texts if not manifest.should_skip(t)]
+        logger.info(f"Resuming from manifest {manifest_path}. skipped={len(texts) - len(pending)}")
+        texts = pending
+
+    futures = t_process_one.map(texts, manifest_path=unmapped(manifest_path))
     # Resolve to actual values (not State objects)
     results: list[IntakeResult] = [f.result(raise_on_failure=False) for f in futures]
 
@@ -107,21 +192,36 @@ def intake_batch_flow(texts: list[str]) -> list[IntakeResult]:
     
     return results
 
-@task(retries=0)
-def t_process_one(text: str) -> IntakeResult:
+def _summarize_with_retry(text: str, logger) -> IntakeSummary:
+    def on_retry(attempt: int, delay: float, e: RetryableLLMError) -> None:
+        logger.warning(f"Retryable LLM failure (attempt {attempt}), retrying in {delay:.2f}s: {e}")
+
+    def call() -> IntakeSummary:
+        # The LLM slot is released while backing off
+        with llm_slot():
+            return summarize_intake(text)
+
+    with deadline_scope():
+        return call_with_retry(call, on_retry=on_retry)
+
+def process_one(text: str, logger=None) -> IntakeResult:
     """
-    Best-effort wrapper:
-    - summarize has internal retries already (via t_summarize) OR you can inline summarize here.
-    - this task never raises for expected LLM failures; it returns a failed result instead.
+    Summarize -> rules -> persist for one intake, outside of Prefect task tracking.
+    Never raises for expected LLM failures; returns a failed result instead.
+    Used by t_process_one and by the CLI streaming mode.
     """
-    logger = get_run_logger()
+    logger = logger or _logger
+    with intake_trace("process_one"):
+        return _process_one(text, logger)
+
+def _process_one(text: str, logger) -> IntakeResult:
     s = get_settings()
 
     try:
-        summary = summarize_intake(text)  # NOTE: this will raise RetryableLLMError/NonRetryableLLMError
+        summary = _summarize_with_retry(text, logger)  # NOTE: this will raise RetryableLLMError/NonRetryableLLMError
         summary = enforce_business_rules(summary, text)
         out_path = persist_summary(summary, text=text)
-        return IntakeResult(status="ok", out_path=str(out_path))
+        return IntakeResult(status="ok", out_path=str(out_path), **current_trace().summary())
 
     except (RetryableLLMError, NonRetryableLLMError) as e:
         fail_path = persist_failure(
@@ -138,8 +238,68 @@ def t_process_one(text: str) -> IntakeResult:
             error_type=type(e).__name__,
             error_message=str(e),
             failure_artifact=str(fail_path),
+            **current_trace().summary(),
         )
-    
+
+@task(retries=0)
+def t_process_one(text: str, manifest_path: str | None = None) -> IntakeResult:
+    """
+    Best-effort wrapper:
+    - summarize retries RetryableLLMError with backoff inside process_one (same policy as t_summarize).
+    - this task never raises for expected LLM failures; it returns a failed result instead.
+    - with manifest_path, the outcome is checkpointed as soon as the intake finishes.
+    """
+    with intake_trace("t_process_one"):
+        result = process_one(text, get_run_logger())
+    if manifest_path:
+        append_record(manifest_path, text, result)
+    return result
+
+def replay_one(key: str, logger=None) -> IntakeResult:
+    """
+    Re-run one failed intake from its stored input (FAILURE_KEEP_INPUT=1).
+    On success its failures are marked resolved; a new failure is persisted like any other.
+    """
+    logger = logger or _logger
+    text = load_failure_input(key)
+    if text is None:
+        return IntakeResult(
+            status="failed",
+            error_type="InputNotFound",
+            error_message=f"No stored input for failure {key} (was FAILURE_KEEP_INPUT=1 set?)",
+        )
+    result = process_one(text, logger)
+    if result.status == "ok":
+        mark_resolved(key)
+    return result
+
+@task(retries=0)
+def t_replay_one(key: str) -> IntakeResult:
+    with intake_trace("t_replay_one", failure_key=key):
+        return replay_one(key, get_run_logger())
+
+@flow(name="intake-replay-failures")
+def replay_failures_flow(
+    error_type: str | None = None,
+    model: str | None = None,
+    since_seconds: float | None = None,
+    limit: int = 1000,
+) -> dict[str, IntakeResult]:
+    """
+    Reprocess unresolved failures selected by error type, model and age (one run per key).
+    Concurrency is bounded by the task runner (see intake_batch_flow) and llm_slot().
+    Returns results by failure key.
+    """
+    logger = get_run_logger()
+    keys = [r["key"] for r in select_failures(error_type=error_type, model=model, since_seconds=since_seconds, limit=limit)]
+    logger.info(f"Replaying failures. count={len(keys)}")
+
+    futures = t_replay_one.map(keys)
+    results = {key: f.result(raise_on_failure=False) for key, f in zip(keys, futures)}
+
+    resolved = sum(1 for r in results.values() if r.status == "ok")
+    logger.info(f"Replay complete. resolved={resolved} still_failing={len(results) - resolved}")
+    return results
 
 
 if __name__ == "__main__":
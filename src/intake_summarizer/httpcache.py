@@ -0,0 +1,80 @@
+import hashlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from intake_summarizer.settings import get_settings
+
+# Headers a 304 keeps (RFC 9110 15.4.5); the body-describing ones are dropped
+_NOT_MODIFIED_HEADERS = {b"cache-control", b"content-location", b"date", b"etag", b"expires", b"vary"}
+
+
+def strong_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match check (weak comparison, comma-separated lists and "*")."""
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in (t.removeprefix("W/") for t in tags)
+
+
+class ConditionalGetMiddleware:
+    """
+    Cache headers + conditional GETs for every response (pure ASGI, no body copies).
+    - GET 200 with a single body: strong ETag (content hash, unless the route set one) and
+      Cache-Control: no-cache, so clients revalidate cheaply; a matching If-None-Match gets an empty 304.
+    - static_prefixes: public, max-age=static_max_age (StaticFiles sets its own ETag / 304s).
+    - Anything else gets no-store: POST results carry patient data and must not sit in shared caches.
+    Routes that set Cache-Control themselves keep it. Streamed bodies get no ETag.
+    """
+
+    def __init__(self, app, *, static_prefixes: tuple[str, ...] = ("/static",), static_max_age: int | None = None) -> None:
+        self.app = app
+        self.static_prefixes = static_prefixes
+        self.static_max_age = get_settings().static_max_age_seconds if static_max_age is None else static_max_age
+
+    def _cache_control(self, path: str, cacheable: bool) -> str:
+        if cacheable and path.startswith(self.static_prefixes):
+            return f"public, max-age={self.static_max_age}"
+        return "no-cache" if cacheable else "no-store"
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start = None
+
+        async def send_wrapper(message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message  # held until the first body chunk tells us if the body is complete
+                return
+            if start is None:
+                await send(message)
+                return
+
+            held, start = start, None
+            held["headers"] = list(held.get("headers", []))
+            headers = MutableHeaders(raw=held["headers"])
+            cacheable = scope["method"] == "GET" and held["status"] == 200
+            if "cache-control" not in headers:
+                headers["Cache-Control"] = self._cache_control(scope["path"], cacheable)
+
+            if cacheable and message["type"] == "http.response.body" and not message.get("more_body", False):
+                etag = headers.get("etag")
+                if etag is None:
+                    etag = headers["ETag"] = strong_etag(message.get("body", b""))
+                if etag_matches(if_none_match, etag):
+                    kept = [(k, v) for k, v in held["headers"] if k.lower() in _NOT_MODIFIED_HEADERS]
+                    await send({"type": "http.response.start", "status": 304, "headers": kept})
+                    await send({"type": "http.response.body", "body": b""})
+                    return
+
+            await send(held)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,29 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+from intake_summarizer.settings import get_settings
+
+
+def dumps(obj: Any, *, pretty: bool | None = None) -> bytes:
+    """
+    UTF-8 JSON via pydantic-core: serializes models directly (no model_dump() dict copy),
+    dicts and lists of them included. Compact unless pretty=True (default: PRETTY_JSON).
+    Non-JSON values (paths, datetimes, ...) fall back to str().
+    """
+    if pretty is None:
+        pretty = get_settings().pretty_json
+    return to_json(obj, indent=2 if pretty else None, fallback=str)
+
+
+def dumps_line(obj: Any) -> bytes:
+    """One compact JSONL record (always compact, whatever PRETTY_JSON says)."""
+    return to_json(obj, fallback=str) + b"\n"
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with pydantic-core; content may contain models as-is."""
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content, fallback=str)
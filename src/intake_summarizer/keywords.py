@@ -0,0 +1,22 @@
+from typing import FrozenSet, Iterable, Tuple
+
+
+class KeywordMatcher:
+    """
+    Compiled multi-phrase matcher, shared by the mock heuristics (llm_client.KEYWORD_MATCHER)
+    and the business rules (validate.CompiledRules).
+    - Built once from every phrase the caller cares about.
+    - scan() lowercases the intake once and returns the set of phrases present.
+    - Callers read from that hit set instead of re-scanning the text.
+
+    Note: a pure-Python automaton walks the text one character at a time and is
+    slower in CPython than the C substring search, so each deduplicated phrase
+    is probed once against the lowered text instead.
+    """
+
+    def __init__(self, phrases: Iterable[str]) -> None:
+        self.phrases: Tuple[str, ...] = tuple(sorted({p.lower() for p in phrases}))
+
+    def scan(self, text: str) -> FrozenSet[str]:
+        lowered = text.lower()
+        return frozenset(p for p in self.phrases if p in lowered)
@@ -2,12 +2,17 @@ from __future__ import annotations
 from typing import Protocol
 from intake_summarizer.settings import get_settings
 from intake_summarizer.schema import IntakeSummary
+from intake_summarizer.errors import RetryableLLMError
+from intake_summarizer.keywords import KeywordMatcher
+from intake_summarizer.ratelimit import AdaptiveRateLimiter, estimate_tokens, get_rate_limiter
+from intake_summarizer.retry import request_timeout
 import os
 import random
 import json
 import re
 from dataclasses import dataclass
-from typing import Optional, List, Tuple
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Optional, List, Tuple
 
 # settings = get_settings()
 FORMAT_NAME = "intake_summary"
@@ -35,6 +40,11 @@ class LLMClient(Protocol):
         """Return a JSON string that matches the IntakeSummary schema."""
         ...
 
+class AsyncLLMClient(Protocol):
+    async def summarize(self, text: str) -> str:
+        """Return a JSON string that matches the IntakeSummary schema (without blocking the event loop)."""
+        ...
+
 # class MockLLMClient:
 #     """
 #     Deterministic mock client for local testing.
@@ -145,17 +155,37 @@ class LLMClient(Protocol):
 # Deterministic heuristic mock
 # -----------------------------
 
+# All duration patterns fused into one precompiled alternation (one pass per intake).
+# The lookahead skips positions that cannot start any alternative.
+_DURATION_RE = re.compile(
+    r"(?=[tyas\d])\b(?:"
+    r"(?P<today>today)"
+    r"|(?P<yesterday>yesterday)"
+    r"|(?P<n>\d+)\s*(?:"
+    r"(?P<minutes>minutes?|mins?)"
+    r"|(?P<hours>hours?|hrs?)"
+    r"|(?P<days>days?)"
+    r"|(?P<weeks>weeks?)"
+    r"|(?P<months>months?))"
+    r"|(?P<a_few_days>a few days)"
+    r"|(?P<several_days>several days)"
+    r")\b"
+)
+
+# (group, label) in priority order: an earlier entry wins even if it appears later in the text.
+# "{}" in a label is filled with the matched number.
 _DURATION_PATTERNS: List[Tuple[str, str]] = [
-    (r"\b(today)\b", "today"),
-    (r"\b(yesterday)\b", "yesterday"),
-    (r"\b(\d+)\s*(minute|minutes|min|mins)\b", r"\1 minutes"),
-    (r"\b(\d+)\s*(hour|hours|hr|hrs)\b", r"\1 hours"),
-    (r"\b(\d+)\s*(day|days)\b", r"\1 days"),
-    (r"\b(\d+)\s*(week|weeks)\b", r"\1 weeks"),
-    (r"\b(\d+)\s*(month|months)\b", r"\1 months"),
-    (r"\ba few days\b", "a few days"),
-    (r"\b(several days)\b", "several days"),
+    ("today", "today"),
+    ("yesterday", "yesterday"),
+    ("minutes", "{} minutes"),
+    ("hours", "{} hours"),
+    ("days", "{} days"),
+    ("weeks", "{} weeks"),
+    ("months", "{} months"),
+    ("a_few_days", "a few days"),
+    ("several_days", "several days"),
 ]
+_DURATION_RANK = {group: rank for rank, (group, _) in enumerate(_DURATION_PATTERNS)}
 
 # Phrase buckets for deterministic matching
 CHEST_TERMS = (
@@ -242,21 +272,57 @@ SYMPTOM_PHRASES = [
 
 
 def _extract_duration(text: str) -> str:
-    lowered = text.lower()
-    for pat, repl in _DURATION_PATTERNS:
-        m = re.search(pat, lowered)
-        if m:
-            if "\\" in repl:  # replacement template
-                return re.sub(pat, repl, m.group(0))
-            return repl
-    return "unknown"
+    best: Optional[re.Match] = None
+    best_rank = len(_DURATION_PATTERNS)
+    for m in _DURATION_RE.finditer(text.lower()):
+        rank = _DURATION_RANK[m.lastgroup]
+        if rank < best_rank:
+            best, best_rank = m, rank
+            if rank == 0:
+                break
+
+    if best is None:
+        return "unknown"
+    _, label = _DURATION_PATTERNS[best_rank]
+    return label.format(best.group("n")) if "{}" in label else label
+
+
+def extract_durations(texts: Iterable[str]) -> List[str]:
+    """Bulk form of the mock duration heuristic: one duration string per input text."""
+    return [_extract_duration(t) for t in texts]
+
+
+# Trend cues used by the urgency heuristic ("worse" + a timeframe)
+WORSENING_TERMS = ("worse",)
+
+TIMEFRAME_TERMS = (
+    "days",
+    "week",
+    "hours",
+)
 
 
-def _extract_symptoms(text: str, max_items: int = 10) -> List[str]:
-    lowered = text.lower()
+KEYWORD_MATCHER = KeywordMatcher(
+    (
+        *CHEST_TERMS,
+        *SOB_TERMS,
+        *NEURO_RED_FLAGS,
+        *BLEEDING_RED_FLAGS,
+        *PREGNANCY_RED_FLAGS,
+        *SEVERE_TERMS,
+        *TELEHEALTH_HINTS,
+        *SELF_CARE_HINTS,
+        *WORSENING_TERMS,
+        *TIMEFRAME_TERMS,
+        *(needle for needle, _ in SYMPTOM_PHRASES),
+    )
+)
+
+
+def _extract_symptoms(hits: FrozenSet[str], max_items: int = 10) -> List[str]:
     found: List[str] = []
     for needle, label in SYMPTOM_PHRASES:
-        if needle in lowered and label not in found:
+        if needle in hits and label not in found:
             found.append(label)
         if len(found) >= max_items:
             break
@@ -274,73 +340,67 @@ def _chief_complaint(symptoms: List[str]) -> str:
     return " / ".join(symptoms[:2]).title()
 
 
-def _contains_any(text: str, terms: Tuple[str, ...]) -> bool:
-    t = text.lower()
-    return any(x in t for x in terms)
+def _contains_any(hits: FrozenSet[str], terms: Tuple[str, ...]) -> bool:
+    return not hits.isdisjoint(terms)
 
 
-def _build_red_flags(text: str) -> List[str]:
-    t = text.lower()
+def _build_red_flags(hits: FrozenSet[str]) -> List[str]:
     flags: List[str] = []
 
     # Cardio/pulm
-    if _contains_any(t, CHEST_TERMS) and _contains_any(t, SOB_TERMS):
+    if _contains_any(hits, CHEST_TERMS) and _contains_any(hits, SOB_TERMS):
         flags.append("Chest symptoms with shortness of breath.")
 
     # Neuro
-    if any(x in t for x in NEURO_RED_FLAGS):
+    if _contains_any(hits, NEURO_RED_FLAGS):
         flags.append("Possible acute neurologic symptoms.")
 
     # Bleeding
-    if any(x in t for x in BLEEDING_RED_FLAGS):
+    if _contains_any(hits, BLEEDING_RED_FLAGS):
         flags.append("Possible significant bleeding symptoms.")
 
     # Pregnancy + bleeding (simple)
-    if any(x in t for x in PREGNANCY_RED_FLAGS):
+    if _contains_any(hits, PREGNANCY_RED_FLAGS):
         # keep it conservative; don’t “diagnose”
         flags.append("Pregnancy-related concern mentioned.")
 
     # Severity cues
-    if any(x in t for x in SEVERE_TERMS):
+    if _contains_any(hits, SEVERE_TERMS):
         flags.append("Severe symptom indicator present (e.g., fainting/severe).")
 
     return flags[:10]
 
 
-def _urgency_from_text(text: str, red_flags: List[str]) -> str:
-    t = text.lower()
-
+def _urgency_from_hits(hits: FrozenSet[str], red_flags: List[str]) -> str:
     # Emergency triggers
-    if _contains_any(t, CHEST_TERMS) and _contains_any(t, SOB_TERMS):
+    if _contains_any(hits, CHEST_TERMS) and _contains_any(hits, SOB_TERMS):
         return "emergency"
-    if any(x in t for x in NEURO_RED_FLAGS):
+    if _contains_any(hits, NEURO_RED_FLAGS):
         return "emergency"
-    if any(x in t for x in BLEEDING_RED_FLAGS):
+    if _contains_any(hits, BLEEDING_RED_FLAGS):
         return "emergency"
 
     # Urgent triggers
-    if any(x in t for x in SEVERE_TERMS):
+    if _contains_any(hits, SEVERE_TERMS):
         return "urgent"
-    if "worse" in t and ("days" in t or "week" in t or "hours" in t):
+    if _contains_any(hits, WORSENING_TERMS) and _contains_any(hits, TIMEFRAME_TERMS):
         return "urgent"
 
     # Routine triggers
-    if any(x in t for x in SELF_CARE_HINTS):
+    if _contains_any(hits, SELF_CARE_HINTS):
         return "routine"
 
     return "unknown"
 
 
-def _triage_from_text(text: str, urgency: str) -> str:
-    t = text.lower()
-
+def _triage_from_hits(hits: FrozenSet[str], urgency: str) -> str:
     if urgency == "emergency":
         return "in_person"
 
-    if any(x in t for x in TELEHEALTH_HINTS):
+    if _contains_any(hits, TELEHEALTH_HINTS):
         return "telehealth"
 
-    if any(x in t for x in SELF_CARE_HINTS):
+    if _contains_any(hits, SELF_CARE_HINTS):
         return "self_care"
 
     # default conservative routing
@@ -377,11 +437,12 @@ class MockLLMClient:
         self.rng = random.Random(chaos_seed) if chaos_seed is not None else random.Random()
 
     def summarize(self, text: str) -> str:
-        symptoms = _extract_symptoms(text)
+        hits = KEYWORD_MATCHER.scan(text)
+        symptoms = _extract_symptoms(hits)
         duration = _extract_duration(text)
-        red_flags = _build_red_flags(text)
-        urgency = _urgency_from_text(text, red_flags)
-        triage = _triage_from_text(text, urgency)
+        red_flags = _build_red_flags(hits)
+        urgency = _urgency_from_hits(hits, red_flags)
+        triage = _triage_from_hits(hits, urgency)
 
         payload = {
             "chief_complaint": _chief_complaint(symptoms),
@@ -431,48 +492,212 @@ SCHEMA = {
 }
 
 
+SYSTEM_PROMPT = (
+    "You generate conservative clinical intake summaries.\n"
+    "Do NOT invent diagnoses, medications, vitals, or history.\n"
+    "If unknown, use 'unknown' or empty lists.\n"
+    "Return ONLY JSON that matches the provided schema."
+)
+
+
+@lru_cache(maxsize=None)
+def _request_template(model: str) -> dict:
+    # Built once per model: the schema is derived from IntakeSummary and never changes at runtime
+    return {
+        "model": model,
+        # JSON Schema that matches your Pydantic IntakeSummary
+        "text": {
+            "format": {
+                "type": "json_schema",
+                "name": FORMAT_NAME,
+                "strict": True,
+                "schema": openai_schema_from_pydantic(),
+            }
+        },
+        "temperature": 0,
+        # Responses are stored by default; disable storage for sensitive intake text
+        "store": False,
+    }
+
+
+def _responses_request(text: str, model: str) -> dict:
+    # Shared by the sync and async OpenAI clients
+    return {
+        **_request_template(model),
+        "input": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": text},
+        ],
+    }
+
+
+def _http_client_kwargs(settings) -> dict:
+    import httpx
+
+    if settings.openai_http2:
+        try:
+            import h2  # noqa: F401  optional dependency (pip install '.[http2]')
+        except ImportError:
+            raise ValueError("OPENAI_HTTP2=1 needs the h2 package: pip install '.[http2]'") from None
+    return {
+        "timeout": httpx.Timeout(settings.openai_timeout_seconds, connect=10.0),
+        "limits": httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_keepalive,
+            keepalive_expiry=settings.openai_keepalive_expiry,
+        ),
+        "http2": settings.openai_http2,
+    }
+
+
+@lru_cache(maxsize=1)
+def _prompt_overhead_chars() -> int:
+    # System prompt + schema are sent with every request and count against TPM
+    return len(SYSTEM_PROMPT) + len(json.dumps(openai_schema_from_pydantic()))
+
+
+def _usage_tokens(resp) -> int | None:
+    usage = getattr(resp, "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+
+def _failed_call(limiter: AdaptiveRateLimiter | None, e: Exception, est_tokens: int) -> Exception:
+    """
+    Release the limiter slot for a failed call and return the exception to raise.
+    429/5xx/timeouts back the limiter off and surface as RetryableLLMError; connection
+    errors are retryable but say nothing about provider load.
+    """
+    import openai
+
+    throttled = isinstance(e, (openai.RateLimitError, openai.InternalServerError, openai.APITimeoutError))
+    retryable = throttled or isinstance(e, openai.APIConnectionError)
+    if limiter is not None:
+        limiter.release(throttled=throttled, ok=False, est_tokens=est_tokens)
+    if retryable:
+        return RetryableLLMError(f"OpenAI request failed ({type(e).__name__}): {e}")
+    return e
+
+
+def _output_text(resp) -> str:
+    out = (resp.output_text or "").strip()
+    if not out:
+        raise ValueError("OpenAI returned empty output_text.")
+    return out
+
+
 class OpenAILLMClient:
     def __init__(self) -> None:
-        from openai import OpenAI  # ✅ lazy import
+        from openai import OpenAI, DefaultHttpxClient  # ✅ lazy import
         import httpx
         settings = get_settings()
 
         if not settings.openai_api_key:
             raise ValueError("OPENAI_API_KEY is not set.")
-        self.client = OpenAI(timeout=httpx.Timeout(30.0, connect=10.0))
+        self.model = settings.llm_model
+        self.timeout = settings.openai_timeout_seconds
+        self.limiter = get_rate_limiter("openai", self.model)
+        self.client = OpenAI(
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url,
+            timeout=httpx.Timeout(settings.openai_timeout_seconds, connect=10.0),
+            http_client=DefaultHttpxClient(**_http_client_kwargs(settings)),
+            # With the limiter on, 429s must reach it instead of being retried inside the SDK
+            max_retries=0 if self.limiter else 2,
+        )
 
     def summarize(self, text: str) -> str:
-        # JSON Schema that matches your Pydantic IntakeSummary
+        est = estimate_tokens(text, overhead_chars=_prompt_overhead_chars())
+        if self.limiter is not None:
+            self.limiter.acquire(est)
+        released = False
+        try:
+            # Never wait past the caller's deadline (retry.deadline_scope)
+            timeout = request_timeout(self.timeout)
+            resp = self.client.responses.create(**_responses_request(text, self.model), timeout=timeout)
+        except Exception as e:
+            released = True
+            err = _failed_call(self.limiter, e, est)
+            if err is e:
+                raise
+            raise err from e
+        else:
+            released = True
+            if self.limiter is not None:
+                self.limiter.release(est_tokens=est, used_tokens=_usage_tokens(resp))
+        finally:
+            # Cancellation (CancelledError, KeyboardInterrupt) skips both branches: free the slot, no AIMD signal
+            if not released and self.limiter is not None:
+                self.limiter.release(ok=False, est_tokens=est)
+        return _output_text(resp)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class AsyncMockLLMClient:
+    """
+    Async variant of MockLLMClient for the web apps.
+    - Wraps a MockLLMClient instead of subclassing it, so it can't pass for a sync LLMClient.
+    - The heuristics are CPU-only and fast, so they run inline on the event loop.
+    """
 
-        settings = get_settings()
+    def __init__(
+        self,
+        chaos_enabled: bool = False,
+        chaos_rate: float = 0.0,
+        chaos_seed: Optional[int] = None,
+    ) -> None:
+        self.mock = MockLLMClient(chaos_enabled=chaos_enabled, chaos_rate=chaos_rate, chaos_seed=chaos_seed)
 
-        system_prompt = (
-            "You generate conservative clinical intake summaries.\n"
-            "Do NOT invent diagnoses, medications, vitals, or history.\n"
-            "If unknown, use 'unknown' or empty lists.\n"
-            "Return ONLY JSON that matches the provided schema."
-        )
+    async def summarize(self, text: str) -> str:
+        return self.mock.summarize(text)
+
+
+class AsyncOpenAILLMClient:
+    """OpenAI client for async callers: awaits the HTTP round trip instead of blocking a worker."""
 
-        resp = self.client.responses.create(
-            model=settings.llm_model,
-            input=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": text},
-            ],
-            text={
-                "format": {
-                    "type": "json_schema", 
-                    "name": FORMAT_NAME, 
-                    "strict": True,
-                    "schema": openai_schema_from_pydantic(),
-                }
-            },
-            temperature=0,
-            # Responses are stored by default; disable storage for sensitive intake text
-            store=False,
+    def __init__(self) -> None:
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient  # lazy import
+        import httpx
+        settings = get_settings()
+
+        if not settings.openai_api_key:
+            raise ValueError("OPENAI_API_KEY is not set.")
+        self.model = settings.llm_model
+        self.timeout = settings.openai_timeout_seconds
+        self.limiter = get_rate_limiter("openai", self.model)
+        self.client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url,
+            timeout=httpx.Timeout(settings.openai_timeout_seconds, connect=10.0),
+            http_client=DefaultAsyncHttpxClient(**_http_client_kwargs(settings)),
+            max_retries=0 if self.limiter else 2,
         )
 
-        out = (resp.output_text or "").strip()
-        if not out:
-            raise ValueError("OpenAI returned empty output_text.")
-        return out
\ No newline at end of file
+    async def summarize(self, text: str) -> str:
+        est = estimate_tokens(text, overhead_chars=_prompt_overhead_chars())
+        if self.limiter is not None:
+            await self.limiter.acquire_async(est)
+        released = False
+        try:
+            # Never wait past the caller's deadline (retry.deadline_scope)
+            timeout = request_timeout(self.timeout)
+            resp = await self.client.responses.create(**_responses_request(text, self.model), timeout=timeout)
+        except Exception as e:
+            released = True
+            err = _failed_call(self.limiter, e, est)
+            if err is e:
+                raise
+            raise err from e
+        else:
+            released = True
+            if self.limiter is not None:
+                self.limiter.release(est_tokens=est, used_tokens=_usage_tokens(resp))
+        finally:
+            # Cancellation (CancelledError, KeyboardInterrupt) skips both branches: free the slot, no AIMD signal
+            if not released and self.limiter is not None:
+                self.limiter.release(ok=False, est_tokens=est)
+        return _output_text(resp)
+
+    async def aclose(self) -> None:
+        await self.client.close()
@@ -0,0 +1,161 @@
+import argparse
+import asyncio
+import json
+import math
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import httpx
+
+from intake_summarizer.bench import generate_corpus
+
+
+def percentile(sorted_values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _error_class(resp: httpx.Response) -> str:
+    try:
+        data = resp.json()
+        detail = str(data.get("detail") or data.get("error") or "")  # api.py | app.py error shape
+    except ValueError:
+        detail = ""
+    # Group by status + the leading words of the message (messages carry per-request details)
+    return f"{resp.status_code} {' '.join(detail.split()[:4])}".strip()
+
+
+async def run_load(
+    *,
+    base_url: str,
+    concurrency: int = 16,
+    requests: int | None = 500,
+    duration_seconds: float | None = None,
+    persist: bool = False,
+    corpus_size: int = 200,
+    seed: int = 0,
+    path: str = "/api/summarize",
+    form: bool = False,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> dict:
+    """
+    Drive POST `path` with `concurrency` workers until `requests` are sent or `duration_seconds` pass.
+    Bodies come from the benchmark corpus; a per-request suffix keeps the summary cache from answering.
+    form=True posts form fields (app.py) instead of JSON (api.py).
+    """
+    corpus = generate_corpus(corpus_size, seed=seed)
+    latencies: list[float] = []
+    errors: Counter[str] = Counter()
+    sent = 0
+    deadline = time.monotonic() + duration_seconds if duration_seconds else None
+
+    def next_index() -> int | None:
+        nonlocal sent
+        if requests is not None and sent >= requests:
+            return None
+        if deadline is not None and time.monotonic() >= deadline:
+            return None
+        sent += 1
+        return sent
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits, transport=transport) as client:
+
+        async def worker() -> None:
+            while (i := next_index()) is not None:
+                text = f"{corpus[i % len(corpus)]} (load {i})"
+                start = time.perf_counter()
+                try:
+                    if form:
+                        resp = await client.post(path, data={"intake_text": text, "persist": str(persist).lower()})
+                    else:
+                        resp = await client.post(path, json={"text": text, "persist": persist})
+                except httpx.HTTPError as e:
+                    errors[type(e).__name__] += 1
+                    continue
+                elapsed = time.perf_counter() - start
+                if resp.status_code == 200:
+                    latencies.append(elapsed)
+                else:
+                    errors[_error_class(resp)] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    latencies.sort()
+    ms = lambda v: round(v * 1000, 1) if v is not None else None  # noqa: E731
+    return {
+        "requests": sent,
+        "ok": len(latencies),
+        "errors": sum(errors.values()),
+        "error_breakdown": dict(errors.most_common()),
+        "concurrency": concurrency,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(sent / wall, 2) if wall else None,
+        "ok_rps": round(len(latencies) / wall, 2) if wall else None,
+        "latency_ms": {
+            "p50": ms(percentile(latencies, 50)),
+            "p95": ms(percentile(latencies, 95)),
+            "p99": ms(percentile(latencies, 99)),
+            "max": ms(latencies[-1] if latencies else None),
+            "mean": ms(statistics.fmean(latencies) if latencies else None),
+        },
+    }
+
+
+def print_report(report: dict) -> None:
+    lat = report["latency_ms"]
+    print("\nLoad Test Summary")
+    print("=" * 40)
+    print(f"Requests    : {report['requests']} (concurrency {report['concurrency']}, {report['wall_seconds']}s)")
+    print(f"Throughput  : {report['throughput_rps']} req/s ({report['ok_rps']} ok/s)")
+    print(f"Latency ms  : p50={lat['p50']} p95={lat['p95']} p99={lat['p99']} max={lat['max']}")
+    print(f"Errors      : {report['errors']}")
+    for error, count in report["error_breakdown"].items():
+        print(f"  - {error}: {count}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test POST /api/summarize and report throughput and latency")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of app.py or api.py")
+    parser.add_argument(
+        "--target",
+        choices=("api", "app"),
+        default="api",
+        help="api: JSON body (api.py); app: form fields (app.py)",
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="Total requests (ignored with --duration)")
+    parser.add_argument("--duration", type=float, default=None, help="Run for this many seconds instead")
+    parser.add_argument("--persist", action="store_true", help="Ask the server to persist summaries")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(
+        run_load(
+            base_url=args.url,
+            concurrency=args.concurrency,
+            requests=None if args.duration else args.requests,
+            duration_seconds=args.duration,
+            persist=args.persist,
+            seed=args.seed,
+            form=args.target == "app",
+        )
+    )
+    print_report(report)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
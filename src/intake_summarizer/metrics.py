@@ -0,0 +1,133 @@
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from intake_summarizer.tracing import span
+
+# 100µs (parse/rules) up to a minute (slow LLM calls)
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Stages timed with stage_timer(); LLM time is split from our own code
+STAGES = ("llm", "parse_validate", "business_rules", "persist")
+
+REQUEST_SECONDS = Histogram(
+    "intake_request_seconds",
+    "End-to-end HTTP request latency",
+    ["app", "method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge("intake_requests_in_flight", "HTTP requests being handled", ["app"])
+STAGE_SECONDS = Histogram(
+    "intake_stage_seconds",
+    "Time spent per pipeline stage",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_ERRORS = Counter(
+    "intake_llm_errors",
+    "LLM attempts that failed, by error class (each retry attempt counts)",
+    ["error_type", "provider", "model"],
+)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    # Also a trace span, so per-intake timings (tracing.py) see the same stages
+    start = time.perf_counter()
+    try:
+        with span(stage):
+            yield
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+
+def count_llm_error(error: Exception, *, provider: str, model: str) -> None:
+    LLM_ERRORS.labels(type(error).__name__, provider, model).inc()
+
+
+class _RuntimeCollector:
+    """
+    Exposes the counters the cache, retry budget and rate limiters already keep,
+    read at scrape time (so nothing is counted twice).
+    """
+
+    def collect(self):
+        from intake_summarizer.cache import get_summary_cache
+        from intake_summarizer.ratelimit import limiter_states
+        from intake_summarizer.retry import get_retry_budget
+
+        cache = get_summary_cache()
+        if cache is not None:
+            stats = cache.stats()
+            lookups = CounterMetricFamily("intake_cache_lookups", "Summary cache lookups by outcome", labels=["result"])
+            for result in ("memory_hits", "disk_hits", "misses"):
+                lookups.add_metric([result], stats[result])
+            yield lookups
+            yield CounterMetricFamily("intake_cache_evictions", "Summary cache LRU evictions", value=stats["evictions"])
+            yield GaugeMetricFamily("intake_cache_entries", "Summary cache in-memory entries", value=stats["memory_entries"])
+
+        budget = get_retry_budget().state()
+        yield CounterMetricFamily("intake_retries", "Retries started", value=budget["retries"])
+        yield CounterMetricFamily(
+            "intake_retries_denied", "Retries skipped because the retry budget was empty", value=budget["exhausted"]
+        )
+        yield GaugeMetricFamily("intake_retry_budget_tokens", "Retry budget tokens available", value=budget["tokens"])
+
+        limits = GaugeMetricFamily("intake_llm_concurrency_limit", "Adaptive LLM concurrency limit", labels=["limiter"])
+        in_flight = GaugeMetricFamily("intake_llm_in_flight", "LLM calls in flight", labels=["limiter"])
+        throttles = CounterMetricFamily("intake_llm_throttles", "Throttled LLM calls (429/5xx/timeout)", labels=["limiter"])
+        for name, state in limiter_states().items():
+            limits.add_metric([name], state["concurrency_limit"])
+            in_flight.add_metric([name], state["in_flight"])
+            throttles.add_metric([name], state["throttles"])
+        yield limits
+        yield in_flight
+        yield throttles
+
+
+REGISTRY.register(_RuntimeCollector())
+
+
+class RequestMetricsMiddleware:
+    """
+    In-flight gauge + end-to-end latency per route template (pure ASGI).
+    The clock stops when the app has sent its last body chunk, so streamed responses
+    (NDJSON batches) are timed to completion rather than to their headers.
+    """
+
+    def __init__(self, app, *, app_name: str) -> None:
+        self.app = app
+        self.app_name = app_name
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        gauge = REQUESTS_IN_FLIGHT.labels(self.app_name)
+        gauge.inc()
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            gauge.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")  # template, not the raw URL (bounded cardinality)
+            REQUEST_SECONDS.labels(self.app_name, scope["method"], path, str(status)).observe(
+                time.perf_counter() - start
+            )
+
+
+def metrics_payload() -> tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
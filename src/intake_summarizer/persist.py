@@ -12,36 +12,306 @@
 #     path.write_text(json.dumps(summary.model_dump(), indent=2), encoding="utf-8")
 #     return path
 
-import json
+import asyncio
 import hashlib
+import sqlite3
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Iterable, Protocol
 from intake_summarizer.schema import IntakeSummary
+from intake_summarizer.settings import get_settings
+from intake_summarizer.metrics import stage_timer
+from intake_summarizer.tracing import record_bytes
+from intake_summarizer.jsonio import dumps
 
 OUT_DIR = Path("out")
 OUT_DIR.mkdir(exist_ok=True)
 
+PERSIST_BACKENDS = ("file", "sqlite")
+
 def _sha256_hex(s: str) -> str:
     return hashlib.sha256(s.encode("utf-8")).hexdigest()
 
-def persist_summary(summary: IntakeSummary, *, text: str) -> Path:
+def content_key(text: str) -> str:
+    """Short stable identifier for an intake text (used in output file names)."""
+    return _sha256_hex(text)[:16]
+
+
+class SummaryStore(Protocol):
+    """
+    Persistence backend for validated summaries, idempotent by content key:
+    writing the same key again replaces the previous summary.
+    put() returns a locator for the stored summary (a file path or a db#key reference).
+    """
+
+    def put(self, key: str, summary: IntakeSummary) -> Path | str: ...
+    def put_many(self, items: Iterable[tuple[str, IntakeSummary]]) -> list[Path | str]: ...
+    def get(self, key: str) -> IntakeSummary | None: ...
+    def exists(self, key: str) -> bool: ...
+    def find(
+        self, *, urgency: str | None = None, triage_category: str | None = None, limit: int = 100
+    ) -> list[tuple[str, IntakeSummary]]: ...
+
+
+class FileStore:
+    """
+    Original layout: one JSON file per intake in out/ (atomic temp file + replace).
+    Files are compact JSON unless PRETTY_JSON=1.
+    Lookup by key is one stat/read; find() has no index and scans the directory.
+    """
+
+    def __init__(self, out_dir: Path | None = None) -> None:
+        self._out_dir = out_dir
+
+    @property
+    def out_dir(self) -> Path:
+        return self._out_dir or OUT_DIR
+
+    def _path(self, key: str) -> Path:
+        return self.out_dir / f"intake_summary_{key}.json"
+
+    def put(self, key: str, summary: IntakeSummary) -> Path:
+        path = self._path(key)
+
+        data = dumps(summary)  # straight from the model, no dict copy
+
+        tmp_path = path.with_suffix(".json.tmp")
+        record_bytes(tmp_path.write_bytes(data))
+        tmp_path.replace(path)  # atomic on same filesystem
+
+        return path
+
+    def put_many(self, items: Iterable[tuple[str, IntakeSummary]]) -> list[Path]:
+        return [self.put(key, summary) for key, summary in items]
+
+    def get(self, key: str) -> IntakeSummary | None:
+        try:
+            return IntakeSummary.model_validate_json(self._path(key).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def find(
+        self, *, urgency: str | None = None, triage_category: str | None = None, limit: int = 100
+    ) -> list[tuple[str, IntakeSummary]]:
+        out: list[tuple[str, IntakeSummary]] = []
+        for path in sorted(self.out_dir.glob("intake_summary_*.json")):
+            summary = IntakeSummary.model_validate_json(path.read_text(encoding="utf-8"))
+            if urgency and summary.urgency != urgency:
+                continue
+            if triage_category and summary.triage_category != triage_category:
+                continue
+            out.append((path.stem.removeprefix("intake_summary_"), summary))
+            if len(out) >= limit:
+                break
+        return out
+
+
+class _PendingPut:
+    __slots__ = ("key", "summary", "locator", "error", "done")
+
+    def __init__(self, key: str, summary: IntakeSummary) -> None:
+        self.key = key
+        self.summary = summary
+        self.locator: str | None = None
+        self.error: BaseException | None = None
+        self.done = False
+
+
+class GroupCommit:
+    """
+    Group commit for concurrent put() callers (batch flow workers, streaming CLI threads).
+    - One caller at a time writes; puts that arrive meanwhile queue up and go out together in the
+      next put_many() transaction (at most max_batch rows), instead of one commit per intake.
+    - No timer: a lone writer commits immediately, batching only happens under concurrency.
+    - Every caller still returns only once its own row is committed (or gets the batch's error).
+    """
+
+    def __init__(self, put_many, *, max_batch: int = 256) -> None:
+        self._put_many = put_many
+        self.max_batch = max_batch
+        self.commits = 0
+        self.rows = 0
+        self._cond = threading.Condition()
+        self._queue: list[_PendingPut] = []
+        self._writing = False
+
+    def put(self, key: str, summary: IntakeSummary) -> str:
+        item = _PendingPut(key, summary)
+        with self._cond:
+            self._queue.append(item)
+            while self._writing and not item.done:
+                self._cond.wait()
+            if item.done:  # committed by another caller's transaction
+                if item.error is not None:
+                    raise item.error
+                return item.locator
+            self._writing = True  # our turn to write, for everyone queued so far
+        try:
+            while not item.done:
+                with self._cond:
+                    batch = self._queue[: self.max_batch]
+                    del self._queue[: self.max_batch]
+                self._commit(batch)
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+        if item.error is not None:
+            raise item.error
+        return item.locator
+
+    def _commit(self, batch: list[_PendingPut]) -> None:
+        try:
+            locators = self._put_many([(p.key, p.summary) for p in batch])
+        except BaseException as e:
+            for p in batch:
+                p.error = e
+        else:
+            for p, locator in zip(batch, locators):
+                p.locator = locator
+        with self._cond:
+            self.commits += 1
+            self.rows += len(batch)
+            for p in batch:
+                p.done = True
+            self._cond.notify_all()
+
+
+class SqliteStore:
+    """
+    Single SQLite file in WAL mode: one row per content key, indexed on urgency and triage_category.
+    - Readers never block the writer; several workers/processes can share the file.
+    - put_many() writes a whole batch in one transaction; concurrent put() calls are grouped
+      into put_many() transactions too (GroupCommit).
+    - Summaries are stored as compact JSON.
+    """
+
+    _SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS summaries (
+            key TEXT PRIMARY KEY,
+            urgency TEXT NOT NULL,
+            triage_category TEXT NOT NULL,
+            updated_utc TEXT NOT NULL,
+            data TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_summaries_urgency ON summaries(urgency)",
+        "CREATE INDEX IF NOT EXISTS idx_summaries_triage ON summaries(triage_category)",
+    )
+    _UPSERT = (
+        "INSERT INTO summaries (key, urgency, triage_category, updated_utc, data) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET urgency=excluded.urgency, triage_category=excluded.triage_category, "
+        "updated_utc=excluded.updated_utc, data=excluded.data"
+    )
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._group = GroupCommit(self.put_many)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            for stmt in self._SCHEMA:
+                conn.execute(stmt)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0)
+            conn.execute("PRAGMA synchronous=NORMAL")  # safe with WAL, avoids an fsync per commit
+            self._local.conn = conn
+        return conn
+
+    def _locator(self, key: str) -> str:
+        return f"{self.path}#{key}"
+
+    def put(self, key: str, summary: IntakeSummary) -> str:
+        return self._group.put(key, summary)
+
+    def put_many(self, items: Iterable[tuple[str, IntakeSummary]]) -> list[str]:
+        ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        rows = [(k, s.urgency, s.triage_category, ts, s.model_dump_json()) for k, s in items]
+        conn = self._conn()
+        with conn:
+            conn.executemany(self._UPSERT, rows)
+        record_bytes(sum(len(row[4]) for row in rows))
+        return [self._locator(row[0]) for row in rows]
+
+    def get(self, key: str) -> IntakeSummary | None:
+        row = self._conn().execute("SELECT data FROM summaries WHERE key = ?", (key,)).fetchone()
+        return IntakeSummary.model_validate_json(row[0]) if row else None
+
+    def exists(self, key: str) -> bool:
+        return self._conn().execute("SELECT 1 FROM summaries WHERE key = ?", (key,)).fetchone() is not None
+
+    def find(
+        self, *, urgency: str | None = None, triage_category: str | None = None, limit: int = 100
+    ) -> list[tuple[str, IntakeSummary]]:
+        where, params = [], []
+        if urgency:
+            where.append("urgency = ?")
+            params.append(urgency)
+        if triage_category:
+            where.append("triage_category = ?")
+            params.append(triage_category)
+        sql = "SELECT key, data FROM summaries"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY key LIMIT ?"
+        rows = self._conn().execute(sql, (*params, limit)).fetchall()
+        return [(key, IntakeSummary.model_validate_json(data)) for key, data in rows]
+
+
+_stores: dict[tuple[str, str], SummaryStore] = {}
+_stores_lock = threading.Lock()
+
+def get_store() -> SummaryStore:
+    """Backend selected by PERSIST_BACKEND (file | sqlite); one instance per backend/location."""
+    s = get_settings()
+    backend = s.persist_backend
+    if backend == "file":
+        return FileStore()
+    if backend != "sqlite":
+        raise ValueError(f"Unsupported PERSIST_BACKEND: {backend!r} (expected one of {PERSIST_BACKENDS})")
+    key = (backend, s.persist_sqlite_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = SqliteStore(Path(s.persist_sqlite_path))
+        return store
+
+def summary_exists(key: str) -> bool:
+    """Fast existence check for an already-persisted summary (by key, no directory scan)."""
+    return get_store().exists(key)
+
+def persist_summary(summary: IntakeSummary, *, text: str) -> Path | str:
     """
     Idempotent persistence:
     - Same intake text -> same output path
     - Prevents duplicates across retries / reruns
-    - Uses atomic write via temp file + replace
+    - File backend uses atomic write via temp file + replace; sqlite upserts by key
     """
     # comparing providers/models
     # key_material = f"{settings.llm_provider}|{settings.llm_model}|{text}"
     # key = _sha256_hex(key_material)[:16]
 
-    key = _sha256_hex(text)[:16]  # short stable identifier
-    path = OUT_DIR / f"intake_summary_{key}.json"
+    key = content_key(text)  # short stable identifier
+    with stage_timer("persist"):
+        return get_store().put(key, summary)
 
-    payload = summary.model_dump()
-    data = json.dumps(payload, indent=2, ensure_ascii=False)
+def persist_summaries(items: Iterable[tuple[IntakeSummary, str]]) -> list[Path | str]:
+    """Batch form of persist_summary: (summary, text) pairs, one transaction on the sqlite backend."""
+    with stage_timer("persist"):
+        return get_store().put_many((content_key(text), summary) for summary, text in items)
 
-    tmp_path = path.with_suffix(".json.tmp")
-    tmp_path.write_text(data, encoding="utf-8")
-    tmp_path.replace(path)  # atomic on same filesystem
 
-    return path
\ No newline at end of file
+async def persist_summary_async(summary: IntakeSummary, *, text: str) -> Path | str:
+    """persist_summary for async callers: the write runs in a worker thread."""
+    return await asyncio.to_thread(persist_summary, summary, text=text)
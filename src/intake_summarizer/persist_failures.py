@@ -1,14 +1,47 @@
+import argparse
 import json
 import os, hashlib
+import sqlite3
+import threading
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 
+from intake_summarizer.settings import get_settings
+from intake_summarizer.jsonio import dumps, dumps_line
+from intake_summarizer.tracing import current_trace
+
 FAIL_DIR = Path("out") / "fail"
 FAIL_DIR.mkdir(parents=True, exist_ok=True)
 
+FAILURE_STORES = ("files", "log")
+
 def _sha256_hex(s: str) -> str:
     return hashlib.sha256(s.encode("utf-8")).hexdigest()
 
+def _failure_payload(
+    *,
+    key: str,
+    ts: str,
+    provider: str,
+    model: str,
+    error_type: str,
+    error_message: str,
+    raw_output: str | None,
+) -> dict:
+    keep_raw = os.getenv("KEEP_RAW_LLM_OUTPUT", "0") == "1"
+    raw = raw_output or ""
+
+    return {
+        "key": key,
+        "timestamp_utc": ts,
+        "provider": provider,
+        "model": model,
+        "error_type": error_type,
+        "error_message": error_message,
+        "raw_output_preview": raw[:200] if keep_raw else "",  # cap
+    }
+
 def persist_failure(
     *,
     text: str,
@@ -17,30 +50,463 @@ def persist_failure(
     error_type: str,
     error_message: str,
     raw_output: str | None = None,
-    
-    
+
+
 ) -> Path:
     """
     Writes a structured failure artifact for debugging.
     - Uses deterministic key based on input text (idempotent)
     - Truncates raw output to limit sensitive exposure
+    - FAILURE_STORE=log appends to the rotating FailureLog instead of one file per failure
+    - FAILURE_KEEP_INPUT=1 also stores the intake text by key so it can be replayed
     """
     key = _sha256_hex(text)[:16]
     ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    payload = _failure_payload(
+        key=key,
+        ts=ts,
+        provider=provider,
+        model=model,
+        error_type=error_type,
+        error_message=error_message,
+        raw_output=raw_output,
+    )
+
+    settings = get_settings()
+    tr = current_trace()
+    if tr is not None:
+        # Where the time went before this intake failed
+        payload["trace"] = tr.summary()
+
+    if settings.failure_keep_input:
+        save_failure_input(key, text)
+
+    if settings.failure_store == "log":
+        return get_failure_log().record(payload)
+
     path = FAIL_DIR / f"intake_failure_{key}_{ts}.json"
-    keep_raw = os.getenv("KEEP_RAW_LLM_OUTPUT", "0") == "1"
-    raw = raw_output or ""
-    raw_hash = hashlib.sha256(raw.encode("utf-8")).hexdigest() if raw else None
+    path.write_bytes(dumps(payload))
+    return path
+
+
+def _segment_pid(segment: Path) -> int:
+    # failures_<ts>_<pid>.jsonl
+    try:
+        return int(segment.stem.rsplit("_", 1)[1])
+    except (IndexError, ValueError):
+        return -1
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    if os.name == "nt":
+        return True  # no cheap check; never prune another writer's newest segment
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by someone else
+    return True
+
+
+class FailureLog:
+    """
+    Append-only failure log for incident-scale volumes.
+    - Full records go to JSONL segments (failures_<ts>_<pid>.jsonl), one segment per writer
+      process, rotated at max_bytes; only the newest max_segments are kept. Pruning skips any
+      segment a live process may still be appending to, and clears the segment of its index rows.
+    - Deduplicated by (key, error_type): a repeat only bumps counters in the index (and rewrites
+      the full record if its segment was pruned).
+    - index.db (SQLite, WAL) holds the dedup table and a per-window aggregate
+      (window start, provider, model, error_type) -> count, so summaries never scan the log.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_segments: int = 50,
+        window_seconds: int = 300,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_segments = max_segments
+        self.window_seconds = window_seconds
+        self._segment: Path | None = None
+        self._prune_due = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS failures (
+                    key TEXT NOT NULL,
+                    error_type TEXT NOT NULL,
+                    provider TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    first_seen REAL NOT NULL,
+                    last_seen REAL NOT NULL,
+                    occurrences INTEGER NOT NULL,
+                    error_message TEXT NOT NULL,
+                    segment TEXT NOT NULL,
+                    resolved_at REAL,
+                    PRIMARY KEY (key, error_type)
+                )
+                """
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(failures)")}
+            if "resolved_at" not in columns:  # index.db from before replay support
+                conn.execute("ALTER TABLE failures ADD COLUMN resolved_at REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_failures_last_seen ON failures(last_seen)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS windows (
+                    window_start INTEGER NOT NULL,
+                    provider TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    error_type TEXT NOT NULL,
+                    occurrences INTEGER NOT NULL,
+                    new_keys INTEGER NOT NULL,
+                    PRIMARY KEY (window_start, provider, model, error_type)
+                )
+                """
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.directory / "index.db", timeout=30.0)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _current_segment(self, incoming: int) -> Path:
+        with self._lock:
+            seg = self._segment
+            if seg is None or (seg.exists() and seg.stat().st_size + incoming > self.max_bytes):
+                ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+                seg = self._segment = self.directory / f"failures_{ts}_{os.getpid()}.jsonl"
+                self._prune_due = True  # pruned by record() once its transaction is committed
+            return seg
+
+    def _prune_if_due(self) -> None:
+        with self._lock:
+            due, self._prune_due = self._prune_due, False
+        if due:
+            self._prune_segments()
+
+    def _prune_segments(self) -> None:
+        segments = self.segments()
+        # Each writer appends only to its newest segment; older ones of a pid were rotated away (closed)
+        newest_by_pid = {_segment_pid(seg): seg for seg in segments}
+        me = os.getpid()
+        live = {seg for pid, seg in newest_by_pid.items() if pid != me and _pid_alive(pid)} | {self._segment}
+        pruned = [seg for seg in segments[: max(0, len(segments) - self.max_segments + 1)] if seg not in live]
+        if not pruned:
+            return
+        conn = self._conn()
+        with conn:
+            conn.executemany("UPDATE failures SET segment = '' WHERE segment = ?", [(seg.name,) for seg in pruned])
+        for old in pruned:
+            old.unlink(missing_ok=True)
+
+    def segments(self) -> list[Path]:
+        return sorted(self.directory.glob("failures_*.jsonl"))
+
+    def record(self, payload: dict) -> Path:
+        """Index the failure and append the full record if (key, error_type) is new. Returns its segment."""
+        now = time.time()
+        window = int(now // self.window_seconds) * self.window_seconds
+        line = dumps_line(payload)
+
+        conn = self._conn()
+        with conn:
+            # One upsert: the write lock is taken here, so concurrent recorders of the same
+            # failure serialize instead of racing a separate check and insert
+            occurrences, segment_name = conn.execute(
+                "INSERT INTO failures VALUES (?, ?, ?, ?, ?, ?, 1, ?, '', NULL) "
+                "ON CONFLICT(key, error_type) DO UPDATE SET occurrences = occurrences + 1, "
+                "last_seen = excluded.last_seen, provider = excluded.provider, model = excluded.model, "
+                "resolved_at = NULL "
+                "RETURNING occurrences, segment",
+                (
+                    payload["key"],
+                    payload["error_type"],
+                    payload["provider"],
+                    payload["model"],
+                    now,
+                    now,
+                    payload["error_message"][:500],
+                ),
+            ).fetchone()
+            # Only a record that gets written (new, or its segment was pruned) needs a segment
+            segment = None
+            if not segment_name:
+                segment = self._current_segment(len(line))
+                conn.execute(
+                    "UPDATE failures SET segment = ? WHERE key = ? AND error_type = ?",
+                    (segment.name, payload["key"], payload["error_type"]),
+                )
+            conn.execute(
+                "INSERT INTO windows VALUES (?, ?, ?, ?, 1, ?) "
+                "ON CONFLICT(window_start, provider, model, error_type) DO UPDATE SET "
+                "occurrences = occurrences + 1, new_keys = new_keys + excluded.new_keys",
+                (window, payload["provider"], payload["model"], payload["error_type"], int(occurrences == 1)),
+            )
+        self._prune_if_due()
+
+        if segment is None:
+            return self.directory / segment_name
+
+        fd = os.open(segment, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        return segment
+
+    def summary(self, *, since_seconds: float = 3600, group_by: tuple[str, ...] = ("model", "error_type")) -> list[dict]:
+        """Failure counts per group over the last since_seconds, from the window index only."""
+        cols = [c for c in group_by if c in ("provider", "model", "error_type")]
+        select = ", ".join(cols + ["SUM(occurrences)", "SUM(new_keys)"])
+        sql = f"SELECT {select} FROM windows WHERE window_start >= ?"
+        if cols:
+            sql += f" GROUP BY {', '.join(cols)} ORDER BY SUM(occurrences) DESC"
+        since = int((time.time() - since_seconds) // self.window_seconds) * self.window_seconds
+        rows = self._conn().execute(sql, (since,)).fetchall()
+        return [dict(zip(cols + ["occurrences", "unique_keys"], row)) for row in rows if row[-1] is not None]
+
+    def query(
+        self,
+        *,
+        error_type: str | None = None,
+        model: str | None = None,
+        since_seconds: float | None = None,
+        include_resolved: bool = False,
+        limit: int = 100,
+    ) -> list[dict]:
+        """Deduplicated failures (one row per key + error_type), newest first."""
+        where, params = [], []
+        if not include_resolved:
+            where.append("resolved_at IS NULL")
+        if error_type:
+            where.append("error_type = ?")
+            params.append(error_type)
+        if model:
+            where.append("model = ?")
+            params.append(model)
+        if since_seconds is not None:
+            where.append("last_seen >= ?")
+            params.append(time.time() - since_seconds)
+        sql = (
+            "SELECT key, error_type, provider, model, first_seen, last_seen, occurrences, error_message, segment "
+            "FROM failures"
+        )
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY last_seen DESC LIMIT ?"
+        cols = ["key", "error_type", "provider", "model", "first_seen", "last_seen", "occurrences", "error_message", "segment"]
+        return [dict(zip(cols, row)) for row in self._conn().execute(sql, (*params, limit)).fetchall()]
+
+    def mark_resolved(self, key: str) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("UPDATE failures SET resolved_at = ? WHERE key = ?", (time.time(), key))
+
+
+_failure_log: tuple[tuple, FailureLog] | None = None  # (settings it was built from, log)
+_failure_log_lock = threading.Lock()
+
+def get_failure_log() -> FailureLog:
+    global _failure_log
+    s = get_settings()
+    key = (s.failure_log_max_bytes, s.failure_log_max_segments, s.failure_window_seconds)
+    with _failure_log_lock:
+        if _failure_log is None or _failure_log[0] != key:
+            _failure_log = (
+                key,
+                FailureLog(
+                    FAIL_DIR,
+                    max_bytes=s.failure_log_max_bytes,
+                    max_segments=s.failure_log_max_segments,
+                    window_seconds=s.failure_window_seconds,
+                ),
+            )
+        return _failure_log[1]
+
+
+def _input_path(key: str, encrypted: bool) -> Path:
+    # Content-addressed: out/fail/inputs/ab/abcdef0123456789.txt (.enc when encrypted)
+    return FAIL_DIR / "inputs" / key[:2] / f"{key}.{'enc' if encrypted else 'txt'}"
+
+
+def _fernet():
+    key = get_settings().failure_input_key
+    if not key:
+        return None
+    try:
+        from cryptography.fernet import Fernet  # optional dependency
+    except ImportError as e:
+        raise RuntimeError("FAILURE_INPUT_KEY is set but the 'cryptography' package is not installed.") from e
+    return Fernet(key.encode("ascii"))
+
+
+def save_failure_input(key: str, text: str) -> Path:
+    """Store the intake text under its content key (encrypted with FAILURE_INPUT_KEY when set)."""
+    fernet = _fernet()
+    path = _input_path(key, fernet is not None)
+    if path.exists():
+        return path  # same key -> same content
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = text.encode("utf-8")
+    if fernet is not None:
+        data = fernet.encrypt(data)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+    return path
+
+
+def load_failure_input(key: str) -> str | None:
+    """Original intake text for a failure key, or None if it wasn't kept (or doesn't match its key)."""
+    fernet = _fernet()
+    for encrypted in (True, False):
+        path = _input_path(key, encrypted)
+        if not path.exists():
+            continue
+        data = path.read_bytes()
+        if encrypted:
+            if fernet is None:
+                raise RuntimeError(f"{path} is encrypted; set FAILURE_INPUT_KEY to replay it.")
+            data = fernet.decrypt(data)
+        text = data.decode("utf-8")
+        # Content-addressed, so the key doubles as an integrity check
+        return text if _sha256_hex(text)[:16] == key else None
+    return None
+
+
+def _file_failures() -> list[dict]:
+    out = []
+    for path in FAIL_DIR.glob("intake_failure_*.json"):
+        try:
+            record = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        ts = datetime.strptime(record["timestamp_utc"], "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+        out.append({**record, "last_seen": ts.timestamp(), "artifact": str(path)})
+    return out
+
+
+def select_failures(
+    *,
+    error_type: str | None = None,
+    model: str | None = None,
+    since_seconds: float | None = None,
+    limit: int = 1000,
+) -> list[dict]:
+    """
+    Unresolved failures matching the filters, one per key, newest first.
+    Reads the FailureLog index (FAILURE_STORE=log) or the out/fail/ artifacts (files).
+    """
+    if get_settings().failure_store == "log":
+        rows = get_failure_log().query(
+            error_type=error_type, model=model, since_seconds=since_seconds, limit=limit * 4
+        )
+    else:
+        cutoff = time.time() - since_seconds if since_seconds is not None else None
+        rows = [
+            r
+            for r in _file_failures()
+            if (not error_type or r["error_type"] == error_type)
+            and (not model or r["model"] == model)
+            and (cutoff is None or r["last_seen"] >= cutoff)
+        ]
+        rows.sort(key=lambda r: r["last_seen"], reverse=True)
+
+    seen: set[str] = set()
+    selected = []
+    for row in rows:
+        if row["key"] in seen:
+            continue
+        seen.add(row["key"])
+        selected.append(row)
+        if len(selected) >= limit:
+            break
+    return selected
+
+
+def mark_resolved(key: str) -> None:
+    """A replay of this key succeeded: resolve its failures and drop the stored input."""
+    if get_settings().failure_store == "log":
+        get_failure_log().mark_resolved(key)
+    else:
+        resolved_dir = FAIL_DIR / "resolved"
+        resolved_dir.mkdir(exist_ok=True)
+        for path in FAIL_DIR.glob(f"intake_failure_{key}_*.json"):
+            path.replace(resolved_dir / path.name)
+    for encrypted in (True, False):
+        _input_path(key, encrypted).unlink(missing_ok=True)
+
+
+def parse_seconds(value: str) -> float:
+    # "90", "15m", "1h", "2d"
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query the aggregated failure log (FAILURE_STORE=log)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_summary = sub.add_parser("summary", help="Failure counts per model/error type")
+    p_summary.add_argument("--since", default="1h", help="Time window, e.g. 15m, 1h, 2d (default 1h)")
+    p_summary.add_argument(
+        "--by",
+        default="model,error_type",
+        help="Comma-separated grouping: provider, model, error_type",
+    )
+
+    p_list = sub.add_parser("list", help="Deduplicated failures, newest first")
+    p_list.add_argument("--since", default=None)
+    p_list.add_argument("--error-type", default=None)
+    p_list.add_argument("--model", default=None)
+    p_list.add_argument("--limit", type=int, default=50)
+    p_list.add_argument("--include-resolved", action="store_true")
+
+    args = parser.parse_args()
+    log = get_failure_log()
+
+    if args.command == "summary":
+        rows = log.summary(since_seconds=parse_seconds(args.since), group_by=tuple(args.by.split(",")))
+        print(f"Failures in the last {args.since}")
+        print("=" * 40)
+        for row in rows:
+            labels = " ".join(f"{k}={v}" for k, v in row.items() if k not in ("occurrences", "unique_keys"))
+            print(f"{labels}  occurrences={row['occurrences']} unique={row['unique_keys']}")
+        if not rows:
+            print("(none)")
+        return
+
+    since = parse_seconds(args.since) if args.since else None
+    rows = log.query(
+        error_type=args.error_type,
+        model=args.model,
+        since_seconds=since,
+        include_resolved=args.include_resolved,
+        limit=args.limit,
+    )
+    for row in rows:
+        print(json.dumps(row, ensure_ascii=False))
 
-    payload = {
-        "key": key,
-        "timestamp_utc": ts,
-        "provider": provider,
-        "model": model,
-        "error_type": error_type,
-        "error_message": error_message,
-        "raw_output_preview": raw[:200] if keep_raw else "",  # cap
-    }
 
-    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
-    return path
\ No newline at end of file
+if __name__ == "__main__":
+    main()
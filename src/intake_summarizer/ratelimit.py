@@ -0,0 +1,201 @@
+import asyncio
+import threading
+import time
+
+from intake_summarizer.errors import RetryableLLMError
+from intake_summarizer.retry import current_deadline
+from intake_summarizer.settings import Settings, get_settings, on_settings_change
+
+# Rough chars-per-token ratio used to charge a request up front (reconciled with real usage afterwards)
+CHARS_PER_TOKEN = 4
+# Expected structured output size; IntakeSummary is small and capped field by field
+EXPECTED_OUTPUT_TOKENS = 400
+# Re-check interval while waiting for a concurrency slot
+_SLOT_POLL_SECONDS = 0.05
+
+
+def estimate_tokens(text: str, *, overhead_chars: int = 0) -> int:
+    return (len(text) + overhead_chars) // CHARS_PER_TOKEN + EXPECTED_OUTPUT_TOKENS
+
+
+class TokenBucket:
+    """Refills at rate_per_minute, holds at most one minute of budget. Not thread-safe on its own."""
+
+    def __init__(self, rate_per_minute: float) -> None:
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def set_rate(self, rate_per_minute: float, now: float) -> None:
+        # Budget already earned is kept, up to the new capacity
+        self._refill(now)
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.tokens = min(self.tokens, self.capacity)
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` is available (0 if it is available now)."""
+        self._refill(now)
+        # A request larger than the bucket can still go once the bucket is full
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.tokens -= amount
+
+
+def _until_deadline(wait: float) -> float:
+    # A queued call never sleeps past the caller's deadline (retry.deadline_scope)
+    deadline = current_deadline()
+    if deadline is None:
+        return wait
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise RetryableLLMError("Request deadline exceeded while waiting for the rate limiter.")
+    return min(wait, remaining)
+
+
+class AdaptiveRateLimiter:
+    """
+    Client-side limiter for one provider/model.
+    - Token buckets for requests/minute and tokens/minute; estimated tokens are charged up front.
+    - Concurrency adapts AIMD-style: +1 slot per `limit` successes, x decrease_factor on 429/5xx/timeout
+      (at most once per cooldown, so one burst of throttles counts as one signal).
+    Works from threads (acquire) and from the event loop (acquire_async).
+    """
+
+    def __init__(
+        self,
+        *,
+        rpm: float,
+        tpm: float,
+        max_concurrency: int,
+        min_concurrency: int = 1,
+        decrease_factor: float = 0.5,
+        cooldown_seconds: float = 5.0,
+    ) -> None:
+        self.requests = TokenBucket(rpm)
+        self.token_budget = TokenBucket(tpm)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.decrease_factor = decrease_factor
+        self.cooldown_seconds = cooldown_seconds
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.successes = 0
+        self.throttles = 0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def configure(self, *, rpm: float, tpm: float, max_concurrency: int) -> None:
+        """Apply new limits in place (settings reload): in-flight calls and the AIMD state carry over."""
+        now = time.monotonic()
+        with self._lock:
+            self.requests.set_rate(rpm, now)
+            self.token_budget.set_rate(tpm, now)
+            self.max_concurrency = max_concurrency
+            self.limit = min(self.limit, float(max_concurrency))
+
+    def _try_acquire(self, est_tokens: int) -> float:
+        # Returns 0 when a slot and both budgets were taken, else how long to wait before retrying
+        now = time.monotonic()
+        with self._lock:
+            if self.in_flight >= int(self.limit):
+                return _SLOT_POLL_SECONDS
+            wait = max(self.requests.wait_time(1, now), self.token_budget.wait_time(est_tokens, now))
+            if wait > 0:
+                return wait
+            self.requests.take(1)
+            self.token_budget.take(est_tokens)
+            self.in_flight += 1
+            return 0.0
+
+    def acquire(self, est_tokens: int) -> None:
+        while (wait := self._try_acquire(est_tokens)) > 0:
+            time.sleep(_until_deadline(wait))
+
+    async def acquire_async(self, est_tokens: int) -> None:
+        while (wait := self._try_acquire(est_tokens)) > 0:
+            await asyncio.sleep(_until_deadline(wait))
+
+    def release(self, *, throttled: bool = False, ok: bool = True, est_tokens: int = 0, used_tokens: int | None = None) -> None:
+        """
+        Give the slot back and feed the outcome into the AIMD controller.
+        used_tokens (from the response usage) corrects the up-front estimate.
+        """
+        with self._lock:
+            self.in_flight -= 1
+            if used_tokens is not None:
+                self.token_budget.take(used_tokens - est_tokens)
+
+            if throttled:
+                self.throttles += 1
+                now = time.monotonic()
+                if now - self._last_decrease >= self.cooldown_seconds:
+                    self.limit = max(self.min_concurrency, self.limit * self.decrease_factor)
+                    self._last_decrease = now
+            elif ok:
+                self.successes += 1
+                self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+
+    def state(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            self.requests._refill(now)
+            self.token_budget._refill(now)
+            return {
+                "concurrency_limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "requests_available": int(self.requests.tokens),
+                "tokens_available": int(self.token_budget.tokens),
+                "successes": self.successes,
+                "throttles": self.throttles,
+            }
+
+
+_limiters: dict[tuple[str, str], AdaptiveRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, model: str) -> AdaptiveRateLimiter | None:
+    """Shared limiter per provider/model (sync and async clients in a process share it); None if disabled."""
+    s = get_settings()
+    if not s.rate_limit_enabled:
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get((provider, model))
+        if limiter is None:
+            limiter = _limiters[(provider, model)] = AdaptiveRateLimiter(
+                rpm=s.rate_limit_rpm,
+                tpm=s.rate_limit_tpm,
+                max_concurrency=s.rate_limit_max_concurrency,
+            )
+        return limiter
+
+
+@on_settings_change
+def _apply_limits(old: Settings, new: Settings) -> None:
+    # Limiters are shared by live clients, so they are updated rather than replaced
+    if (old.rate_limit_rpm, old.rate_limit_tpm, old.rate_limit_max_concurrency) == (
+        new.rate_limit_rpm,
+        new.rate_limit_tpm,
+        new.rate_limit_max_concurrency,
+    ):
+        return
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    for limiter in limiters:
+        limiter.configure(rpm=new.rate_limit_rpm, tpm=new.rate_limit_tpm, max_concurrency=new.rate_limit_max_concurrency)
+
+
+def limiter_states() -> dict[str, dict]:
+    with _limiters_lock:
+        items = list(_limiters.items())
+    return {f"{provider}:{model}": limiter.state() for (provider, model), limiter in items}
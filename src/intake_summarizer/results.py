@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Literal, Optional
+from typing import Dict, Literal, Optional
 
 class IntakeResult(BaseModel):
     status: Literal["ok", "failed"]
@@ -8,4 +8,10 @@ class IntakeResult(BaseModel):
     # failure fields
     error_type: Optional[str] = None
     error_message: Optional[str] = None
-    failure_artifact: Optional[str] = None
\ No newline at end of file
+    failure_artifact: Optional[str] = None
+
+    # timing (see tracing.py); per-stage wall time in ms, LLM attempts, bytes persisted
+    trace_id: Optional[str] = None
+    stage_ms: Optional[Dict[str, float]] = None
+    attempts: Optional[int] = None
+    bytes_written: Optional[int] = None
\ No newline at end of file
@@ -0,0 +1,251 @@
+import asyncio
+import contextvars
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterator, TypeVar
+
+from intake_summarizer.errors import RetryableLLMError
+from intake_summarizer.settings import Settings, get_settings, on_settings_change
+
+T = TypeVar("T")
+
+_logger = logging.getLogger(__name__)
+
+# Don't start another attempt with less time left than this (it could only time out)
+MIN_ATTEMPT_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter: attempt n sleeps uniform(0, min(max_delay, base_delay * 2**(n-1)))."""
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def backoff(self, attempt: int, rng: random.Random | None = None) -> float:
+        cap = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return (rng or random).uniform(0.0, cap)
+
+
+def default_policy() -> RetryPolicy:
+    s = get_settings()
+    return RetryPolicy(
+        max_attempts=s.retry_max_attempts,
+        base_delay=s.retry_base_delay,
+        max_delay=s.retry_max_delay,
+    )
+
+
+class RetryBudget:
+    """
+    Per-process cap on retries, so a provider outage doesn't turn into a retry storm.
+    Every first attempt deposits `ratio` tokens and the budget also refills at
+    min_per_second; each retry withdraws one token. Capacity bounds bursts.
+    """
+
+    def __init__(self, *, ratio: float = 0.2, min_per_second: float = 1.0, capacity: float = 20.0) -> None:
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.retries = 0
+        self.exhausted = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.min_per_second)
+        self.updated = now
+
+    def configure(self, *, ratio: float, min_per_second: float, capacity: float) -> None:
+        with self._lock:
+            self._refill(time.monotonic())
+            self.ratio = ratio
+            self.min_per_second = min_per_second
+            self.capacity = capacity
+            self.tokens = min(self.tokens, capacity)
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens < 1.0:
+                self.exhausted += 1
+                return False
+            self.tokens -= 1.0
+            self.retries += 1
+            return True
+
+    def state(self) -> dict:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {"tokens": round(self.tokens, 2), "retries": self.retries, "exhausted": self.exhausted}
+
+
+_budget: RetryBudget | None = None
+_budget_lock = threading.Lock()
+
+
+def get_retry_budget() -> RetryBudget:
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            s = get_settings()
+            _budget = RetryBudget(
+                ratio=s.retry_budget_ratio,
+                min_per_second=s.retry_budget_min_per_second,
+                capacity=s.retry_budget_capacity,
+            )
+        return _budget
+
+
+@on_settings_change
+def _apply_budget(old: Settings, new: Settings) -> None:
+    # Updated in place so the retry/exhausted counters (exported as metrics) keep counting
+    params = ("retry_budget_ratio", "retry_budget_min_per_second", "retry_budget_capacity")
+    if all(getattr(old, p) == getattr(new, p) for p in params):
+        return
+    with _budget_lock:
+        budget = _budget
+    if budget is not None:
+        budget.configure(
+            ratio=new.retry_budget_ratio,
+            min_per_second=new.retry_budget_min_per_second,
+            capacity=new.retry_budget_capacity,
+        )
+
+
+class Deadline:
+    """Absolute point in time (monotonic) by which a request must be finished."""
+
+    def __init__(self, seconds: float) -> None:
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+
+_current_deadline: contextvars.ContextVar[Deadline | None] = contextvars.ContextVar("intake_deadline", default=None)
+
+
+def current_deadline() -> Deadline | None:
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(seconds: float | None = None) -> Iterator[Deadline | None]:
+    """
+    Sets the deadline for everything called inside (REQUEST_DEADLINE_SECONDS by default; 0 = none).
+    An enclosing, earlier deadline is kept. Carried by contextvars, so it follows
+    awaits, asyncio tasks and asyncio.to_thread.
+    """
+    if seconds is None:
+        seconds = get_settings().request_deadline_seconds
+    outer = _current_deadline.get()
+    deadline = Deadline(seconds) if seconds else None
+    if outer is not None and (deadline is None or outer.expires_at <= deadline.expires_at):
+        deadline = outer
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def request_timeout(default: float) -> float:
+    """Timeout for one LLM call: the client default, shrunk to the time left before the deadline."""
+    deadline = current_deadline()
+    if deadline is None:
+        return default
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise RetryableLLMError("Request deadline exceeded before calling the LLM.")
+    return min(default, remaining)
+
+
+def _next_delay(
+    attempt: int,
+    error: RetryableLLMError,
+    policy: RetryPolicy,
+    budget: RetryBudget | None,
+) -> float | None:
+    # Delay before the next attempt, or None when we should give up and re-raise
+    if attempt >= policy.max_attempts:
+        return None
+    delay = policy.backoff(attempt)
+    deadline = current_deadline()
+    if deadline is not None and deadline.remaining() < delay + MIN_ATTEMPT_SECONDS:
+        return None
+    if budget is not None and not budget.try_withdraw():
+        _logger.warning("Retry budget exhausted; not retrying: %s", error)
+        return None
+    return delay
+
+
+OnRetry = Callable[[int, float, RetryableLLMError], None]
+
+
+def call_with_retry(
+    fn: Callable[[], T],
+    *,
+    policy: RetryPolicy | None = None,
+    budget: RetryBudget | None = None,
+    on_retry: OnRetry | None = None,
+) -> T:
+    """
+    Call fn, retrying RetryableLLMError only (NonRetryableLLMError and anything else propagate at once).
+    Stops early when the retry budget is empty or the current deadline can't fit another attempt.
+    """
+    policy = policy or default_policy()
+    budget = budget if budget is not None else get_retry_budget()
+    budget.deposit()
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return fn()
+        except RetryableLLMError as e:
+            delay = _next_delay(attempt, e, policy, budget)
+            if delay is None:
+                raise
+            if on_retry is not None:
+                on_retry(attempt, delay, e)
+            time.sleep(delay)
+
+
+async def acall_with_retry(
+    fn: Callable[[], Awaitable[T]],
+    *,
+    policy: RetryPolicy | None = None,
+    budget: RetryBudget | None = None,
+    on_retry: OnRetry | None = None,
+) -> T:
+    """call_with_retry for coroutines: backs off with asyncio.sleep."""
+    policy = policy or default_policy()
+    budget = budget if budget is not None else get_retry_budget()
+    budget.deposit()
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return await fn()
+        except RetryableLLMError as e:
+            delay = _next_delay(attempt, e, policy, budget)
+            if delay is None:
+                raise
+            if on_retry is not None:
+                on_retry(attempt, delay, e)
+            await asyncio.sleep(delay)
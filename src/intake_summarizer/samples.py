@@ -0,0 +1,113 @@
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from intake_summarizer.httpcache import strong_etag
+from intake_summarizer.jsonio import dumps
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SampleSnapshot:
+    """One immutable load of the catalog; swapped as a whole on reload."""
+
+    samples: list[dict] = field(default_factory=list)  # index entries whose files exist
+    texts: dict[str, str] = field(default_factory=dict)  # id -> sample text
+    body: bytes = b'{"samples":[]}'  # pre-rendered GET /api/samples body
+    etag: str = '""'
+    signature: tuple = ()  # (path relative to the catalog dir, mtime_ns, size) of index.json + every listed file
+
+
+def _stat(directory: Path, name: str) -> tuple:
+    # name is kept as written in index.json (it may include subdirectories) so it can be re-statted later
+    try:
+        st = (directory / name).stat()
+        return (name, st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        return (name, None, None)
+
+
+class SampleCatalog:
+    """
+    samples/index.json and the sample texts, held in memory.
+    - Loaded once at construction; requests read the current snapshot with no filesystem work.
+    - At most every check_interval seconds, snapshot() re-stats the files and reloads
+      only if an mtime/size changed (0 = check on every call).
+    - reload() forces a reload (admin endpoint). A broken index keeps the previous snapshot.
+    """
+
+    def __init__(self, directory: Path, *, check_interval: float = 2.0) -> None:
+        self.directory = directory
+        self.index_path = directory / "index.json"
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._next_check = time.monotonic() + check_interval
+        self._snapshot = SampleSnapshot()
+        self._reload_locked()
+
+    def snapshot(self) -> SampleSnapshot:
+        now = time.monotonic()
+        if now >= self._next_check:
+            with self._lock:
+                if now >= self._next_check:
+                    self._next_check = now + self.check_interval
+                    if self._current_signature() != self._snapshot.signature:
+                        self._reload_locked()
+        return self._snapshot
+
+    def reload(self) -> SampleSnapshot:
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            self._reload_locked()
+            return self._snapshot
+
+    def samples(self) -> list[dict]:
+        return self.snapshot().samples
+
+    def text(self, sample_id: str) -> str | None:
+        return self.snapshot().texts.get(sample_id)
+
+    def _listed_files(self) -> list[str]:
+        return [name for name, _, _ in self._snapshot.signature[1:]]
+
+    def _current_signature(self) -> tuple:
+        return (_stat(self.directory, self.index_path.name), *(_stat(self.directory, n) for n in self._listed_files()))
+
+    def _reload_locked(self) -> None:
+        try:
+            self._snapshot = self._load()
+            self.reloads += 1
+        except (OSError, ValueError) as e:
+            logger.warning("Keeping previous samples catalog; reload of %s failed: %s", self.index_path, e)
+
+    def _load(self) -> SampleSnapshot:
+        # Stat before reading, so an edit that lands mid-load is picked up by the next check
+        signature = [_stat(self.directory, self.index_path.name)]
+        if signature[0][1] is None:
+            entries = []
+        else:
+            entries = json.loads(self.index_path.read_text(encoding="utf-8")).get("samples", [])
+
+        samples, texts = [], {}
+        for s in entries:
+            fn = s.get("filename")
+            if not fn:
+                continue
+            path = self.directory / fn
+            signature.append(_stat(self.directory, fn))
+            # Only include entries whose files exist
+            try:
+                texts[s.get("id")] = path.read_text(encoding="utf-8")
+            except FileNotFoundError:
+                continue
+            samples.append(s)
+
+        body = dumps({"samples": samples}, pretty=False)
+        return SampleSnapshot(
+            samples=samples, texts=texts, body=body, etag=strong_etag(body), signature=tuple(signature)
+        )
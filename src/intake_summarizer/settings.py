@@ -1,14 +1,231 @@
-from pydantic import BaseModel
-from dotenv import load_dotenv
+from pydantic import BaseModel, ConfigDict, Field
+from dotenv import dotenv_values, find_dotenv
+from pathlib import Path
+from typing import Any, Callable
+import logging
 import os
+import signal
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# .env-style file with overrides; watched for changes (see get_settings). The real environment wins over it.
+SETTINGS_FILE = os.getenv("SETTINGS_FILE") or find_dotenv()
+_PROCESS_ENV = frozenset(os.environ)
+_file_keys: set[str] = set()
+
+
+def _apply_settings_file() -> None:
+    """(Re)load SETTINGS_FILE into os.environ, like load_dotenv() but picking up edits and removals."""
+    global _file_keys
+    values = dotenv_values(SETTINGS_FILE) if SETTINGS_FILE and Path(SETTINGS_FILE).is_file() else {}
+    values = {k: v for k, v in values.items() if v is not None and k not in _PROCESS_ENV}
+    for key in _file_keys - values.keys():
+        os.environ.pop(key, None)
+    os.environ.update(values)
+    _file_keys = set(values)
+
+
+_apply_settings_file()
+
+
+def _env(name: str, default: str | None = None, cast: Callable[[str], Any] = str) -> Any:
+    # Read when a snapshot is built (not once at import); unset/empty -> default
+    def read() -> Any:
+        raw = os.getenv(name) or default
+        return None if raw is None else cast(raw)
+
+    return Field(default_factory=read)
+
+
+def _flag(name: str, default: bool) -> Any:
+    return Field(default_factory=lambda: os.getenv(name, "1" if default else "0") == "1")
 
-load_dotenv()
 
 class Settings(BaseModel):
-    llm_provider: str = os.getenv("LLM_PROVIDER", "mock")
-    llm_model: str = os.getenv("LLM_MODEL", "gpt-5.2")
-    openai_api_key: str | None = os.getenv("OPENAI_API_KEY")
+    # Immutable: one snapshot is shared by every caller (see get_settings)
+    model_config = ConfigDict(frozen=True)
+
+    llm_provider: str = _env("LLM_PROVIDER", "mock")
+    llm_model: str = _env("LLM_MODEL", "gpt-5.2")
+    openai_api_key: str | None = _env("OPENAI_API_KEY")
+    # e.g. http://127.0.0.1:8001/v1 for the local fake (fake_openai.py); unset = api.openai.com
+    openai_base_url: str | None = _env("OPENAI_BASE_URL")
+
+    # Connection pool for the long-lived OpenAI clients (see clients.py)
+    openai_max_connections: int = _env("OPENAI_MAX_CONNECTIONS", "100", int)
+    openai_max_keepalive: int = _env("OPENAI_MAX_KEEPALIVE", "20", int)
+    openai_keepalive_expiry: float = _env("OPENAI_KEEPALIVE_EXPIRY", "60", float)
+    openai_http2: bool = _flag("OPENAI_HTTP2", False)
+    openai_timeout_seconds: float = _env("OPENAI_TIMEOUT_SECONDS", "30", float)
+
+    # Read-through summary cache in summarize_intake (see cache.py)
+    summary_cache_enabled: bool = _flag("SUMMARY_CACHE", True)
+    summary_cache_size: int = _env("SUMMARY_CACHE_SIZE", "1024", int)
+    summary_cache_ttl_seconds: float = _env("SUMMARY_CACHE_TTL_SECONDS", "3600", float)
+    summary_cache_dir: str | None = _env("SUMMARY_CACHE_DIR")  # disk tier off when unset
+
+    # POST /api/summarize/batch
+    batch_max_items: int = _env("BATCH_MAX_ITEMS", "500", int)
+    batch_max_concurrency: int = _env("BATCH_MAX_CONCURRENCY", "8", int)
+
+    # Prefect batch flow: task runner (threads | processes | sequential) and LLM call limit
+    flow_task_runner: str = _env("FLOW_TASK_RUNNER", "threads")
+    flow_max_workers: int | None = _env("FLOW_MAX_WORKERS", "0", lambda v: int(v) or None)
+    llm_max_concurrency: int = _env("LLM_MAX_CONCURRENCY", "8", int)
+    # LLM_MAX_CONCURRENCY is per process: with FLOW_TASK_RUNNER=processes set this Prefect
+    # global concurrency limit (shared across processes and workers) to cap calls overall
+    llm_concurrency_limit_name: str | None = _env("LLM_CONCURRENCY_LIMIT_NAME")
+
+    # Summary persistence backend: file (one JSON per intake in out/) | sqlite (indexed, WAL)
+    persist_backend: str = _env("PERSIST_BACKEND", "file")
+    persist_sqlite_path: str = _env("PERSIST_SQLITE_PATH", "out/summaries.db")
+
+    # Failure artifacts: files (one JSON per failure in out/fail/) | log (rotating, deduplicated, indexed)
+    failure_store: str = _env("FAILURE_STORE", "files")
+    failure_log_max_bytes: int = _env("FAILURE_LOG_MAX_BYTES", str(64 * 1024 * 1024), int)
+    failure_log_max_segments: int = _env("FAILURE_LOG_MAX_SEGMENTS", "50", int)
+    failure_window_seconds: int = _env("FAILURE_WINDOW_SECONDS", "300", int)
+    # Keep failed intake texts (by content key) so `replay-failures` can re-drive them
+    failure_keep_input: bool = _flag("FAILURE_KEEP_INPUT", False)
+    failure_input_key: str | None = _env("FAILURE_INPUT_KEY")  # Fernet key; encrypts kept inputs
+
+    # Client-side adaptive rate limiter around the OpenAI clients (see ratelimit.py)
+    rate_limit_enabled: bool = _flag("RATE_LIMIT_ENABLED", True)
+    rate_limit_rpm: float = _env("RATE_LIMIT_RPM", "500", float)
+    rate_limit_tpm: float = _env("RATE_LIMIT_TPM", "200000", float)
+    rate_limit_max_concurrency: int = _env("RATE_LIMIT_MAX_CONCURRENCY", "32", int)
+
+    # Per-intake trace spans (see tracing.py): none | console (stderr) | file (JSONL at TRACE_FILE)
+    trace_exporter: str = _env("TRACE_EXPORTER", "none")
+    trace_file: str = _env("TRACE_FILE", "out/traces.jsonl")
+
+    # Retries of RetryableLLMError in every entry point (see retry.py)
+    retry_max_attempts: int = _env("RETRY_MAX_ATTEMPTS", "3", int)
+    retry_base_delay: float = _env("RETRY_BASE_DELAY", "0.5", float)
+    retry_max_delay: float = _env("RETRY_MAX_DELAY", "8", float)
+    retry_budget_ratio: float = _env("RETRY_BUDGET_RATIO", "0.2", float)
+    retry_budget_min_per_second: float = _env("RETRY_BUDGET_MIN_PER_SECOND", "1", float)
+    retry_budget_capacity: float = _env("RETRY_BUDGET_CAPACITY", "20", float)
+    # End-to-end time allowed per intake (all attempts + backoff); 0 = no deadline
+    request_deadline_seconds: float = _env("REQUEST_DEADLINE_SECONDS", "60", float)
+
+    # Web app sample catalog: how often (seconds) to re-stat samples/ for changes; 0 = every request
+    samples_check_seconds: float = _env("SAMPLES_CHECK_SECONDS", "2", float)
+    # POST /admin/* needs this in an X-Admin-Token header; unset = admin endpoints disabled
+    admin_token: str | None = _env("ADMIN_TOKEN")
+
+    # Multi-file / zip uploads on the web app (see uploads.py); each file is still capped at MAX_UPLOAD_BYTES
+    upload_max_files: int = _env("UPLOAD_MAX_FILES", "100", int)
+    upload_max_zip_bytes: int = _env("UPLOAD_MAX_ZIP_BYTES", "20000000", int)
+    # Whole multipart request body (all files together); larger uploads get 413 before they are spooled
+    upload_max_request_bytes: int = _env("UPLOAD_MAX_REQUEST_BYTES", "25000000", int)
+
+    # HTTP responses of app.py / api.py (see compression.py, httpcache.py)
+    compression_enabled: bool = _flag("COMPRESSION_ENABLED", True)
+    compression_min_bytes: int = _env("COMPRESSION_MIN_BYTES", "1024", int)
+    compression_gzip_level: int = _env("COMPRESSION_GZIP_LEVEL", "6", int)
+    compression_brotli_quality: int = _env("COMPRESSION_BROTLI_QUALITY", "4", int)  # 11 is too slow per request
+    static_max_age_seconds: int = _env("STATIC_MAX_AGE_SECONDS", "3600", int)
+
+    # Mock provider chaos (failure injection for testing)
+    mock_chaos: bool = _flag("MOCK_CHAOS", False)
+    mock_chaos_rate: float = _env("MOCK_CHAOS_RATE", "0.0", float)
+    mock_chaos_seed: int | None = _env("MOCK_CHAOS_SEED", None, lambda v: int(v) if v.strip().isdigit() else None)
+
+    # How often get_settings() checks SETTINGS_FILE for edits; 0 = only on SIGHUP / reload_settings()
+    settings_check_seconds: float = _env("SETTINGS_CHECK_SECONDS", "2", float)
+
+    # Persisted summaries / failure records are compact JSON; 1 = indented (for reading by hand)
+    pretty_json: bool = _flag("PRETTY_JSON", False)
+
+_lock = threading.Lock()
+_snapshot: Settings | None = None
+_file_state: tuple | None = None
+_next_check = 0.0
+_reload_requested = False
+_listeners: list[Callable[[Settings, Settings], None]] = []
+
+
+def _settings_file_state() -> tuple | None:
+    try:
+        st = os.stat(SETTINGS_FILE) if SETTINGS_FILE else None
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size) if st else None
+
 
 def get_settings() -> Settings:
-    # re-read env each time (good for tests)
-    return Settings()
\ No newline at end of file
+    """
+    Current settings snapshot: immutable and shared, so calling this on hot paths costs no construction.
+    A new snapshot is built after reload_settings() / SIGHUP, or when SETTINGS_FILE changed
+    (checked at most every SETTINGS_CHECK_SECONDS). Code that builds long-lived objects from settings
+    keys them on the fields it uses, so a reload rebuilds only what actually changed.
+    """
+    snap = _snapshot
+    if snap is not None and not _reload_requested and time.monotonic() < _next_check:
+        return snap
+    return _refresh()
+
+
+def _refresh() -> Settings:
+    global _snapshot, _file_state, _next_check, _reload_requested
+    with _lock:
+        old = _snapshot
+        now = time.monotonic()
+        if old is not None and not _reload_requested and now < _next_check:
+            return old  # another thread just checked
+        state = _settings_file_state()
+        if old is None or _reload_requested or state != _file_state:
+            _reload_requested = False
+            if old is not None:
+                _apply_settings_file()
+            _file_state = state
+            try:
+                new = Settings()
+            except ValueError as e:  # pydantic ValidationError included
+                if old is None:
+                    raise  # nothing to fall back to at startup
+                logger.error("Keeping previous settings; reload from %s failed: %s", SETTINGS_FILE or "environment", e)
+                new = old
+            if new != old:
+                _snapshot = new  # single reference swap: readers see the old or the new snapshot, never a mix
+        current = _snapshot
+        interval = current.settings_check_seconds
+        _next_check = now + interval if interval > 0 else float("inf")
+
+    if old is not None and current is not old:
+        logger.info("Settings reloaded")
+        for listener in list(_listeners):
+            try:
+                listener(old, current)
+            except Exception:
+                logger.exception("Settings reload listener %r failed", listener)
+    return current
+
+
+def reload_settings() -> Settings:
+    """Re-read SETTINGS_FILE + the environment now and return the (possibly unchanged) snapshot."""
+    request_reload()
+    return get_settings()
+
+
+def request_reload() -> None:
+    # Only sets a flag (safe from a signal handler); the next get_settings() call does the work
+    global _reload_requested
+    _reload_requested = True
+
+
+def on_settings_change(listener: Callable[[Settings, Settings], None]) -> Callable[[Settings, Settings], None]:
+    """Call listener(old, new) after each reload that changed something (for state updated in place)."""
+    _listeners.append(listener)
+    return listener
+
+
+def install_reload_signal() -> bool:
+    """SIGHUP -> reload settings. Only possible from the main thread on platforms that have SIGHUP."""
+    if not hasattr(signal, "SIGHUP") or threading.current_thread() is not threading.main_thread():
+        return False
+    signal.signal(signal.SIGHUP, lambda signum, frame: request_reload())
+    return True
\ No newline at end of file
@@ -1,35 +1,91 @@
-import json
+import asyncio
 from intake_summarizer.schema import IntakeSummary
-from intake_summarizer.llm_client import LLMClient, MockLLMClient, OpenAILLMClient
+from intake_summarizer.llm_client import (
+    AsyncLLMClient,
+    AsyncMockLLMClient,
+    LLMClient,
+    MockLLMClient,
+)
+from intake_summarizer.clients import get_pooled_async_client, get_pooled_client
+from intake_summarizer.cache import SummaryCache, cache_key, get_summary_cache
 from intake_summarizer.settings import get_settings
+from intake_summarizer.metrics import count_llm_error, stage_timer
+from intake_summarizer.tracing import span
 from pydantic import ValidationError
-import os
+
+from intake_summarizer.errors import NonRetryableLLMError, RetryableLLMError  # re-exported
 
 # class RetryableLLMError(RuntimeError):
 #     pass
 
-class RetryableLLMError(RuntimeError):
-    def __init__(self, message: str, *, raw: str | None = None):
-        super().__init__(message)
-        self.raw = raw
-
-class NonRetryableLLMError(ValueError):
-    def __init__(self, message: str, *, raw: str | None = None):
-        super().__init__(message)
-        self.raw = raw
+def _cache_lookup_key(text: str) -> tuple[SummaryCache | None, str | None]:
+    cache = get_summary_cache()
+    if cache is None:
+        return None, None
+    s = get_settings()
+    return cache, cache_key(text, provider=s.llm_provider, model=s.llm_model)
 
 def summarize_intake(text: str, client: LLMClient | None = None) -> IntakeSummary:
+    # Read-through cache for the configured provider; an explicit client always hits the LLM
+    cache, key = _cache_lookup_key(text) if client is None else (None, None)
+    if cache is not None:
+        with span("cache_lookup"):
+            cached = cache.get(key)
+        if cached is not None:
+            return cached
+
     client = client or get_llm_client()
-    raw = client.summarize(text)
+    try:
+        with stage_timer("llm"):
+            raw = client.summarize(text)
+        summary = _parse_summary(raw)
+    except (RetryableLLMError, NonRetryableLLMError) as e:
+        _count_error(e)
+        raise
 
+    if cache is not None:
+        cache.put(key, summary)
+    return summary
+
+async def summarize_intake_async(text: str, client: AsyncLLMClient | None = None) -> IntakeSummary:
+    """Same contract as summarize_intake, but awaits the LLM call."""
+    cache, key = _cache_lookup_key(text) if client is None else (None, None)
+    if cache is not None:
+        # disk tier does file IO; keep it off the event loop
+        with span("cache_lookup"):
+            cached = await asyncio.to_thread(cache.get, key) if cache.disk_dir else cache.get(key)
+        if cached is not None:
+            return cached
+
+    client = client or get_async_llm_client()
     try:
-        payload = json.loads(raw)
-    except json.JSONDecodeError as e:
-        raise RetryableLLMError(f"LLM output was not valid JSON: {e}", raw=raw) from e
+        with stage_timer("llm"):
+            raw = await client.summarize(text)
+        summary = _parse_summary(raw)
+    except (RetryableLLMError, NonRetryableLLMError) as e:
+        _count_error(e)
+        raise
+
+    if cache is not None:
+        if cache.disk_dir:
+            await asyncio.to_thread(cache.put, key, summary)
+        else:
+            cache.put(key, summary)
+    return summary
+
+def _count_error(e: Exception) -> None:
+    s = get_settings()
+    count_llm_error(e, provider=s.llm_provider, model=s.llm_model)
 
+def _parse_summary(raw: str | bytes) -> IntakeSummary:
+    # One pass in pydantic-core: parse + validate straight from the text, no intermediate dict
     try:
-        return IntakeSummary.model_validate(payload)
+        with stage_timer("parse_validate"):
+            return IntakeSummary.model_validate_json(raw)
     except ValidationError as e:
+        # Broken JSON is transient (retry); well-formed JSON with the wrong shape is a contract failure
+        if any(err["type"] == "json_invalid" for err in e.errors()):
+            raise RetryableLLMError(f"LLM output was not valid JSON: {e}", raw=raw) from e
         raise NonRetryableLLMError(f"LLM output failed schema validation: {e}", raw=raw) from e
 
 # def get_llm_client() -> LLMClient:
@@ -42,20 +98,31 @@ def summarize_intake(text: str, client: LLMClient | None = None) -> IntakeSummar
 #     raise ValueError(f"Unsupported LLM_PROVIDER: {s.llm_provider}")
 
 
+def _mock_chaos_kwargs() -> dict:
+    s = get_settings()
+    return {
+        "chaos_enabled": s.mock_chaos,
+        "chaos_rate": s.mock_chaos_rate,
+        "chaos_seed": s.mock_chaos_seed,
+    }
+
+
 def get_llm_client() -> LLMClient:
     s = get_settings()
     if s.llm_provider == "mock":
-        chaos_enabled = os.getenv("MOCK_CHAOS", "0") == "1"
-        chaos_rate = float(os.getenv("MOCK_CHAOS_RATE", "0.0"))
-        seed_raw = os.getenv("MOCK_CHAOS_SEED", "").strip()
-        chaos_seed = int(seed_raw) if seed_raw.isdigit() else None
-        return MockLLMClient(
-            chaos_enabled=chaos_enabled,
-            chaos_rate=chaos_rate,
-            chaos_seed=chaos_seed,
-        )
+        return MockLLMClient(**_mock_chaos_kwargs())
+    if s.llm_provider == "openai":
+        # long-lived client from the registry (shared connection pool)
+        return get_pooled_client()
+    raise ValueError(f"Unsupported LLM_PROVIDER: {s.llm_provider}")
+
+
+def get_async_llm_client() -> AsyncLLMClient:
+    s = get_settings()
+    if s.llm_provider == "mock":
+        return AsyncMockLLMClient(**_mock_chaos_kwargs())
     if s.llm_provider == "openai":
-        return OpenAILLMClient()
+        return get_pooled_async_client()
     raise ValueError(f"Unsupported LLM_PROVIDER: {s.llm_provider}")
 
 # def summarize_intake(text: str) -> IntakeSummary:
@@ -0,0 +1,154 @@
+import contextvars
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from opentelemetry import trace
+
+from intake_summarizer.jsonio import dumps_line
+from intake_summarizer.settings import get_settings
+
+TRACE_EXPORTERS = ("none", "console", "file")
+
+_tracer = trace.get_tracer("intake_summarizer")
+
+
+class IntakeTrace:
+    """
+    Per-intake trace: every span opened while it is current is recorded here.
+    - stage_ms / stage_counts aggregate spans by name (retries add up)
+    - attempts = LLM calls made (0 on a cache hit)
+    - bytes_written = bytes persisted for this intake
+    Spans also go through the OpenTelemetry API, so an installed SDK sees them too.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.trace_id = os.urandom(16).hex()
+        self.spans: list[dict] = []
+        self.stage_ms: dict[str, float] = {}
+        self.stage_counts: dict[str, int] = {}
+        self.bytes_written = 0
+        self._stack: list[str] = []
+        self._lock = threading.Lock()
+
+    @property
+    def attempts(self) -> int:
+        return self.stage_counts.get("llm", 0)
+
+    def _add(self, record: dict, duration_ms: float) -> None:
+        name = record["name"]
+        with self._lock:
+            self.spans.append(record)
+            self.stage_ms[name] = round(self.stage_ms.get(name, 0.0) + duration_ms, 3)
+            self.stage_counts[name] = self.stage_counts.get(name, 0) + 1
+
+    def summary(self) -> dict:
+        """Fields for IntakeResult and failure artifacts."""
+        with self._lock:
+            return {
+                "trace_id": self.trace_id,
+                "stage_ms": dict(self.stage_ms),
+                "attempts": self.attempts,
+                "bytes_written": self.bytes_written,
+            }
+
+
+_current: contextvars.ContextVar[IntakeTrace | None] = contextvars.ContextVar("intake_trace", default=None)
+
+
+def current_trace() -> IntakeTrace | None:
+    return _current.get()
+
+
+def record_bytes(n: int) -> None:
+    tr = _current.get()
+    if tr is not None:
+        with tr._lock:
+            tr.bytes_written += n
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[None]:
+    """Time a block as a span of the current intake trace (and of the OTel tracer, if one is configured)."""
+    tr = _current.get()
+    if tr is None:
+        with _tracer.start_as_current_span(name, attributes=attributes):
+            yield
+        return
+
+    parent = tr._stack[-1] if tr._stack else None
+    span_id = os.urandom(8).hex()
+    tr._stack.append(span_id)
+    start_ns = time.time_ns()
+    start = time.perf_counter()
+    status = "OK"
+    try:
+        with _tracer.start_as_current_span(name, attributes=attributes):
+            yield
+    except BaseException as e:
+        status = f"ERROR: {type(e).__name__}"
+        raise
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        tr._stack.pop()
+        tr._add(
+            {
+                "name": name,
+                "trace_id": tr.trace_id,
+                "span_id": span_id,
+                "parent_span_id": parent,
+                "start_time_unix_nano": start_ns,
+                "end_time_unix_nano": start_ns + int(duration_ms * 1e6),
+                "duration_ms": round(duration_ms, 3),
+                "status": status,
+                "attributes": attributes,
+            },
+            duration_ms,
+        )
+
+
+@contextmanager
+def intake_trace(name: str = "intake", **attributes: Any) -> Iterator[IntakeTrace]:
+    """
+    Root span for one intake. Nested calls join the enclosing trace.
+    Finished traces go to the TRACE_EXPORTER (console: stderr, file: TRACE_FILE as JSONL).
+    """
+    outer = _current.get()
+    if outer is not None:
+        with span(name, **attributes):
+            yield outer
+        return
+
+    tr = IntakeTrace(name)
+    token = _current.set(tr)
+    try:
+        with span(name, **attributes):
+            yield tr
+    finally:
+        _current.reset(token)
+        export(tr)
+
+
+def export(tr: IntakeTrace) -> None:
+    s = get_settings()
+    if s.trace_exporter == "none":
+        return
+    # Root span last, children in completion order; one line per span (OTLP-like field names)
+    data = b"".join(dumps_line(rec) for rec in tr.spans)
+    if s.trace_exporter == "console":
+        sys.stderr.write(data.decode("utf-8"))
+        return
+    if s.trace_exporter != "file":
+        raise ValueError(f"Unsupported TRACE_EXPORTER: {s.trace_exporter!r} (expected one of {TRACE_EXPORTERS})")
+    path = s.trace_file
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Single O_APPEND write per trace so concurrent workers don't interleave lines
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
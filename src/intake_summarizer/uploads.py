@@ -0,0 +1,227 @@
+import asyncio
+import codecs
+import zipfile
+import zlib
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import IO, Optional
+
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+from intake_summarizer.batch import BatchItem, BatchItemResult, BatchRequest, PipelineFn, run_batch
+from intake_summarizer.settings import get_settings
+
+UPLOAD_CHUNK_BYTES = 64 * 1024
+TEXT_SUFFIXES = (".txt",)
+ZIP_SUFFIXES = (".zip",)
+# What a damaged archive or member can raise from zipfile (bad headers, truncated or corrupt streams,
+# unsupported/encrypted entries); UploadTooLarge is a ValueError too
+ZIP_ERRORS = (
+    zipfile.BadZipFile,
+    zlib.error,
+    EOFError,
+    NotImplementedError,
+    ValueError,
+    IndexError,
+    RuntimeError,
+    OSError,
+)
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class TextDecoder:
+    """
+    Incremental upload decoding: UTF-8 chunk by chunk; on the first invalid byte
+    everything seen so far is re-decoded as latin-1 (valid UTF-8 round-trips, so no raw copy is kept).
+    """
+
+    def __init__(self) -> None:
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._parts: list[str] = []
+        self._latin1 = False
+
+    def feed(self, chunk: bytes, final: bool = False) -> None:
+        if self._latin1:
+            self._parts.append(chunk.decode("latin-1"))
+            return
+        try:
+            self._parts.append(self._utf8.decode(chunk, final))
+        except UnicodeDecodeError:
+            pending, _ = self._utf8.getstate()
+            seen = "".join(self._parts).encode("utf-8") + pending + chunk
+            self._parts = [seen.decode("latin-1", errors="replace")]
+            self._latin1 = True
+
+    def text(self) -> str:
+        if not self._latin1:
+            self.feed(b"", final=True)
+        return "".join(self._parts)
+
+
+async def read_upload_text(upload: UploadFile, *, max_bytes: int) -> str:
+    """
+    Read + decode in UPLOAD_CHUNK_BYTES chunks; raises UploadTooLarge as soon as max_bytes is passed.
+    The part is already spooled by the form parser; UploadSizeLimitMiddleware bounds the request body itself.
+    """
+    decoder = TextDecoder()
+    total = 0
+    while chunk := await upload.read(UPLOAD_CHUNK_BYTES):
+        total += len(chunk)
+        if total > max_bytes:
+            raise UploadTooLarge(f"File too large (max {max_bytes} bytes).")
+        decoder.feed(chunk)
+    return decoder.text()
+
+
+def _read_member_text(fileobj: IO[bytes], *, max_bytes: int) -> str:
+    # Same limit as a direct upload; enforced on the decompressed stream (declared sizes can lie)
+    decoder = TextDecoder()
+    total = 0
+    while chunk := fileobj.read(UPLOAD_CHUNK_BYTES):
+        total += len(chunk)
+        if total > max_bytes:
+            raise UploadTooLarge(f"File too large (max {max_bytes} bytes).")
+        decoder.feed(chunk)
+    return decoder.text()
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Rejects multipart/form-data requests over UPLOAD_MAX_REQUEST_BYTES with 413 (pure ASGI).
+    A declared Content-Length is checked before the app runs; otherwise the body is counted as it
+    is received and the form parser stops at the limit, so an oversized upload is never fully spooled.
+    """
+
+    def __init__(self, app, *, max_bytes: int | None = None) -> None:
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send) -> None:
+        headers = Headers(scope=scope)
+        if scope["type"] != "http" or not headers.get("content-type", "").startswith("multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        max_bytes = get_settings().upload_max_request_bytes if self.max_bytes is None else self.max_bytes
+        error = f"Upload too large (max {max_bytes} bytes per request)."
+        declared = headers.get("content-length", "")
+        if declared.isdigit() and int(declared) > max_bytes:
+            await JSONResponse({"detail": error}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def receive_wrapper():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # Re-raised by FastAPI's body reading and rendered as a 413 by its exception handler
+                    raise HTTPException(status_code=413, detail=error)
+            return message
+
+        await self.app(scope, receive_wrapper, send)
+
+
+@dataclass
+class UploadedText:
+    filename: str
+    text: Optional[str] = None
+    error_type: Optional[str] = None
+    error_message: Optional[str] = None
+
+
+def is_zip(upload: UploadFile) -> bool:
+    return (upload.filename or "").lower().endswith(ZIP_SUFFIXES) or upload.content_type in (
+        "application/zip",
+        "application/x-zip-compressed",
+    )
+
+
+def _failed(filename: str, e: Exception) -> UploadedText:
+    return UploadedText(filename=filename, error_type=type(e).__name__, error_message=str(e))
+
+
+def _read_zip(fileobj: IO[bytes], archive: str, *, max_bytes: int, max_files: int) -> list[UploadedText]:
+    out: list[UploadedText] = []
+    try:
+        zf = zipfile.ZipFile(fileobj)
+    except ZIP_ERRORS as e:
+        return [_failed(archive, e)]
+    with zf:
+        for info in zf.infolist():
+            path = PurePosixPath(info.filename)
+            # Folders and OS junk (__MACOSX/, .DS_Store) are not intakes
+            if info.is_dir() or any(part.startswith((".", "__MACOSX")) for part in path.parts):
+                continue
+            name = f"{archive}/{info.filename}"
+            if len(out) >= max_files:
+                raise UploadTooLarge(f"Too many files (max {max_files} per request).")
+            if not info.filename.lower().endswith(TEXT_SUFFIXES):
+                out.append(UploadedText(name, error_type="ValueError", error_message="Only .txt files are supported."))
+                continue
+            try:
+                with zf.open(info) as member:
+                    out.append(UploadedText(name, text=_read_member_text(member, max_bytes=max_bytes)))
+            except ZIP_ERRORS as e:
+                out.append(_failed(name, e))
+    return out
+
+
+async def read_uploads(uploads: list[UploadFile], *, max_bytes: int, max_files: int | None = None) -> list[UploadedText]:
+    """
+    Every .txt upload and every .txt inside uploaded zips, in upload order.
+    Per-file problems (too large, wrong type, bad zip) become failed entries; only exceeding
+    max_files (UPLOAD_MAX_FILES) fails the whole request.
+    """
+    max_files = get_settings().upload_max_files if max_files is None else max_files
+    out: list[UploadedText] = []
+    for upload in uploads:
+        filename = upload.filename or "upload"
+        if is_zip(upload):
+            max_zip = get_settings().upload_max_zip_bytes
+            if upload.size is not None and upload.size > max_zip:
+                out.append(_failed(filename, UploadTooLarge(f"Zip too large (max {max_zip} bytes).")))
+                continue
+            # Zip needs random access: read from the spooled temp file, off the event loop
+            entries = await asyncio.to_thread(
+                _read_zip, upload.file, filename, max_bytes=max_bytes, max_files=max_files - len(out)
+            )
+            out.extend(entries)
+            continue
+        if len(out) >= max_files:
+            raise UploadTooLarge(f"Too many files (max {max_files} per request).")
+        try:
+            out.append(UploadedText(filename, text=await read_upload_text(upload, max_bytes=max_bytes)))
+        except UploadTooLarge as e:
+            out.append(_failed(filename, e))
+    return out
+
+
+async def summarize_uploads(files: list[UploadedText], *, persist: bool, run: PipelineFn) -> list[BatchItemResult]:
+    """Run every readable file through `run` concurrently (batch limits apply); one result per file."""
+    readable = [f for f in files if f.text is not None]
+    # Texts are already bounded by MAX_UPLOAD_BYTES, not the JSON batch item limit
+    req = BatchRequest.model_construct(
+        items=[BatchItem.model_construct(text=f.text, persist=persist) for f in readable], max_concurrency=None
+    )
+    done = iter(await run_batch(req, run)) if readable else iter(())
+
+    results = []
+    for index, f in enumerate(files):
+        if f.text is None:
+            result = BatchItemResult(
+                index=index, status="failed", error_type=f.error_type, error_message=f.error_message
+            )
+        else:
+            result = next(done)
+            result.index = index
+        result.filename = f.filename
+        results.append(result)
+    return results
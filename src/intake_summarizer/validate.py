@@ -1,49 +1,143 @@
-from intake_summarizer.schema import IntakeSummary
+import json
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import FrozenSet, Iterable, List, Sequence, Tuple, get_args
+
+from intake_summarizer.keywords import KeywordMatcher
+from intake_summarizer.schema import IntakeSummary, TriageCategory
+from intake_summarizer.metrics import stage_timer
 
 IN_PERSON_KEYWORDS = {"walk in", "walk-in", "need to be seen", "clinic", "exam", "appointment today"}
 TELEHEALTH_KEYWORDS = {"telehealth", "virtual", "video visit", "video call"}
 SELF_CARE_KEYWORDS = {"mild", "runny nose", "sore throat", "seasonal allergies", "congestion"}
 BREATH_TERMS = {"shortness of breath", "trouble breathing", "can't breathe", "cannot breathe", "short of breath", "sob"}
 
-def contains_any(text: str, phrases: set[str]) -> bool:
-    return any(p in text for p in phrases)
+STANDARD_EMERGENCY_FLAG = "Emergency indicators present in intake text."
 
-def enforce_business_rules(summary: IntakeSummary, original_text: str) -> IntakeSummary:
-    lowered = original_text.lower()
+# Rule table for spec/summarizer_spec.md. Override with BUSINESS_RULES_PATH (JSON, same shape).
+DEFAULT_RULE_TABLE: dict = {
+    "emergency": {
+        # every group must have at least one hit
+        "all_of": [["chest pain"], sorted(BREATH_TERMS)],
+        "red_flag": STANDARD_EMERGENCY_FLAG,
+        "triage_category": "in_person",
+        "recommended_next_step": "Seek emergency care immediately or call emergency services.",
+    },
+    # Precedence: in_person > telehealth > self_care > unknown
+    "triage_precedence": [
+        {"category": "in_person", "keywords": sorted(IN_PERSON_KEYWORDS)},
+        {"category": "telehealth", "keywords": sorted(TELEHEALTH_KEYWORDS)},
+        {"category": "self_care", "keywords": sorted(SELF_CARE_KEYWORDS)},
+    ],
+    "default_triage_category": "unknown",
+    "confidence_cap": {"when_duration": "unknown", "above": 0.9, "cap": 0.75},
+}
 
-    # Emergency indicators (existing rule)
-    has_emergency_indicator = (
-        "chest pain" in lowered
-        and any (t in lowered for t in BREATH_TERMS)
+
+@dataclass(frozen=True)
+class CompiledRules:
+    matcher: KeywordMatcher
+    emergency_groups: Tuple[FrozenSet[str], ...]
+    emergency_red_flag: str
+    emergency_triage: str
+    emergency_next_step: str
+    triage_precedence: Tuple[Tuple[str, FrozenSet[str]], ...]
+    default_triage: str
+    cap_when_duration: str
+    cap_above: float
+    cap_value: float
+
+
+def _check_category(value: str) -> str:
+    if value not in get_args(TriageCategory):
+        raise ValueError(f"Unknown triage_category in rule table: {value!r}")
+    return value
+
+
+def compile_rules(table: dict) -> CompiledRules:
+    """
+    Compile a rule table into a single keyword matcher plus lookup sets.
+    Raises ValueError if the table references an unknown triage category.
+    """
+    emergency = table["emergency"]
+    groups = tuple(frozenset(k.lower() for k in g) for g in emergency["all_of"])
+    precedence = tuple(
+        (_check_category(r["category"]), frozenset(k.lower() for k in r["keywords"]))
+        for r in table["triage_precedence"]
+    )
+    cap = table["confidence_cap"]
+
+    return CompiledRules(
+        matcher=KeywordMatcher([k for g in groups for k in g] + [k for _, ks in precedence for k in ks]),
+        emergency_groups=groups,
+        emergency_red_flag=emergency["red_flag"],
+        emergency_triage=_check_category(emergency["triage_category"]),
+        emergency_next_step=emergency["recommended_next_step"],
+        triage_precedence=precedence,
+        default_triage=_check_category(table["default_triage_category"]),
+        cap_when_duration=cap["when_duration"],
+        cap_above=float(cap["above"]),
+        cap_value=float(cap["cap"]),
     )
 
-    STANDARD_EMERGENCY_FLAG = "Emergency indicators present in intake text."
+
+@lru_cache(maxsize=1)
+def get_rules() -> CompiledRules:
+    """Compiled rules for this process (call get_rules.cache_clear() to reload)."""
+    path = os.getenv("BUSINESS_RULES_PATH", "").strip()
+    if path:
+        return compile_rules(json.loads(Path(path).read_text(encoding="utf-8")))
+    return compile_rules(DEFAULT_RULE_TABLE)
+
+
+def _apply_rules(rules: CompiledRules, summary: IntakeSummary, original_text: str) -> IntakeSummary:
+    hits = rules.matcher.scan(original_text)
+
+    # Emergency indicators (existing rule)
+    has_emergency_indicator = all(not hits.isdisjoint(g) for g in rules.emergency_groups)
 
     if has_emergency_indicator:
         summary.urgency = "emergency"
-        if STANDARD_EMERGENCY_FLAG not in summary.red_flags:
-            summary.red_flags.append(STANDARD_EMERGENCY_FLAG)
+        if rules.emergency_red_flag not in summary.red_flags:
+            summary.red_flags.append(rules.emergency_red_flag)
 
-    # ✅ NEW: triage_category deterministic rules
-    # Precedence: in_person > telehealth > self_care > unknown
+    # triage_category deterministic rules, first match in precedence order wins
     if summary.urgency == "emergency":
-        summary.triage_category = "in_person"
+        summary.triage_category = rules.emergency_triage
     else:
-        # keyword-based classification
-        if contains_any(lowered, IN_PERSON_KEYWORDS):
-            summary.triage_category = "in_person"
-        elif contains_any(lowered, TELEHEALTH_KEYWORDS):
-            summary.triage_category = "telehealth"
-        elif contains_any(lowered, SELF_CARE_KEYWORDS):
-            summary.triage_category = "self_care"
-        else:
-            summary.triage_category = "unknown"
+        summary.triage_category = next(
+            (category for category, keywords in rules.triage_precedence if not hits.isdisjoint(keywords)),
+            rules.default_triage,
+        )
 
     # Confidence guardrail example (existing behavior)
-    if summary.duration == "unknown" and summary.confidence > 0.9:
-        summary.confidence = 0.75
+    if summary.duration == rules.cap_when_duration and summary.confidence > rules.cap_above:
+        summary.confidence = rules.cap_value
 
     if summary.urgency == "emergency":
-        summary.recommended_next_step = "Seek emergency care immediately or call emergency services."
+        summary.recommended_next_step = rules.emergency_next_step
+
+    return summary
+
+
+def enforce_business_rules(summary: IntakeSummary, original_text: str) -> IntakeSummary:
+    with stage_timer("business_rules"):
+        return _apply_rules(get_rules(), summary, original_text)
+
 
-    return summary
\ No newline at end of file
+def enforce_business_rules_many(
+    summaries: Sequence[IntakeSummary],
+    texts: Iterable[str],
+) -> List[IntakeSummary]:
+    """
+    Batch form of enforce_business_rules: rules are resolved once for the whole batch.
+    summaries[i] is checked against texts[i]; lengths must match.
+    """
+    texts = list(texts)
+    if len(summaries) != len(texts):
+        raise ValueError(f"Got {len(summaries)} summaries but {len(texts)} texts.")
+    rules = get_rules()
+    with stage_timer("business_rules"):
+        return [_apply_rules(rules, s, t) for s, t in zip(summaries, texts)]
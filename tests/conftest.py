@@ -1,7 +1,10 @@
 import os
 import pytest
 
+from intake_summarizer import settings
+
 @pytest.fixture(autouse=True)
 def force_mock_provider(monkeypatch):
     monkeypatch.setenv("LLM_PROVIDER", "mock")
-    monkeypatch.setenv("LLM_MODEL", "mock-1")
\ No newline at end of file
+    monkeypatch.setenv("LLM_MODEL", "mock-1")
+    settings.reload_settings()
\ No newline at end of file
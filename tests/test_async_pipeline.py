@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from intake_summarizer.llm_client import AsyncMockLLMClient, MockLLMClient
+from intake_summarizer.summarize import summarize_intake, summarize_intake_async
+
+TEXT = "Patient reports chest pain and shortness of breath since yesterday."
+
+
+def test_async_summary_matches_sync():
+    async_summary = asyncio.run(summarize_intake_async(TEXT))
+    assert async_summary.model_dump() == summarize_intake(TEXT).model_dump()
+
+
+def test_async_mock_wraps_the_sync_mock():
+    client = AsyncMockLLMClient(chaos_enabled=True, chaos_rate=0.5, chaos_seed=7)
+    assert not isinstance(client, MockLLMClient)  # a sync caller would get a coroutine back
+    sync = MockLLMClient(chaos_enabled=True, chaos_rate=0.5, chaos_seed=7)
+    assert [asyncio.run(client.summarize(TEXT)) for _ in range(5)] == [sync.summarize(TEXT) for _ in range(5)]
+
+
+def test_async_calls_overlap():
+    class SlowClient(AsyncMockLLMClient):
+        async def summarize(self, text: str) -> str:
+            await asyncio.sleep(0.2)
+            return await super().summarize(text)
+
+    async def run_many():
+        client = SlowClient()
+        return await asyncio.gather(*(summarize_intake_async(TEXT, client=client) for _ in range(10)))
+
+    start = time.perf_counter()
+    results = asyncio.run(run_many())
+    assert len(results) == 10
+    assert time.perf_counter() - start < 1.0
+
+
+def test_web_app_api_summarize():
+    from intake_summarizer.app import app
+
+    resp = TestClient(app).post("/api/summarize", data={"intake_text": TEXT, "persist": "false"})
+    assert resp.status_code == 200
+    assert resp.json()["summary"]["urgency"] == "emergency"
+
+
+def test_developer_api_summarize():
+    from intake_summarizer.api import app
+
+    resp = TestClient(app).post("/api/summarize", json={"text": TEXT, "persist": False})
+    assert resp.status_code == 200
+    assert resp.json()["summary"]["triage_category"] == "in_person"
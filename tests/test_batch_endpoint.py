@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from intake_summarizer import api, batch
+from intake_summarizer.batch import BatchItem, BatchRequest, run_batch
+from intake_summarizer.summarize import NonRetryableLLMError, summarize_intake
+
+TEXTS = [
+    "Patient reports chest pain and shortness of breath since yesterday.",
+    "BROKEN",
+    "Patient requests a virtual video visit for mild sore throat.",
+]
+
+
+def _fake_pipeline_with_failure(monkeypatch):
+    real = api.summarize_intake_async
+
+    async def fake(text, client=None):
+        if text == "BROKEN":
+            raise NonRetryableLLMError("schema mismatch")
+        return await real(text, client)
+
+    monkeypatch.setattr(api, "summarize_intake_async", fake)
+    monkeypatch.setattr(batch, "persist_failure", lambda **kw: "out/fail/intake_failure_test.json")
+
+
+def test_batch_returns_per_item_results_in_order(monkeypatch):
+    _fake_pipeline_with_failure(monkeypatch)
+    body = {"items": [{"text": t, "persist": False} for t in TEXTS]}
+
+    resp = TestClient(api.app).post("/api/summarize/batch", json=body)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["ok"], data["failed"]) == (2, 1)
+    assert [r["index"] for r in data["results"]] == [0, 1, 2]
+    assert data["results"][0]["summary"]["urgency"] == "emergency"
+    assert data["results"][1]["error_type"] == "NonRetryableLLMError"
+    assert data["results"][1]["failure_artifact"].endswith(".json")
+
+
+def test_batch_streams_ndjson(monkeypatch):
+    _fake_pipeline_with_failure(monkeypatch)
+    body = {"items": [{"text": t, "persist": False} for t in TEXTS]}
+
+    resp = TestClient(api.app).post("/api/summarize/batch?stream=true", json=body)
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in resp.text.splitlines()]
+    assert sorted(r["index"] for r in records) == [0, 1, 2]
+
+
+def test_web_app_batch_endpoint():
+    from intake_summarizer.app import app
+
+    resp = TestClient(app).post("/api/summarize/batch", json={"items": [{"text": TEXTS[2], "persist": False}]})
+    assert resp.status_code == 200
+    assert resp.json()["results"][0]["summary"]["triage_category"] == "telehealth"
+
+
+def test_concurrency_is_bounded():
+    active = peak = 0
+
+    async def pipeline(text, persist):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return summarize_intake(text), None
+
+    req = BatchRequest(items=[BatchItem(text=f"cough {i}", persist=False) for i in range(20)], max_concurrency=3)
+    results = asyncio.run(run_batch(req, pipeline))
+    assert len(results) == 20
+    assert peak == 3
+
+
+def test_failure_artifact_errors_stay_with_the_item(monkeypatch):
+    _fake_pipeline_with_failure(monkeypatch)
+
+    def broken_store(**kw):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(batch, "persist_failure", broken_store)
+    body = {"items": [{"text": t, "persist": False} for t in TEXTS]}
+
+    resp = TestClient(api.app).post("/api/summarize/batch", json=body)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["ok"], data["failed"]) == (2, 1)
+    assert data["results"][1]["error_type"] == "NonRetryableLLMError"
+    assert data["results"][1]["failure_artifact"] is None
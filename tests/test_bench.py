@@ -0,0 +1,39 @@
+from intake_summarizer import persist, settings
+from intake_summarizer.bench import compare, generate_corpus, run_benchmarks
+from intake_summarizer.llm_client import KEYWORD_MATCHER
+
+
+def test_corpus_is_deterministic_and_mixed():
+    corpus = generate_corpus(18, seed=7)
+    assert corpus == generate_corpus(18, seed=7)
+    assert corpus != generate_corpus(18, seed=8)
+
+    lengths = [len(t.split()) for t in corpus]
+    assert min(lengths) < 40 and max(lengths) > 300
+    hits = [len(KEYWORD_MATCHER.scan(t)) for t in corpus]
+    assert 0 in hits and max(hits) >= 5
+
+
+def test_compare_flags_only_slowdowns_past_threshold():
+    def report(**medians):
+        return {"results": {k: {"per_op_us_median": v} for k, v in medians.items()}}
+
+    baseline = report(a=10.0, b=10.0, c=10.0)
+    current = report(a=11.0, b=13.0, c=5.0, new=1.0)
+    assert compare(baseline, current, threshold=0.15) == ["b"]
+
+
+def test_persist_benchmarks_write_only_to_scratch_stores(tmp_path, monkeypatch):
+    monkeypatch.setattr(persist, "OUT_DIR", tmp_path / "out")
+    monkeypatch.setenv("PERSIST_BACKEND", "sqlite")
+    monkeypatch.setenv("PERSIST_SQLITE_PATH", str(tmp_path / "live.db"))
+    settings.reload_settings()
+
+    report = run_benchmarks(corpus_size=4, rounds=1, only=["persist_summary_file", "persist_sqlite_put_many"])
+
+    assert set(report["results"]) == {"persist_summary_file", "persist_sqlite_put_many"}
+    assert not (tmp_path / "out").exists()
+    assert not (tmp_path / "live.db").exists()
+    monkeypatch.delenv("PERSIST_BACKEND")
+    monkeypatch.delenv("PERSIST_SQLITE_PATH")
+    settings.reload_settings()
@@ -0,0 +1,57 @@
+import copy
+import json
+
+import pytest
+
+from intake_summarizer.summarize import summarize_intake
+from intake_summarizer.validate import (
+    DEFAULT_RULE_TABLE,
+    compile_rules,
+    enforce_business_rules,
+    enforce_business_rules_many,
+    get_rules,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_rules():
+    get_rules.cache_clear()
+    yield
+    get_rules.cache_clear()
+
+
+def test_batch_matches_single_item_rules():
+    texts = [
+        "Patient reports chest pain and shortness of breath since yesterday.",
+        "Patient requests a virtual video visit for mild sore throat.",
+        "Runny nose for 2 days.",
+        "Question about billing.",
+    ]
+    singles = [enforce_business_rules(summarize_intake(t), t) for t in texts]
+    batch = enforce_business_rules_many([summarize_intake(t) for t in texts], texts)
+    assert [s.model_dump() for s in batch] == [s.model_dump() for s in singles]
+    assert [s.triage_category for s in batch] == ["in_person", "telehealth", "self_care", "unknown"]
+
+
+def test_batch_rejects_length_mismatch():
+    with pytest.raises(ValueError):
+        enforce_business_rules_many([summarize_intake("cough")], [])
+
+
+def test_rule_table_loaded_from_path(tmp_path, monkeypatch):
+    table = copy.deepcopy(DEFAULT_RULE_TABLE)
+    table["triage_precedence"][1]["keywords"].append("zoom")
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(table), encoding="utf-8")
+    monkeypatch.setenv("BUSINESS_RULES_PATH", str(path))
+
+    text = "Can we do this over zoom? Cough for a week."
+    summary = enforce_business_rules(summarize_intake(text), text)
+    assert summary.triage_category == "telehealth"
+
+
+def test_unknown_category_is_rejected():
+    table = copy.deepcopy(DEFAULT_RULE_TABLE)
+    table["triage_precedence"][0]["category"] = "urgent_care"
+    with pytest.raises(ValueError):
+        compile_rules(table)
@@ -0,0 +1,61 @@
+from intake_summarizer import cli, persist
+from intake_summarizer.checkpoint import RunManifest
+from intake_summarizer.persist import content_key
+from intake_summarizer.results import IntakeResult
+
+OK = IntakeResult(status="ok", out_path="out/x.json")
+FAILED = IntakeResult(status="failed", error_type="RetryableLLMError", error_message="timeout")
+
+
+def test_manifest_reload_skips_done_and_retries_failures(tmp_path, monkeypatch):
+    monkeypatch.setattr(persist, "OUT_DIR", tmp_path)
+    path = tmp_path / "manifest.jsonl"
+
+    first = RunManifest(path)
+    first.record("done intake", OK)
+    first.record("flaky intake", FAILED)
+    first.record("recovered intake", FAILED)
+    first.record("recovered intake", OK)
+
+    resumed = RunManifest(path)
+    assert resumed.should_skip("done intake")
+    assert resumed.should_skip("recovered intake")
+    assert not resumed.should_skip("flaky intake")
+    assert not resumed.should_skip("new intake")
+
+
+def test_existing_output_counts_as_done(tmp_path, monkeypatch):
+    monkeypatch.setattr(persist, "OUT_DIR", tmp_path)
+    (tmp_path / f"intake_summary_{content_key('already persisted')}.json").write_text("{}", encoding="utf-8")
+
+    manifest = RunManifest(tmp_path / "manifest.jsonl")
+    assert manifest.should_skip("already persisted")
+    assert not manifest.should_skip("already persisted", check_persisted=False)
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = tmp_path / "manifest.jsonl"
+    RunManifest(path).record("done intake", OK)
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write('{"key": "abc", "sta')
+    assert RunManifest(path).done == {content_key("done intake")}
+
+
+def test_record_after_torn_line_survives_reload(tmp_path):
+    path = tmp_path / "manifest.jsonl"
+    path.write_text('{"key": "abc", "sta', encoding="utf-8")
+
+    RunManifest(path).record("next intake", OK)
+
+    assert RunManifest(path).done == {content_key("next intake")}
+
+
+def test_skip_completed_filters_stream_inputs(tmp_path, monkeypatch):
+    monkeypatch.setattr(persist, "OUT_DIR", tmp_path)
+    manifest = RunManifest(tmp_path / "manifest.jsonl")
+    manifest.record("done intake", OK)
+
+    inputs = [("1", "done intake", None), ("2", "new intake", None), ("3", None, "bad line")]
+    remaining = list(cli.skip_completed(iter(inputs), manifest))
+    assert [i for i, _, _ in remaining] == ["2", "3"]
+    assert manifest.skipped == 1
@@ -0,0 +1,50 @@
+import io
+import json
+import threading
+import time
+
+from intake_summarizer import cli
+from intake_summarizer.results import IntakeResult
+
+
+def test_iter_inputs_jsonl_and_lines(tmp_path):
+    jsonl = tmp_path / "in.jsonl"
+    jsonl.write_text('{"id": "a", "text": "cough"}\n\nnot json\n{"text": "rash"}\n', encoding="utf-8")
+    assert list(cli.iter_inputs(jsonl)) == [
+        ("a", "cough", None),
+        ("3", None, "Invalid input line 3: Expecting value: line 1 column 1 (char 0)"),
+        ("4", "rash", None),
+    ]
+
+    lines = tmp_path / "in.txt"
+    lines.write_text("cough\n\nrash\n", encoding="utf-8")
+    assert list(cli.iter_inputs(lines)) == [("1", "cough", None), ("3", "rash", None)]
+
+
+def test_run_streaming_writes_each_result_and_bounds_window(monkeypatch):
+    active = peak = 0
+    lock = threading.Lock()
+
+    def fake_process_one(text):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+        if text == "boom":
+            raise RuntimeError("unexpected")
+        return IntakeResult(status="ok", out_path=f"out/{text}.json")
+
+    monkeypatch.setattr(cli, "process_one", fake_process_one)
+    inputs = [(str(i), f"t{i}", None) for i in range(20)] + [("x", "boom", None), ("bad", None, "Invalid input")]
+
+    out = io.StringIO()
+    ok, failed = cli.run_streaming(iter(inputs), out, window=3, workers=8, progress_every=0)
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert (ok, failed) == (20, 2)
+    assert len(records) == 22
+    assert {r["id"] for r in records if r["status"] == "failed"} == {"x", "bad"}
+    assert peak <= 3
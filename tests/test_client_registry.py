@@ -0,0 +1,94 @@
+import asyncio
+import sys
+
+import pytest
+
+from intake_summarizer import clients, llm_client
+from intake_summarizer.llm_client import _responses_request
+from intake_summarizer.settings import Settings
+
+
+@pytest.fixture
+def openai_settings(monkeypatch):
+    current = {"model": "gpt-test", "timeout": 30.0}
+
+    def fake_settings():
+        return Settings(
+            llm_provider="openai",
+            llm_model=current["model"],
+            openai_api_key="sk-test",
+            openai_timeout_seconds=current["timeout"],
+        )
+
+    monkeypatch.setattr(clients, "get_settings", fake_settings)
+    monkeypatch.setattr(llm_client, "get_settings", fake_settings)
+    yield current
+    clients.close_clients()
+
+
+def test_sync_client_is_reused_per_provider_and_model(openai_settings):
+    first = clients.get_pooled_client()
+    assert clients.get_pooled_client() is first
+
+    openai_settings["model"] = "gpt-other"
+    other = clients.get_pooled_client()
+    assert other is not first
+    assert other.model == "gpt-other"
+
+
+def test_close_clients_drops_registry(openai_settings):
+    first = clients.get_pooled_client()
+    clients.close_clients()
+    assert clients.get_pooled_client() is not first
+
+
+def test_async_client_is_reused_within_a_loop(openai_settings):
+    async def grab_twice():
+        a = clients.get_pooled_async_client()
+        b = clients.get_pooled_async_client()
+        await clients.aclose_clients()
+        return a, b
+
+    a, b = asyncio.run(grab_twice())
+    assert a is b
+
+
+def test_only_the_latest_retired_client_stays_open(openai_settings):
+    built = []
+    for timeout in (1.0, 2.0, 3.0, 4.0):
+        openai_settings["timeout"] = timeout
+        built.append(clients.get_pooled_client())
+
+    assert clients._retired_sync == [built[2]]
+    assert [c.client.is_closed() for c in built] == [True, True, False, False]
+
+
+def test_retired_async_clients_are_closed_on_their_loop(openai_settings):
+    async def rebuild():
+        built = []
+        for timeout in (1.0, 2.0, 3.0):
+            openai_settings["timeout"] = timeout
+            built.append(clients.get_pooled_async_client())
+        retired = list(clients._retired_async[asyncio.get_running_loop()])
+        await asyncio.gather(*clients._closing)  # the scheduled aclose() of the old retiree
+        closed = [c.client.is_closed() for c in built]
+        await clients.aclose_clients()
+        return built, retired, closed
+
+    built, retired, closed = asyncio.run(rebuild())
+    assert retired == [built[1]]
+    assert closed == [True, False, False]
+
+
+def test_request_template_is_cached():
+    r1 = _responses_request("one", "gpt-test")
+    r2 = _responses_request("two", "gpt-test")
+    assert r1["text"] is r2["text"]
+    assert r1["input"][1]["content"] == "one"
+
+
+def test_http2_without_h2_names_the_extra(monkeypatch):
+    monkeypatch.setitem(sys.modules, "h2", None)
+    with pytest.raises(ValueError, match=r"\.\[http2\]"):
+        llm_client._http_client_kwargs(Settings(openai_http2=True))
+    assert llm_client._http_client_kwargs(Settings(openai_http2=False))["http2"] is False
@@ -0,0 +1,18 @@
+from intake_summarizer.llm_client import _extract_duration, extract_durations
+
+
+def test_duration_templates_render_number():
+    assert _extract_duration("Cough for 3 Days") == "3 days"
+    assert _extract_duration("dizzy for 45min") == "45 minutes"
+    assert _extract_duration("no timeline given") == "unknown"
+
+
+def test_duration_priority_beats_position():
+    # "today" outranks an earlier numeric duration, hours outrank days
+    assert _extract_duration("2 days ago, worse today") == "today"
+    assert _extract_duration("3 days, 5 hrs since last dose") == "5 hours"
+
+
+def test_extract_durations_bulk():
+    texts = ["since yesterday", "for a few days", "several days", ""]
+    assert extract_durations(texts) == ["yesterday", "a few days", "several days", "unknown"]
@@ -0,0 +1,123 @@
+import json
+import os
+import threading
+import time
+
+from intake_summarizer.persist_failures import FailureLog
+
+
+def _payload(key, error_type="NonRetryableLLMError", model="mock-1"):
+    return {
+        "key": key,
+        "timestamp_utc": "20260101T000000Z",
+        "provider": "mock",
+        "model": model,
+        "error_type": error_type,
+        "error_message": "boom",
+        "raw_output_preview": "",
+    }
+
+
+def test_repeats_are_deduplicated_but_counted(tmp_path):
+    log = FailureLog(tmp_path)
+    first = log.record(_payload("k1"))
+    again = log.record(_payload("k1"))
+    log.record(_payload("k1", error_type="RetryableLLMError"))
+
+    assert first == again
+    lines = first.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(l)["error_type"] for l in lines] == ["NonRetryableLLMError", "RetryableLLMError"]
+
+    rows = {r["error_type"]: r for r in log.query()}
+    assert rows["NonRetryableLLMError"]["occurrences"] == 2
+    assert rows["RetryableLLMError"]["occurrences"] == 1
+
+
+def test_summary_groups_from_window_index(tmp_path):
+    log = FailureLog(tmp_path)
+    for i in range(3):
+        log.record(_payload(f"a{i}", model="m1"))
+    log.record(_payload("a0", model="m1"))
+    log.record(_payload("b0", model="m2", error_type="RetryableLLMError"))
+
+    summary = log.summary(since_seconds=3600)
+    assert summary[0] == {"model": "m1", "error_type": "NonRetryableLLMError", "occurrences": 4, "unique_keys": 3}
+    assert {"model": "m2", "error_type": "RetryableLLMError", "occurrences": 1, "unique_keys": 1} in summary
+    assert log.query(model="m2")[0]["key"] == "b0"
+
+
+def test_segments_rotate_and_are_pruned(tmp_path):
+    log = FailureLog(tmp_path, max_bytes=300, max_segments=2)
+    for i in range(10):
+        log.record(_payload(f"k{i}"))
+
+    segments = log.segments()
+    assert len(segments) == 2
+    assert all(p.stat().st_size <= 300 for p in segments)
+    # The index still knows about every failure, even the ones whose segment was pruned
+    assert len(log.query()) == 10
+
+
+def test_pruning_skips_live_writers_and_clears_index_rows(tmp_path):
+    other_live = tmp_path / f"failures_20000101T000000000000_{os.getppid()}.jsonl"
+    other_dead = tmp_path / "failures_20000101T000000000001_999999999.jsonl"
+    other_live.write_text("", encoding="utf-8")
+    other_dead.write_text("", encoding="utf-8")
+    log = FailureLog(tmp_path, max_bytes=300, max_segments=2)
+    log._conn().execute(
+        "INSERT INTO failures VALUES ('old', 'E', 'mock', 'mock-1', 0, 0, 1, 'boom', ?, NULL)", (other_dead.name,)
+    )
+    log._conn().commit()
+
+    for i in range(10):
+        log.record(_payload(f"k{i}"))
+
+    assert other_live.exists()  # another process may still append to it
+    assert not other_dead.exists()
+    rows = {r["key"]: r["segment"] for r in log.query(limit=100)}
+    assert rows["old"] == ""
+    assert all(seg == "" or (tmp_path / seg).exists() for seg in rows.values())
+
+
+def test_duplicates_do_not_rotate_segments(tmp_path):
+    log = FailureLog(tmp_path, max_bytes=300, max_segments=10)
+    first = log.record(_payload("k1"))
+    current = log.record(_payload("k2"))  # no room left for another record in this segment
+
+    for _ in range(5):
+        assert log.record(_payload("k1")) == first
+    assert log._segment == current
+
+
+def test_concurrent_duplicates_are_recorded_once(tmp_path, monkeypatch):
+    log = FailureLog(tmp_path)
+    current_segment = log._current_segment
+
+    def slow_current_segment(incoming):
+        time.sleep(0.005)  # widen any gap between "is it new?" and writing the row
+        return current_segment(incoming)
+
+    monkeypatch.setattr(log, "_current_segment", slow_current_segment)
+    errors = []
+    keys = [f"same{i}" for i in range(10)]
+    start = threading.Barrier(16)
+
+    def record():
+        start.wait()
+        for key in keys:
+            try:
+                log.record(_payload(key))
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=record) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert {r["key"]: r["occurrences"] for r in log.query()} == {key: 16 for key in keys}
+    lines = [l for seg in log.segments() for l in seg.read_text(encoding="utf-8").splitlines()]
+    assert sorted(json.loads(l)["key"] for l in lines) == keys
+    assert log.summary()[0]["unique_keys"] == len(keys)
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+import uvicorn
+
+from intake_summarizer import api, llm_client
+from intake_summarizer.fake_openai import FakeOpenAIConfig, create_app
+from intake_summarizer.llm_client import OpenAILLMClient
+from intake_summarizer.loadgen import percentile, run_load
+from intake_summarizer.settings import Settings
+from intake_summarizer.summarize import NonRetryableLLMError, RetryableLLMError, summarize_intake
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """Runs the fake on a free local port; returns a factory for clients pointed at it."""
+    servers = []
+
+    def start(**config) -> OpenAILLMClient:
+        server = uvicorn.Server(
+            uvicorn.Config(create_app(FakeOpenAIConfig(latency_ms=1, latency_sigma=0, seed=0, **config)), port=0, log_level="warning")
+        )
+        threading.Thread(target=server.run, daemon=True).start()
+        while not server.started:
+            time.sleep(0.01)
+        servers.append(server)
+        port = server.servers[0].sockets[0].getsockname()[1]
+        settings = Settings(openai_api_key="test", openai_base_url=f"http://127.0.0.1:{port}/v1", llm_model="fake-model")
+        monkeypatch.setattr(llm_client, "get_settings", lambda: settings)
+        return OpenAILLMClient()
+
+    yield start
+    for server in servers:
+        server.should_exit = True
+
+
+def test_openai_client_talks_to_fake(fake_openai):
+    client = fake_openai()
+    summary = summarize_intake("Patient reports chest pain and shortness of breath.", client=client)
+    assert summary.urgency == "emergency"
+    client.close()
+
+
+@pytest.mark.parametrize(
+    "config, error",
+    [
+        ({"rate_429": 1.0}, RetryableLLMError),
+        ({"rate_5xx": 1.0}, RetryableLLMError),
+        ({"malformed_rate": 1.0}, RetryableLLMError),
+        ({"schema_error_rate": 1.0}, NonRetryableLLMError),
+    ],
+)
+def test_fake_injects_failures(fake_openai, config, error):
+    client = fake_openai(**config)
+    with pytest.raises(error):
+        summarize_intake("Cough for 3 days.", client=client)
+    client.close()
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(v) for v in range(1, 11)]
+    assert percentile(values, 50) == 5.0
+    assert percentile(values, 95) == 10.0
+    assert percentile([], 50) is None
+
+
+def test_load_generator_reports_latency_and_errors():
+    transport = httpx.ASGITransport(app=api.app)
+    report = asyncio.run(run_load(base_url="http://test", concurrency=4, requests=20, corpus_size=10, transport=transport))
+    assert report["requests"] == 20
+    assert report["ok"] == 20 and report["errors"] == 0
+    assert report["latency_ms"]["p50"] <= report["latency_ms"]["p99"]
@@ -0,0 +1,56 @@
+import threading
+import time
+
+import pytest
+from prefect.task_runners import ProcessPoolTaskRunner, ThreadPoolTaskRunner
+
+from intake_summarizer import flow, settings
+from intake_summarizer.flow import build_task_runner, llm_slot
+
+
+def test_task_runner_is_selectable():
+    assert isinstance(build_task_runner("threads", 4), ThreadPoolTaskRunner)
+    assert isinstance(build_task_runner("processes", 2), ProcessPoolTaskRunner)
+    assert build_task_runner("sequential")._max_workers == 1
+    with pytest.raises(ValueError):
+        build_task_runner("dask")
+
+
+def test_llm_slot_caps_in_flight_calls(monkeypatch):
+    limit = flow.get_settings().llm_max_concurrency
+    monkeypatch.setattr(flow, "_llm_semaphore", (limit, threading.BoundedSemaphore(2)))
+    active = peak = 0
+    lock = threading.Lock()
+
+    def call():
+        nonlocal active, peak
+        with llm_slot():
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak == 2
+
+
+def test_process_runner_warns_without_shared_limit(monkeypatch, caplog):
+    monkeypatch.delenv("LLM_CONCURRENCY_LIMIT_NAME", raising=False)
+    settings.reload_settings()
+    build_task_runner("processes", 2)
+    assert "applies per worker process" in caplog.text
+
+    caplog.clear()
+    monkeypatch.setenv("LLM_CONCURRENCY_LIMIT_NAME", "llm")
+    settings.reload_settings()
+    build_task_runner("processes", 2)
+    assert caplog.text == ""
+    monkeypatch.delenv("LLM_CONCURRENCY_LIMIT_NAME")
+    settings.reload_settings()
+
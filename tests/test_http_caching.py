@@ -0,0 +1,103 @@
+import gzip
+import json
+
+from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
+from fastapi.testclient import TestClient
+
+from intake_summarizer import api, compression
+from intake_summarizer.compression import CompressionMiddleware, choose_encoding
+from intake_summarizer.httpcache import ConditionalGetMiddleware, etag_matches
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+def test_choose_encoding(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding("gzip, deflate, br") == "gzip"
+    assert choose_encoding("br;q=1.0, gzip;q=0") is None
+    assert choose_encoding("*") == "gzip"
+    assert choose_encoding("identity") is None
+    assert choose_encoding(None) is None
+
+    monkeypatch.setattr(compression, "brotli", object())
+    assert choose_encoding("gzip, br") == "br"
+    assert choose_encoding("gzip, br;q=0") == "gzip"
+
+
+def test_etag_matches():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"def"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_home_page_is_compressed_and_revalidates_per_encoding():
+    client = TestClient(api.app)
+
+    resp = client.get("/", headers=GZIP)
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.headers["vary"] == "Accept-Encoding"
+    assert resp.headers["cache-control"] == "no-cache"
+    assert "<html" in resp.text
+    etag = resp.headers["etag"]
+    assert etag.endswith('-gzip"')
+
+    again = client.get("/", headers={**GZIP, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+    plain = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["etag"] == etag.replace('-gzip"', '"')
+    assert client.get("/", headers={"Accept-Encoding": "identity", "If-None-Match": etag}).status_code == 200
+
+
+def test_small_bodies_stay_uncompressed():
+    resp = TestClient(api.app).get("/health", headers=GZIP)
+    assert resp.json() == {"status": "ok"}
+    assert "content-encoding" not in resp.headers
+    assert resp.headers["etag"].startswith('"')
+
+
+def test_post_results_are_not_cached():
+    body = {"text": "Patient reports chest pain since yesterday.", "persist": False}
+    resp = TestClient(api.app).post("/api/summarize", json=body, headers=GZIP)
+    assert resp.status_code == 200
+    assert resp.headers["cache-control"] == "no-store"
+    assert "etag" not in resp.headers
+
+
+def test_streamed_ndjson_is_compressed_chunk_by_chunk():
+    items = [{"text": f"Mild sore throat for {i} days, requests a video visit.", "persist": False} for i in range(20)]
+    client = TestClient(api.app)
+
+    with client.stream("POST", "/api/summarize/batch?stream=true", json={"items": items}, headers=GZIP) as resp:
+        assert resp.headers["content-encoding"] == "gzip"
+        assert "content-length" not in resp.headers
+        raw = b"".join(resp.iter_raw())
+
+    lines = gzip.decompress(raw).decode("utf-8").splitlines()
+    assert sorted(json.loads(line)["index"] for line in lines) == list(range(20))
+
+
+def test_range_requests_are_not_compressed(tmp_path):
+    data = "".join(f"line {i:04d}\n" for i in range(800)).encode()  # 8000 bytes
+    (tmp_path / "big.txt").write_bytes(data)
+    app = FastAPI()
+    app.mount("/static", StaticFiles(directory=tmp_path), name="static")
+    app.add_middleware(ConditionalGetMiddleware)
+    app.add_middleware(CompressionMiddleware)
+    client = TestClient(app)
+
+    full = client.get("/static/big.txt", headers=GZIP)
+    assert full.headers["content-encoding"] == "gzip"
+
+    part = client.get("/static/big.txt", headers={**GZIP, "Range": "bytes=0-4999"})
+    assert part.status_code == 206
+    assert "content-encoding" not in part.headers
+    assert part.headers["content-range"] == "bytes 0-4999/8000"
+    assert part.content == data[:5000]
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from intake_summarizer import persist
+from intake_summarizer.jsonio import dumps, dumps_line
+from intake_summarizer.llm_client import MockLLMClient
+from intake_summarizer.summarize import NonRetryableLLMError, RetryableLLMError, _parse_summary
+
+
+RAW = MockLLMClient().summarize("Chest pain since yesterday, feeling dizzy.")
+
+
+def test_parse_summary_from_str_and_bytes():
+    assert _parse_summary(RAW) == _parse_summary(RAW.encode("utf-8"))
+
+
+def test_truncated_json_is_retryable():
+    with pytest.raises(RetryableLLMError, match="not valid JSON"):
+        _parse_summary(RAW[: len(RAW) // 2])
+
+
+def test_schema_mismatch_is_not_retryable():
+    broken = json.loads(RAW)
+    broken["urgency"] = "whenever"
+    with pytest.raises(NonRetryableLLMError, match="schema validation"):
+        _parse_summary(json.dumps(broken))
+
+
+def test_dumps_is_compact_unless_pretty():
+    summary = _parse_summary(RAW)
+    assert b"\n" not in dumps(summary, pretty=False)
+    assert dumps(summary, pretty=True).startswith(b'{\n  "')
+    assert json.loads(dumps(summary, pretty=False)) == summary.model_dump(mode="json")
+    assert dumps_line({"note": "café"}) == '{"note":"café"}\n'.encode("utf-8")
+
+
+def test_file_store_writes_compact_json(tmp_path):
+    store = persist.FileStore(tmp_path)
+    summary = _parse_summary(RAW)
+
+    path = store.put("k1", summary)
+
+    assert b"\n" not in path.read_bytes()
+    assert store.get("k1") == summary
@@ -0,0 +1,29 @@
+from intake_summarizer.keywords import KeywordMatcher
+from intake_summarizer.llm_client import (
+    KEYWORD_MATCHER,
+    MockLLMClient,
+    _build_red_flags,
+    _extract_symptoms,
+)
+
+
+def test_scan_returns_hit_set_case_insensitive():
+    m = KeywordMatcher(["chest pain", "Shortness of Breath", "fever"])
+    hits = m.scan("Patient has CHEST PAIN and shortness of breath.")
+    assert hits == {"chest pain", "shortness of breath"}
+
+
+def test_overlapping_phrases_are_all_reported():
+    hits = KEYWORD_MATCHER.scan("Mild sore throat and vomiting blood since this morning")
+    assert {"mild sore throat", "sore throat", "vomiting blood", "vomiting"} <= hits
+
+
+def test_heuristics_read_from_hit_set():
+    hits = KEYWORD_MATCHER.scan("chest pain, trouble breathing and a cough")
+    assert _extract_symptoms(hits) == ["chest pain", "trouble breathing", "cough"]
+    assert _build_red_flags(hits) == ["Chest symptoms with shortness of breath."]
+
+
+def test_worsening_with_timeframe_is_urgent():
+    out = MockLLMClient().summarize("Cough getting worse over 3 days")
+    assert '"urgency": "urgent"' in out
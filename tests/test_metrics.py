@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from intake_summarizer import api
+from intake_summarizer.metrics import RequestMetricsMiddleware
+from intake_summarizer.settings import get_settings
+from intake_summarizer.summarize import NonRetryableLLMError, summarize_intake
+
+
+def _sample(name, labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_endpoint_reports_request_and_stage_latency():
+    with TestClient(api.app) as client:
+        before = _sample("intake_stage_seconds_count", {"stage": "business_rules"})
+        resp = client.post("/api/summarize", json={"text": "Cough for 3 days.", "persist": False})
+        assert resp.status_code == 200
+
+        metrics = client.get("/metrics")
+        assert metrics.status_code == 200
+        assert metrics.headers["content-type"].startswith("text/plain")
+        body = metrics.text
+
+    for stage in ("llm", "parse_validate", "business_rules"):
+        assert f'intake_stage_seconds_bucket{{le="0.0001",stage="{stage}"}}' in body
+    assert _sample("intake_stage_seconds_count", {"stage": "business_rules"}) == before + 1
+    assert 'intake_request_seconds_count{app="api",method="POST",route="/api/summarize",status="200"}' in body
+    assert "intake_requests_in_flight" in body
+    assert "intake_retries_total" in body
+
+
+def test_llm_errors_are_counted_by_class_provider_and_model():
+    class BadClient:
+        def summarize(self, text):
+            return '{"not": "a summary"}'
+
+    s = get_settings()
+    labels = {"error_type": "NonRetryableLLMError", "provider": s.llm_provider, "model": s.llm_model}
+    before = _sample("intake_llm_errors_total", labels)
+    with pytest.raises(NonRetryableLLMError):
+        summarize_intake("anything", client=BadClient())
+    assert _sample("intake_llm_errors_total", labels) == before + 1
+
+
+def test_streamed_response_is_timed_to_the_last_chunk():
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware, app_name="stream-test")
+
+    @app.get("/lines")
+    async def lines():
+        async def body():
+            for i in range(3):
+                await asyncio.sleep(0.1)
+                yield f"{i}\n"
+
+        return StreamingResponse(body(), media_type="application/x-ndjson")
+
+    labels = {"app": "stream-test", "method": "GET", "route": "/lines", "status": "200"}
+    before = _sample("intake_request_seconds_sum", labels)
+    assert TestClient(app).get("/lines").text == "0\n1\n2\n"
+    assert _sample("intake_request_seconds_sum", labels) - before >= 0.3
@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+
+from intake_summarizer.llm_client import MockLLMClient
+from intake_summarizer.persist import FileStore, GroupCommit, SqliteStore
+from intake_summarizer.summarize import _parse_summary
+
+
+def _summary(text):
+    return _parse_summary(MockLLMClient().summarize(text))
+
+
+@pytest.fixture(params=["file", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "file":
+        return FileStore(tmp_path)
+    return SqliteStore(tmp_path / "summaries.db")
+
+
+def test_put_is_idempotent_by_key(store):
+    first = store.put("k1", _summary("cough for 3 days"))
+    second = store.put("k1", _summary("chest pain and shortness of breath"))
+    assert first == second
+    assert store.get("k1").urgency == "emergency"
+    assert store.exists("k1")
+    assert not store.exists("missing")
+    assert store.get("missing") is None
+
+
+def test_find_by_urgency_and_triage(store):
+    store.put_many(
+        [
+            ("a", _summary("chest pain and shortness of breath")),
+            ("b", _summary("video visit for runny nose")),
+            ("c", _summary("seasonal allergies")),
+        ]
+    )
+    assert [k for k, _ in store.find(urgency="emergency")] == ["a"]
+    assert [k for k, _ in store.find(triage_category="telehealth")] == ["b"]
+    assert [k for k, _ in store.find(urgency="routine", triage_category="self_care")] == ["c"]
+    assert len(store.find(limit=2)) == 2
+
+
+def test_sqlite_store_is_safe_across_threads(tmp_path):
+    store = SqliteStore(tmp_path / "summaries.db")
+    summary = _summary("fever")
+
+    def write(i):
+        store.put(f"key{i}", summary)
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(store.find(limit=100)) == 20
+    assert store._conn().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_concurrent_puts_share_transactions():
+    batches = []
+    first_write = threading.Event()
+
+    def put_many(items):
+        first_write.set()
+        time.sleep(0.2)  # slow commit: later puts queue up behind it
+        batches.append(len(items))
+        return [f"db#{key}" for key, _ in items]
+
+    group = GroupCommit(put_many)
+    results = {}
+
+    def put(key):
+        results[key] = group.put(key, None)
+
+    leader = threading.Thread(target=put, args=("k0",))
+    leader.start()
+    first_write.wait()
+    others = [threading.Thread(target=put, args=(f"k{i}",)) for i in range(1, 11)]
+    for t in others:
+        t.start()
+    for t in [leader, *others]:
+        t.join()
+
+    assert results == {f"k{i}": f"db#k{i}" for i in range(11)}
+    assert batches == [1, 10]
+    assert (group.commits, group.rows) == (2, 11)
+
+
+def test_group_commit_error_reaches_every_caller():
+    def put_many(items):
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        GroupCommit(put_many).put("k", None)
@@ -0,0 +1,105 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from intake_summarizer import llm_client, ratelimit
+from intake_summarizer.llm_client import AsyncOpenAILLMClient, OpenAILLMClient
+from intake_summarizer.ratelimit import AdaptiveRateLimiter, TokenBucket
+from intake_summarizer.retry import deadline_scope
+from intake_summarizer.settings import Settings
+from intake_summarizer.summarize import RetryableLLMError
+
+
+def test_token_bucket_reports_wait_when_empty():
+    bucket = TokenBucket(rate_per_minute=60)
+    assert bucket.wait_time(60, bucket.updated) == 0
+    bucket.take(60)
+    assert bucket.wait_time(1, bucket.updated) == pytest.approx(1.0)
+
+
+def test_aimd_backs_off_on_throttle_and_ramps_up_on_success():
+    limiter = AdaptiveRateLimiter(rpm=1000, tpm=1_000_000, max_concurrency=8, cooldown_seconds=0)
+    limiter.acquire(10)
+    limiter.release(throttled=True, ok=False, est_tokens=10)
+    assert limiter.state()["concurrency_limit"] == 4
+
+    for _ in range(8):
+        limiter.acquire(10)
+        limiter.release(est_tokens=10)
+    assert 5 < limiter.state()["concurrency_limit"] <= 8
+    assert limiter.state()["throttles"] == 1
+
+
+def test_queued_acquire_gives_up_at_the_deadline():
+    limiter = AdaptiveRateLimiter(rpm=1, tpm=1_000_000, max_concurrency=8)
+    limiter.acquire(1)  # the next request slot is a minute away
+
+    start = time.monotonic()
+    with deadline_scope(0.2), pytest.raises(RetryableLLMError, match="deadline"):
+        limiter.acquire(1)
+    with deadline_scope(0.2), pytest.raises(RetryableLLMError, match="deadline"):
+        asyncio.run(limiter.acquire_async(1))
+    assert time.monotonic() - start < 2
+    assert limiter.state()["in_flight"] == 1
+
+
+def test_concurrency_limit_blocks_extra_slots():
+    limiter = AdaptiveRateLimiter(rpm=1000, tpm=1_000_000, max_concurrency=2)
+    assert limiter._try_acquire(1) == 0
+    assert limiter._try_acquire(1) == 0
+    assert limiter._try_acquire(1) > 0
+    assert limiter.state()["in_flight"] == 2
+
+
+def test_usage_reconciles_token_budget():
+    limiter = AdaptiveRateLimiter(rpm=1000, tpm=10_000, max_concurrency=2)
+    limiter.acquire(1_000)
+    limiter.release(est_tokens=1_000, used_tokens=3_000)
+    assert limiter.state()["tokens_available"] < 8_000
+
+
+def test_openai_429_becomes_retryable_and_throttles(monkeypatch):
+    fake_settings = lambda: Settings(llm_provider="openai", llm_model="gpt-limit-test", openai_api_key="sk-test")
+    monkeypatch.setattr(llm_client, "get_settings", fake_settings)
+    monkeypatch.setattr(ratelimit, "get_settings", fake_settings)
+
+    def too_many(**kwargs):
+        response = httpx.Response(429, request=httpx.Request("POST", "https://api.openai.com/v1/responses"))
+        raise openai.RateLimitError("slow down", response=response, body=None)
+
+    client = OpenAILLMClient()
+    client.client = SimpleNamespace(responses=SimpleNamespace(create=too_many))
+    with pytest.raises(RetryableLLMError):
+        client.summarize("cough for 3 days")
+
+    state = client.limiter.state()
+    assert state["throttles"] == 1
+    assert state["in_flight"] == 0
+
+
+def test_cancelled_async_call_releases_its_slot(monkeypatch):
+    fake_settings = lambda: Settings(llm_provider="openai", llm_model="gpt-cancel-test", openai_api_key="sk-test")
+    monkeypatch.setattr(llm_client, "get_settings", fake_settings)
+    monkeypatch.setattr(ratelimit, "get_settings", fake_settings)
+
+    async def hang(**kwargs):
+        await asyncio.sleep(60)
+
+    async def cancel_mid_call():
+        client = AsyncOpenAILLMClient()
+        client.client = SimpleNamespace(responses=SimpleNamespace(create=hang))
+        task = asyncio.create_task(client.summarize("cough for 3 days"))
+        await asyncio.sleep(0.01)
+        assert client.limiter.state()["in_flight"] == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return client.limiter.state()
+
+    state = asyncio.run(cancel_mid_call())
+    assert state["in_flight"] == 0
+    assert (state["successes"], state["throttles"]) == (0, 0)
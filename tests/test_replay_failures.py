@@ -0,0 +1,69 @@
+import pytest
+
+from intake_summarizer import flow, persist, persist_failures
+from intake_summarizer.persist import content_key
+from intake_summarizer.persist_failures import load_failure_input, persist_failure, select_failures
+from intake_summarizer.settings import Settings
+
+TEXT = "Patient reports cough for 3 days."
+
+
+@pytest.fixture
+def fail_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(persist_failures, "FAIL_DIR", tmp_path / "fail")
+    monkeypatch.setattr(persist_failures, "_failure_log", None)
+    monkeypatch.setattr(persist, "OUT_DIR", tmp_path)
+    (tmp_path / "fail").mkdir()
+    return tmp_path / "fail"
+
+
+def _use_settings(monkeypatch, **overrides):
+    settings = Settings(failure_keep_input=True, **overrides)
+    monkeypatch.setattr(persist_failures, "get_settings", lambda: settings)
+
+
+def _fail(text, error_type="RetryableLLMError", model="mock-1"):
+    return persist_failure(text=text, provider="mock", model=model, error_type=error_type, error_message="boom")
+
+
+def test_kept_input_is_content_addressed(fail_dir, monkeypatch):
+    _use_settings(monkeypatch)
+    _fail(TEXT)
+    key = content_key(TEXT)
+    assert load_failure_input(key) == TEXT
+    assert (fail_dir / "inputs" / key[:2] / f"{key}.txt").exists()
+    assert load_failure_input("0" * 16) is None
+
+
+def test_kept_input_can_be_encrypted(fail_dir, monkeypatch):
+    fernet = pytest.importorskip("cryptography.fernet")
+    _use_settings(monkeypatch, failure_input_key=fernet.Fernet.generate_key().decode())
+    _fail(TEXT)
+    path = next((fail_dir / "inputs").rglob("*.enc"))
+    assert TEXT.encode() not in path.read_bytes()
+    assert load_failure_input(content_key(TEXT)) == TEXT
+
+
+@pytest.mark.parametrize("store", ["files", "log"])
+def test_select_and_replay_resolves(fail_dir, monkeypatch, store):
+    _use_settings(monkeypatch, failure_store=store)
+    _fail(TEXT)
+    _fail(TEXT)  # same key twice -> replayed once
+    _fail("Seasonal allergies.", error_type="NonRetryableLLMError")
+    _fail("Rash on arm.", model="other-model")
+
+    selected = select_failures(error_type="RetryableLLMError", model="mock-1")
+    assert [r["key"] for r in selected] == [content_key(TEXT)]
+
+    result = flow.replay_one(content_key(TEXT))
+    assert result.status == "ok"
+    assert select_failures(error_type="RetryableLLMError", model="mock-1") == []
+    assert load_failure_input(content_key(TEXT)) is None
+    assert len(select_failures()) == 2
+
+
+def test_replay_without_stored_input_fails_cleanly(fail_dir, monkeypatch):
+    _use_settings(monkeypatch)
+    result = flow.replay_one("0" * 16)
+    assert result.status == "failed"
+    assert result.error_type == "InputNotFound"
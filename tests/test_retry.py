@@ -0,0 +1,98 @@
+import asyncio
+import random
+
+import pytest
+
+from intake_summarizer.retry import (
+    RetryBudget,
+    RetryPolicy,
+    acall_with_retry,
+    call_with_retry,
+    deadline_scope,
+    request_timeout,
+)
+from intake_summarizer.summarize import NonRetryableLLMError, RetryableLLMError
+
+FAST = RetryPolicy(max_attempts=4, base_delay=0.001, max_delay=0.002)
+
+
+def _flaky(failures, exc=RetryableLLMError):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise exc("boom")
+        return "ok"
+
+    return fn, calls
+
+
+def test_backoff_is_full_jitter_and_capped():
+    policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+    rng = random.Random(0)
+    for attempt, cap in [(1, 1.0), (2, 2.0), (3, 4.0), (6, 4.0)]:
+        delays = [policy.backoff(attempt, rng) for _ in range(200)]
+        assert all(0.0 <= d <= cap for d in delays)
+        assert max(delays) > cap * 0.8
+
+
+def test_retries_only_retryable_errors():
+    fn, calls = _flaky(2)
+    assert call_with_retry(fn, policy=FAST, budget=RetryBudget()) == "ok"
+    assert len(calls) == 3
+
+    fn, calls = _flaky(1, NonRetryableLLMError)
+    with pytest.raises(NonRetryableLLMError):
+        call_with_retry(fn, policy=FAST, budget=RetryBudget())
+    assert len(calls) == 1
+
+    fn, calls = _flaky(10)
+    with pytest.raises(RetryableLLMError):
+        call_with_retry(fn, policy=FAST, budget=RetryBudget())
+    assert len(calls) == FAST.max_attempts
+
+
+def test_empty_budget_stops_retries():
+    budget = RetryBudget(ratio=0.0, min_per_second=0.0, capacity=1.0)
+    fn, calls = _flaky(10)
+    with pytest.raises(RetryableLLMError):
+        call_with_retry(fn, policy=FAST, budget=budget)
+    assert len(calls) == 2  # one retry, then the budget is empty
+    assert budget.state()["exhausted"] == 1
+
+
+def test_deadline_limits_attempts_and_timeout(monkeypatch):
+    slow = RetryPolicy(max_attempts=5, base_delay=5.0, max_delay=5.0)
+    monkeypatch.setattr(random, "uniform", lambda a, b: b)  # jitter at its cap, so the run is deterministic
+    fn, calls = _flaky(10)
+    with deadline_scope(2.0):
+        assert request_timeout(30.0) <= 2.0
+        with pytest.raises(RetryableLLMError):
+            call_with_retry(fn, policy=slow, budget=RetryBudget())
+    # backoff could overrun the 2s deadline, so only the first attempt ran
+    assert len(calls) == 1
+    assert request_timeout(30.0) == 30.0
+
+
+def test_inner_scope_keeps_earlier_deadline():
+    with deadline_scope(1.0):
+        with deadline_scope(100.0):
+            assert request_timeout(30.0) <= 1.0
+
+
+def test_async_retry_uses_event_loop():
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RetryableLLMError("boom")
+        return "ok"
+
+    async def main():
+        with deadline_scope(10.0):
+            return await acall_with_retry(fn, policy=FAST, budget=RetryBudget())
+
+    assert asyncio.run(main()) == "ok"
+    assert len(calls) == 3
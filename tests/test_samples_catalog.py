@@ -0,0 +1,105 @@
+import json
+import os
+
+from fastapi.testclient import TestClient
+
+from intake_summarizer import app as web
+from intake_summarizer import settings
+from intake_summarizer.samples import SampleCatalog
+
+
+def _write_catalog(directory, entries):
+    (directory / "index.json").write_text(json.dumps({"samples": entries}), encoding="utf-8")
+
+
+def _bump_mtime(path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_catalog_serves_from_memory_and_skips_missing_files(tmp_path):
+    (tmp_path / "a.txt").write_text("alpha", encoding="utf-8")
+    _write_catalog(tmp_path, [{"id": "a", "filename": "a.txt"}, {"id": "b", "filename": "b.txt"}])
+    catalog = SampleCatalog(tmp_path, check_interval=3600)
+
+    (tmp_path / "a.txt").unlink()  # not re-read within the check interval
+
+    assert [s["id"] for s in catalog.samples()] == ["a"]
+    assert catalog.text("a") == "alpha"
+    assert catalog.text("b") is None
+    assert catalog.reloads == 1
+
+
+def test_catalog_reloads_only_when_files_change(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("alpha", encoding="utf-8")
+    _write_catalog(tmp_path, [{"id": "a", "filename": "a.txt"}, {"id": "b", "filename": "b.txt"}])
+    catalog = SampleCatalog(tmp_path, check_interval=0)
+    etag = catalog.snapshot().etag
+
+    catalog.snapshot()
+    assert catalog.reloads == 1
+
+    path.write_text("alpha v2", encoding="utf-8")
+    _bump_mtime(path)
+    assert catalog.text("a") == "alpha v2"
+    assert catalog.snapshot().etag == etag  # index body unchanged
+
+    (tmp_path / "b.txt").write_text("beta", encoding="utf-8")  # listed file appears
+    assert catalog.text("b") == "beta"
+    assert catalog.snapshot().etag != etag
+    assert catalog.reloads == 3
+
+
+def test_nested_sample_files_do_not_force_reloads(tmp_path):
+    (tmp_path / "cardio").mkdir()
+    path = tmp_path / "cardio" / "a.txt"
+    path.write_text("alpha", encoding="utf-8")
+    _write_catalog(tmp_path, [{"id": "a", "filename": "cardio/a.txt"}])
+    catalog = SampleCatalog(tmp_path, check_interval=0)
+
+    for _ in range(3):
+        assert catalog.text("a") == "alpha"
+    assert catalog.reloads == 1
+
+    path.write_text("alpha v2", encoding="utf-8")
+    _bump_mtime(path)
+    assert catalog.text("a") == "alpha v2"
+    assert catalog.reloads == 2
+
+
+def test_broken_index_keeps_previous_snapshot(tmp_path):
+    (tmp_path / "a.txt").write_text("alpha", encoding="utf-8")
+    _write_catalog(tmp_path, [{"id": "a", "filename": "a.txt"}])
+    catalog = SampleCatalog(tmp_path, check_interval=0)
+
+    (tmp_path / "index.json").write_text("{not json", encoding="utf-8")
+    _bump_mtime(tmp_path / "index.json")
+
+    assert catalog.text("a") == "alpha"
+
+
+def test_api_samples_conditional_get_and_reload(tmp_path, monkeypatch):
+    (tmp_path / "a.txt").write_text("alpha", encoding="utf-8")
+    _write_catalog(tmp_path, [{"id": "a", "title": "A", "filename": "a.txt"}])
+    monkeypatch.setattr(web, "sample_catalog", SampleCatalog(tmp_path, check_interval=3600))
+    client = TestClient(web.app)
+
+    resp = client.get("/api/samples")
+    assert resp.status_code == 200
+    assert resp.json() == {"samples": [{"id": "a", "title": "A", "filename": "a.txt"}]}
+    etag = resp.headers["etag"]
+
+    assert client.get("/api/samples", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/samples/a").json() == {"id": "a", "text": "alpha"}
+    assert client.get("/api/samples/nope").status_code == 404
+
+    _write_catalog(tmp_path, [])
+    assert client.post("/admin/samples/reload").status_code == 404  # no ADMIN_TOKEN: disabled
+    monkeypatch.setenv("ADMIN_TOKEN", "s3cret")
+    settings.reload_settings()
+    assert client.post("/admin/samples/reload").status_code == 403
+    assert client.post("/admin/samples/reload", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    reloaded = client.post("/admin/samples/reload", headers={"X-Admin-Token": "s3cret"}).json()
+    assert reloaded["samples"] == 0
+    assert client.get("/api/samples", headers={"If-None-Match": etag}).status_code == 200
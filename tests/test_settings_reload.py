@@ -0,0 +1,116 @@
+import pytest
+
+from intake_summarizer import clients, ratelimit, settings
+
+
+@pytest.fixture
+def settings_file(tmp_path, monkeypatch):
+    path = tmp_path / "settings.env"
+    path.write_text("RATE_LIMIT_RPM=100\n", encoding="utf-8")
+    monkeypatch.setattr(settings, "SETTINGS_FILE", str(path))
+    settings.reload_settings()
+    yield path
+    # Drop the file's keys from os.environ again before the next test
+    path.unlink()
+    settings.reload_settings()
+
+
+def _edit(path, text):
+    path.write_text(text, encoding="utf-8")
+    settings._next_check = 0.0  # don't wait for SETTINGS_CHECK_SECONDS
+
+
+def test_snapshot_is_cached():
+    assert settings.get_settings() is settings.get_settings()
+    with pytest.raises(Exception):
+        settings.get_settings().llm_model = "other"
+
+
+def test_reload_without_changes_keeps_snapshot():
+    before = settings.get_settings()
+    assert settings.reload_settings() is before
+
+
+def test_settings_file_edit_is_picked_up(settings_file):
+    assert settings.get_settings().rate_limit_rpm == 100
+
+    _edit(settings_file, "RATE_LIMIT_RPM=2500\n")
+    assert settings.get_settings().rate_limit_rpm == 2500
+
+    _edit(settings_file, "")
+    assert settings.get_settings().rate_limit_rpm == settings.Settings.model_fields["rate_limit_rpm"].get_default(
+        call_default_factory=True
+    )
+
+
+def test_listeners_run_only_on_change(settings_file, monkeypatch):
+    calls = []
+    monkeypatch.setattr(settings, "_listeners", [lambda old, new: calls.append((old.rate_limit_rpm, new.rate_limit_rpm))])
+
+    settings.reload_settings()
+    assert calls == []
+
+    _edit(settings_file, "RATE_LIMIT_RPM=200\n")
+    settings.get_settings()
+    assert calls == [(100, 200)]
+
+
+def test_client_rebuilt_only_when_its_inputs_change(settings_file, monkeypatch):
+    monkeypatch.setenv("LLM_PROVIDER", "openai")
+    monkeypatch.setenv("LLM_MODEL", "gpt-test")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    settings.reload_settings()
+    first = clients.get_pooled_client()
+
+    _edit(settings_file, "RATE_LIMIT_RPM=300\n")
+    assert clients.get_pooled_client() is first
+
+    _edit(settings_file, "RATE_LIMIT_RPM=300\nOPENAI_TIMEOUT_SECONDS=5\n")
+    assert clients.get_pooled_client() is not first
+    clients.close_clients()
+
+
+def test_repeated_reloads_do_not_pile_up_clients(settings_file, monkeypatch):
+    monkeypatch.setenv("LLM_PROVIDER", "openai")
+    monkeypatch.setenv("LLM_MODEL", "gpt-test")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    settings.reload_settings()
+
+    built = []
+    for timeout in range(1, 11):
+        _edit(settings_file, f"OPENAI_TIMEOUT_SECONDS={timeout}\n")
+        built.append(clients.get_pooled_client())
+        assert len(clients._retired_sync) <= 1
+
+    assert len(set(map(id, built))) == 10
+    assert all(c.client.is_closed() for c in built[:-2])
+    assert not any(c.client.is_closed() for c in built[-2:])  # current client and the latest retiree
+    clients.close_clients()
+
+
+def test_limiter_reconfigured_in_place(settings_file, monkeypatch):
+    monkeypatch.setattr(ratelimit, "_limiters", {})
+    limiter = ratelimit.get_rate_limiter("openai", "gpt-test")
+    assert limiter.requests.capacity == 100
+
+    _edit(settings_file, "RATE_LIMIT_RPM=40\nRATE_LIMIT_MAX_CONCURRENCY=2\n")
+    settings.get_settings()
+    assert ratelimit.get_rate_limiter("openai", "gpt-test") is limiter
+    assert limiter.requests.capacity == 40
+    assert limiter.requests.tokens <= 40
+    assert limiter.state()["concurrency_limit"] == 2
+
+
+def test_bad_value_keeps_previous_snapshot(settings_file, caplog):
+    before = settings.get_settings()
+
+    _edit(settings_file, "RATE_LIMIT_RPM=abc\n")
+    assert settings.get_settings() is before
+    assert "Keeping previous settings" in caplog.text
+
+    caplog.clear()
+    assert settings.reload_settings() is before  # SIGHUP with the value still bad
+    assert "Keeping previous settings" in caplog.text
+
+    _edit(settings_file, "RATE_LIMIT_RPM=250\n")
+    assert settings.get_settings().rate_limit_rpm == 250
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from intake_summarizer.singleflight import SingleFlight
+from intake_summarizer.summarize import RetryableLLMError
+
+
+def test_concurrent_callers_share_one_call():
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return object()
+
+    async def run():
+        sf = SingleFlight()
+        results = await asyncio.gather(*(sf.do("k", work) for _ in range(5)))
+        return sf, results
+
+    sf, results = asyncio.run(run())
+    assert calls == 1
+    assert all(r is results[0] for r in results)
+    assert sf.stats() == {"in_flight": 0, "started": 1, "coalesced": 4}
+
+
+def test_concurrent_callers_share_the_error():
+    async def work():
+        await asyncio.sleep(0.05)
+        raise RetryableLLMError("boom")
+
+    async def run():
+        sf = SingleFlight()
+        return await asyncio.gather(*(sf.do("k", work) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(run())
+    assert all(isinstance(e, RetryableLLMError) for e in errors)
+    assert errors[0] is errors[1]
+
+
+def test_key_is_released_after_completion():
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    async def run():
+        sf = SingleFlight()
+        return [await sf.do("k", work), await sf.do("k", work)]
+
+    assert asyncio.run(run()) == [1, 2]
+
+
+def test_cancelled_caller_does_not_cancel_shared_work():
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        sf = SingleFlight()
+        first = asyncio.ensure_future(sf.do("k", work))
+        second = asyncio.ensure_future(sf.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "done"
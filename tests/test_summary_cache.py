@@ -0,0 +1,83 @@
+from intake_summarizer import cache as cache_module
+from intake_summarizer import summarize
+from intake_summarizer.cache import SummaryCache, cache_key
+from intake_summarizer.settings import Settings
+from intake_summarizer.llm_client import MockLLMClient
+
+TEXT = "Patient reports chest pain and shortness of breath since yesterday."
+
+
+class CountingClient(MockLLMClient):
+    calls = 0
+
+    def summarize(self, text: str) -> str:
+        CountingClient.calls += 1
+        return super().summarize(text)
+
+
+def _summary(text=TEXT):
+    return summarize._parse_summary(MockLLMClient().summarize(text))
+
+
+def test_duplicate_intake_served_from_cache(monkeypatch):
+    cache = SummaryCache()
+    CountingClient.calls = 0
+    monkeypatch.setattr(summarize, "get_summary_cache", lambda: cache)
+    monkeypatch.setattr(summarize, "get_llm_client", CountingClient)
+
+    first = summarize.summarize_intake(TEXT)
+    first.red_flags.append("mutated by caller")
+    second = summarize.summarize_intake(TEXT)
+
+    assert CountingClient.calls == 1
+    assert "mutated by caller" not in second.red_flags
+    assert cache.stats()["memory_hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_key_depends_on_provider_and_model():
+    assert cache_key(TEXT, provider="openai", model="a") != cache_key(TEXT, provider="openai", model="b")
+    assert cache_key(TEXT, provider="openai", model="a") != cache_key(TEXT, provider="mock", model="a")
+
+
+def test_lru_evicts_oldest_entry():
+    cache = SummaryCache(max_entries=2)
+    for k in ("a", "b", "c"):
+        cache.put(k, _summary())
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_misses():
+    cache = SummaryCache(ttl_seconds=0)
+    cache.put("k", _summary())
+    assert cache.get("k") is None
+
+
+def test_disk_tier_is_shared_between_instances(tmp_path):
+    SummaryCache(disk_dir=tmp_path).put("k", _summary())
+    other = SummaryCache(disk_dir=tmp_path)
+    assert other.get("k").urgency == "emergency"
+    assert other.stats()["disk_hits"] == 1
+    assert other.get("k") is not None
+    assert other.stats()["memory_hits"] == 1
+
+
+def test_corrupt_disk_entry_is_a_miss_and_removed(tmp_path):
+    SummaryCache(disk_dir=tmp_path).put("k", _summary())
+    path = next(tmp_path.glob("*/k.json"))
+    path.write_text('{"urgency": "emer', encoding="utf-8")
+
+    other = SummaryCache(disk_dir=tmp_path)
+    assert other.get("k") is None
+    assert other.stats()["misses"] == 1
+    assert not path.exists()
+
+
+def test_cache_is_off_for_mock_chaos(monkeypatch):
+    monkeypatch.setattr(cache_module, "get_settings", lambda: Settings(llm_provider="mock", mock_chaos=True))
+    assert cache_module.get_summary_cache() is None
+
+    monkeypatch.setattr(cache_module, "get_settings", lambda: Settings(llm_provider="mock", mock_chaos=False))
+    assert cache_module.get_summary_cache() is not None
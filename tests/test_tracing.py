@@ -0,0 +1,57 @@
+import json
+import uuid
+
+from intake_summarizer import flow, persist, persist_failures, summarize, tracing
+from intake_summarizer.settings import Settings
+from intake_summarizer.tracing import intake_trace, span
+
+
+def _unique(text):
+    # Fresh text so the summary cache can't answer for the LLM
+    return f"{text} ref {uuid.uuid4().hex}"
+
+
+def test_process_one_reports_stage_timings(tmp_path, monkeypatch):
+    monkeypatch.setattr(persist, "OUT_DIR", tmp_path)
+    result = flow.process_one(_unique("Patient reports cough for 3 days."))
+
+    assert result.status == "ok"
+    assert {"llm", "parse_validate", "business_rules", "persist"} <= set(result.stage_ms)
+    assert result.attempts == 1
+    assert result.bytes_written == len((tmp_path / result.out_path.split("/")[-1]).read_bytes())
+    assert len(result.trace_id) == 32
+
+
+def test_failure_artifact_carries_trace(tmp_path, monkeypatch):
+    class SchemaBreakingClient:
+        def summarize(self, text):
+            return '{"symptoms": "not a list"}'
+
+    monkeypatch.setattr(persist_failures, "FAIL_DIR", tmp_path)
+    monkeypatch.setattr(summarize, "get_llm_client", lambda: SchemaBreakingClient())
+    result = flow.process_one(_unique("Rash on arm."))
+
+    assert result.status == "failed"
+    assert result.attempts == 1
+    artifact = json.loads(open(result.failure_artifact, encoding="utf-8").read())
+    assert artifact["trace"]["trace_id"] == result.trace_id
+    assert "llm" in artifact["trace"]["stage_ms"]
+
+
+def test_file_exporter_writes_linked_spans(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    settings = Settings(trace_exporter="file", trace_file=str(path))
+    monkeypatch.setattr(tracing, "get_settings", lambda: settings)
+
+    with intake_trace("root") as tr:
+        with span("child", stage="x"):
+            pass
+        with span("child"):
+            pass
+
+    spans = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    root = next(s for s in spans if s["name"] == "root")
+    children = [s for s in spans if s["name"] == "child"]
+    assert len(children) == 2
+    assert all(s["parent_span_id"] == root["span_id"] and s["trace_id"] == tr.trace_id for s in children)
+    assert tr.stage_counts["child"] == 2
@@ -0,0 +1,182 @@
+import asyncio
+import io
+import zipfile
+
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+
+from intake_summarizer import app as web
+from intake_summarizer import settings, uploads
+from intake_summarizer.uploads import TextDecoder, UploadTooLarge, read_upload_text
+
+CHEST = b"Patient reports chest pain and shortness of breath since yesterday."
+THROAT = b"Patient requests a virtual video visit for mild sore throat."
+
+
+class CountingFile(io.BytesIO):
+    def __init__(self, data: bytes) -> None:
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def _decode(chunks):
+    decoder = TextDecoder()
+    for chunk in chunks:
+        decoder.feed(chunk)
+    return decoder.text()
+
+
+def test_decoder_handles_split_utf8_and_falls_back_to_latin1():
+    data = "café fièvre".encode("utf-8")
+    assert _decode([data[:4], data[4:]]) == "café fièvre"  # é split across chunks
+
+    latin = "naïve ".encode("utf-8") + "caf\xe9".encode("latin-1")
+    assert _decode([latin[:3], latin[3:]]) == latin.decode("latin-1")
+
+
+def test_read_upload_text_stops_at_the_limit(monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_CHUNK_BYTES", 1024)
+    f = CountingFile(b"x" * 1_000_000)
+
+    try:
+        asyncio.run(read_upload_text(UploadFile(f, filename="big.txt"), max_bytes=4096))
+        raise AssertionError("expected UploadTooLarge")
+    except UploadTooLarge:
+        pass
+    assert f.bytes_read <= 4096 + 1024
+
+
+def _zip(members: dict[str, bytes]) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return buf.getvalue()
+
+
+def test_api_summarize_many_files_and_a_zip(monkeypatch):
+    monkeypatch.setattr(web, "MAX_UPLOAD_BYTES", 1000)
+    archive = _zip(
+        {
+            "stack/a.txt": THROAT,
+            "stack/huge.txt": b"y" * 5000,
+            "stack/scan.pdf": b"%PDF",
+            "__MACOSX/stack/._a.txt": b"junk",
+        }
+    )
+    files = [
+        ("file", ("chest.txt", CHEST, "text/plain")),
+        ("file", ("fax.zip", archive, "application/zip")),
+    ]
+
+    resp = TestClient(web.app).post("/api/summarize", data={"persist": "false"}, files=files)
+
+    assert resp.status_code == 200
+    body = resp.json()
+    results = body["results"]
+    assert [r["filename"] for r in results] == [
+        "chest.txt",
+        "fax.zip/stack/a.txt",
+        "fax.zip/stack/huge.txt",
+        "fax.zip/stack/scan.pdf",
+    ]
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert (body["ok"], body["failed"]) == (2, 2)
+    assert results[0]["summary"]["urgency"] == "emergency"
+    assert results[1]["status"] == "ok"
+    assert results[2]["error_type"] == "UploadTooLarge"
+    assert "Only .txt" in results[3]["error_message"]
+
+
+def test_api_summarize_single_file_keeps_its_shape(monkeypatch):
+    monkeypatch.setattr(web, "MAX_UPLOAD_BYTES", 1000)
+    client = TestClient(web.app)
+
+    ok = client.post("/api/summarize", data={"persist": "false"}, files={"file": ("a.txt", CHEST, "text/plain")})
+    assert ok.json()["status"] == "ok"
+    assert ok.json()["summary"]["urgency"] == "emergency"
+
+    big = client.post("/api/summarize", data={"persist": "false"}, files={"file": ("a.txt", b"z" * 5000, "text/plain")})
+    assert big.status_code == 413
+    assert "too large" in big.json()["error"]
+
+
+def test_oversized_request_body_is_rejected(monkeypatch):
+    monkeypatch.setenv("UPLOAD_MAX_REQUEST_BYTES", "4096")
+    settings.reload_settings()
+    client = TestClient(web.app)
+    files = [("file", (f"{i}.txt", b"x" * 1500, "text/plain")) for i in range(4)]
+
+    declared = client.post("/api/summarize", data={"persist": "false"}, files=files)
+    assert declared.status_code == 413
+    assert "per request" in declared.json()["detail"]
+
+    parts = [
+        b'--b\r\nContent-Disposition: form-data; name="file"; filename="%d.txt"\r\n\r\n' % i + b"x" * 1500 + b"\r\n"
+        for i in range(4)
+    ]
+    chunked = client.post(
+        "/api/summarize",
+        content=iter(parts + [b"--b--\r\n"]),
+        headers={"content-type": "multipart/form-data; boundary=b"},
+    )
+    assert "content-length" not in chunked.request.headers
+    assert chunked.status_code == 413
+
+    small = client.post("/api/summarize", data={"persist": "false"}, files=files[:1])
+    assert small.status_code == 200
+    monkeypatch.delenv("UPLOAD_MAX_REQUEST_BYTES")
+    settings.reload_settings()
+
+
+def test_too_many_files_rejects_the_request(monkeypatch):
+    monkeypatch.setattr(web, "read_uploads", _limited_read_uploads(max_files=2))
+    files = [("file", (f"{i}.txt", THROAT, "text/plain")) for i in range(3)]
+
+    resp = TestClient(web.app).post("/api/summarize", data={"persist": "false"}, files=files)
+
+    assert resp.status_code == 413
+    assert "Too many files" in resp.json()["error"]
+
+
+def _limited_read_uploads(max_files):
+    async def read(files, *, max_bytes):
+        return await uploads.read_uploads(files, max_bytes=max_bytes, max_files=max_files)
+
+    return read
+
+
+def _corrupt_member(archive: bytes, name: str) -> bytes:
+    # Overwrite the member's deflate stream with 0xff (an invalid block type -> zlib.error)
+    info = zipfile.ZipFile(io.BytesIO(archive)).getinfo(name)
+    start = info.header_offset + 30 + len(info.filename.encode()) + len(info.extra)
+    data = bytearray(archive)
+    data[start : start + info.compress_size] = b"\xff" * info.compress_size
+    return bytes(data)
+
+
+def test_corrupted_zip_member_fails_only_that_file():
+    archive = _corrupt_member(_zip({"a.txt": THROAT * 10, "b.txt": CHEST}), "a.txt")
+
+    entries = uploads._read_zip(io.BytesIO(archive), "fax.zip", max_bytes=10_000, max_files=10)
+
+    assert [(e.filename, e.text is None) for e in entries] == [("fax.zip/a.txt", True), ("fax.zip/b.txt", False)]
+    assert entries[0].error_type == "error"  # zlib.error
+
+    resp = TestClient(web.app).post(
+        "/api/summarize",
+        data={"persist": "false"},
+        files=[("file", ("fax.zip", archive, "application/zip")), ("file", ("c.txt", CHEST, "text/plain"))],
+    )
+    assert resp.status_code == 200
+    assert (resp.json()["ok"], resp.json()["failed"]) == (2, 1)
+
+
+def test_garbage_zip_is_one_failed_entry():
+    entries = uploads._read_zip(io.BytesIO(b"PK\x05\x06" + b"\x00" * 10), "bad.zip", max_bytes=10_000, max_files=10)
+    assert len(entries) == 1 and entries[0].filename == "bad.zip" and entries[0].text is None